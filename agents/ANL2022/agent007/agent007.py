@@ -23,11 +23,14 @@ from geniusweb.references.Parameters import Parameters
 from tudelft_utilities_logging.ReportToLogger import ReportToLogger
 
 class agentBidHistory:
-    def __init__(self):
+    def __init__(self, num_features):
         self.bidHistory = []
+        self.offered = np.zeros(num_features)   # sum of the bids with a positive label
 
     def addBid(self, bid, label):
         self.bidHistory.append((bid, label))
+        if label == 1:
+            self.offered += bid
 
 class Agent007(DefaultParty):
     """Agent007"""
@@ -60,10 +63,13 @@ class Agent007(DefaultParty):
             self.domain = self._profileint.getProfile().getDomain()
             self._profileint.close()
             self.rejected_bids = []
-            self.bidHistory = agentBidHistory()
             self.issues = [issue for issue in sorted(self.domain.getIssues())]
-            self.num_values_in_issue = [self.domain.getValues(issue).size() for issue in self.issues]
-            self.bid_dict = self.bid_decode()
+            self.values = [self.domain.getValues(issue).getValues() for issue in self.issues]
+            self.value_ids = [{value: j for j, value in enumerate(values)} for values in self.values]
+            self.num_values_in_issue = [len(values) for values in self.values]
+            self.issue_pos = np.cumsum([1] + self.num_values_in_issue[:-1])    # position of every issue in the one hot encoding
+            self.bidHistory = agentBidHistory(1 + sum(self.num_values_in_issue))    # added 1 for bias
+            self.init_utility_model()
 
         elif isinstance(data, ActionDone):  # if opponent answered (reject or accept)            
             action: Action = data.getAction()
@@ -106,24 +112,23 @@ class Agent007(DefaultParty):
         with open(f"{self.storage_dir}/data.md", "w") as f:
             f.write(data)
 
-    def bid_decode(self):
-        ''' perform decoding on the bid'''
-        bid_dict = {}
-        for bid in AllBidsList(self.domain):
-            bid_vals = tuple(self.domain.getValues(issue).getValues().index(bid.getValue(issue)) for issue in self.issues)
-            bid_dict[bid_vals] = bid
-        return bid_dict
+    def init_utility_model(self):
+        ''' weights and value utilities of the profile relative to their average, per issue in the order of self.issues'''
+        profile = self._profileint.getProfile()
+        weights = np.array([float(profile.getWeight(issue)) for issue in self.issues])
+        self.relative_weights = weights / weights.mean()
+        self.relative_values = []
+        for issue, values in zip(self.issues, self.values):
+            utilities = profile.getUtilities()[issue]
+            issue_values = np.array([float(utilities.getUtility(value)) for value in values])
+            self.relative_values.append(issue_values / issue_values.mean())
 
     def bid_encode(self, bid: Bid):
         ''' perform One Hot Encoding on the bid'''
-        bid_vals = [self.domain.getValues(issue).getValues().index(bid.getValue(issue)) for issue in self.issues]
-        total_num_values = sum(self.num_values_in_issue)
-        ohe_vec = np.zeros(1+total_num_values)  # added 1 for bias
+        ohe_vec = np.zeros(1+sum(self.num_values_in_issue))  # added 1 for bias
         ohe_vec[0] = 1.0    # the bias term
-        start = 1
-        for i in range(len(self.num_values_in_issue)):
-            ohe_vec[start + bid_vals[i]] = 1.0
-            start += self.num_values_in_issue[i]
+        for issue, value_ids, v_pos in zip(self.issues, self.value_ids, self.issue_pos):
+            ohe_vec[v_pos + value_ids[bid.getValue(issue)]] = 1.0
         return ohe_vec
 
     def chooseAction(self):
@@ -159,45 +164,27 @@ class Agent007(DefaultParty):
         return False
 
     def get_bid(self):
-        issue_pos = [1]+[sum(self.num_values_in_issue[:i])+1 for i in range(1, len(self.num_values_in_issue))]
-        profile = self._profileint.getProfile()
-        issue_weight = [float(profile.getWeights()[issue]) for issue in profile.getWeights()]
-        utilities = [profile.getUtilities()[issue] for issue in profile.getUtilities()]
-        issues_values = [[float(v) for v in util.getUtilities().values()] for util in utilities]
-        
-        total_num_values = sum(self.num_values_in_issue)
-        offered = np.zeros(1+total_num_values)  # added 1 for bias
-        for bid in self.bidHistory.bidHistory:
-            if bid[1] == 1:
-                offered = np.add(offered, bid[0])
-
-        issues_offered = [offered[v_pos: v_pos+v_len] for (v_pos, v_len) in zip(issue_pos, self.num_values_in_issue)]
-        vec = []
-        for i in range(len(self.issues)):
-            avg = sum(issue_weight) / len(issue_weight)
-            weight_ = issue_weight[i]/avg
-            avg = sum(issues_offered[i]) / len(issues_offered[i])
-            issues_offered_ =  [issue_offered/avg for issue_offered in issues_offered[i]]
-            avg = (sum(issues_values[i])/len(issues_values[i]))
-            issues_values_ = [issue_value/avg for issue_value in issues_values[i]]
-            candidates = [(j,offer,val) for (j,offer,val) in zip(range(len(issues_offered_)), issues_offered_, issues_values_) if (offer >= 1 and val >= 1)]
+        offered = self.bidHistory.offered
+        issue_values = {}
+        for i, (v_pos, v_len) in enumerate(zip(self.issue_pos, self.num_values_in_issue)):
+            issues_offered_ = offered[v_pos: v_pos+v_len]
+            issues_offered_ = issues_offered_ / issues_offered_.mean()
+            issues_values_ = self.relative_values[i]
+            candidates = np.flatnonzero((issues_offered_ >= 1) & (issues_values_ >= 1))
             if len(candidates) == 0:
-                if weight_ >= 1:
+                if self.relative_weights[i] >= 1:
                     value_id = np.argmax(issues_values_)    # select best for my agent
                 else:
                     value_id = np.argmax(issues_offered_)   # select best for opponent
             elif len(candidates) == 1:
-                value_id = candidates[0][0]  # select best for both my agent and opponent
+                value_id = candidates[0]  # select best for both my agent and opponent
             else:
-                values_ids, offers, values = zip(*candidates)
-                if weight_ >= 1:
-                    id = np.argmax(values)  # select best for my agent
+                if self.relative_weights[i] >= 1:
+                    value_id = candidates[np.argmax(issues_values_[candidates])]  # select best for my agent
                 else:
-                    id = np.argmax(offers)  # select best for opponent
-                value_id = values_ids[id]
-            vec.append(value_id)
-        bid = self.bid_dict[tuple(vec)]
-        return bid
+                    value_id = candidates[np.argmax(issues_offered_[candidates])]  # select best for opponent
+            issue_values[self.issues[i]] = self.values[i][value_id]
+        return Bid(issue_values)
 
     def findNextBid(self):
         '''
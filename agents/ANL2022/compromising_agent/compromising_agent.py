@@ -5,13 +5,10 @@ from decimal import Decimal
 from os.path import exists
 
 from geniusweb.inform.Agreements import Agreements
-from geniusweb.issuevalue.ValueSet import ValueSet
-from geniusweb.issuevalue.Value import Value
-from geniusweb.issuevalue.DiscreteValue import DiscreteValue
-from geniusweb.issuevalue.NumberValue import NumberValue
 
 import logging
 from random import randint
+import numpy as np
 import time
 from typing import cast
 
@@ -40,7 +37,8 @@ from tudelft_utilities_logging.ReportToLogger import ReportToLogger
 
 from .LearnedData import LearnedData
 from .NegotiationData import NegotiationData
-from .Pair import Pair
+from utils.utility_evaluator import UtilityEvaluator
+from utils.value_frequency_map import ValueFrequencyMap
 
 # static vars
 defualtAlpha: float = 10.7
@@ -73,7 +71,8 @@ class CompromisingAgent(DefaultParty):
         # Expecting Lower Limit of Concession Function behavior
         # The idea here that we will keep for a negotiation scenario the most frequent
         # Issues - Values, afterwards, as a counter offer bid for each issue we will select the most frequent value.
-        self.freqMap: dict = None
+        self.freqMap: ValueFrequencyMap = None
+        self.utilityEvaluator: UtilityEvaluator = None
 
         # average and standard deviation of the competition for determine "good" utility threshold
         self.avgUtil: float = 0.95
@@ -254,35 +253,9 @@ class CompromisingAgent(DefaultParty):
             profile_connection = ProfileConnectionFactory.create(data.getProfile().getURI(), self.getReporter())
             self.domain = profile_connection.getProfile().getDomain()
 
-            # Create a Issues-Values frequency map
-            if self.freqMap == None:
-                # Map wasn't created before, create a new instance now
-                self.freqMap = {}
-            else:
-                # Map was created before, but this is a new negotiation scenario, clear the old map.
-                self.freqMap.clear()
-
-            # Obtain all of the issues in the current negotiation domain
-            issues: set = self.domain.getIssues()
-            for s in issues:
-                # create new list of all the values for
-                p: Pair = Pair()
-                p.vList = {}
-
-                # gather type of issue based on the first element
-                vs: ValueSet = self.domain.getValues(s)
-                if isinstance(vs.get(0), DiscreteValue):
-                    p.type = 0
-                elif isinstance(vs.get(0), NumberValue):
-                    p.type = 1
-
-                # Obtain all of the values for an issue "s"
-                for v in vs:
-                    # Add a new entry in the frequency map for each(s, v, typeof(v))
-                    vStr: str = self.valueToStr(v, p)
-                    p.vList[vStr] = 0
-
-                self.freqMap[s] = p
+            # Create a new Issues-Values frequency map for this negotiation scenario, with a
+            # count for every value of the domain
+            self.freqMap = ValueFrequencyMap(self.domain)
 
         except:
             self.logger.log(logging.ERROR, "error settingsFunction")
@@ -292,6 +265,7 @@ class CompromisingAgent(DefaultParty):
         profile_connection.close()
 
         self.allBidList = AllBidsList(self.domain)
+        self.utilityEvaluator = UtilityEvaluator(self.utilitySpace, self.freqMap.codec)
 
         # Attempt to find the optimal bid in a search-able bid space, if bid space size
         # is small / equal to MAX_SEARCHABLE_BIDSPACE
@@ -415,18 +389,14 @@ class CompromisingAgent(DefaultParty):
                         i += 1
                     bid = maxBid
                 else:
-                    # look for bid with max utility for opponent
-                    maxOpponentUtility: float = 0.0
-                    maxBid: Bid = None
-                    for i in range(2000):
-                        i: long = randint(0, self.allBidList.size())
-                        bid = self.allBidList.get(i)
-                        if self.isGood(bid) and self.isOpGood(bid):
-                            opValue = self.calcOpValue(bid)
-                            if opValue > maxOpponentUtility:
-                                maxOpponentUtility = opValue
-                                maxBid = bid
-                    bid = maxBid
+                    # look for bid with max utility for opponent, among 2000 random bids that
+                    # are good for both of the agents
+                    codes = np.random.randint(0, self.freqMap.codec.size, 2000)
+                    opValues = self.freqMap.get_values(codes)
+                    good = (self.utilityEvaluator.utilities(codes) >= self.getUtilThreshold()) \
+                           & (opValues > self.getOpThreshold()) & (opValues > 0)
+                    bid = self.freqMap.codec.decode(codes[np.argmax(np.where(good, opValues, 0))]) \
+                        if good.any() else None
 
                 bid = bid if self.isGood(
                     bid) else self.optimalBid  # if the last bid isn't good, offer (default) the optimal bid
@@ -447,6 +417,9 @@ class CompromisingAgent(DefaultParty):
           """
         if bid == None:
             return False
+        return float(self.utilitySpace.getUtility(bid)) >= self.getUtilThreshold()
+
+    def getUtilThreshold(self):
         maxVlue: float = 0.95 * float(
             self.utilitySpace.getUtility(self.optimalBid)) if not self.optimalBid == None else 0.95
         avgMaxUtility: float = self.learnedData.getAvgMaxUtility() \
@@ -461,79 +434,27 @@ class CompromisingAgent(DefaultParty):
         if (self.utilThreshold < self.MIN_UTILITY):
             self.utilThreshold = self.MIN_UTILITY
 
-        return float(self.utilitySpace.getUtility(bid)) >= self.utilThreshold
+        return self.utilThreshold
 
     def calcOpValue(self, bid: Bid):
-        value: float = 0
-
-        issues = bid.getIssues()
-        valUtil: list = [0] * len(issues)
-        issWeght: list = [0] * len(issues)
-        k: int = 0  # index
-
-        for s in issues:
-            p: Pair = self.freqMap[s]
-            v: Value = bid.getValue(s)
-            vs: str = self.valueToStr(v, p)
-
-            # calculate utility of value (in the issue)
-            sumOfValues: int = 0
-            maxValue: int = 1
-            for vString in p.vList.keys():
-                sumOfValues += p.vList[vString]
-                maxValue = max(maxValue, p.vList[vString])
-
-            # calculate estimated utility of the issuevalue
-            valUtil[k] = p.vList.get(vs) / maxValue
-
-            # calculate the inverse std deviation of the array
-            mean: float = sumOfValues / len(p.vList)
-            for vString in p.vList.keys():
-                issWeght[k] += pow(p.vList.get(vString) - mean, 2)
-            issWeght[k] = 1.0 / math.sqrt((issWeght[k] + 0.1) / len(p.vList))
-
-            k += 1
-
-        sumOfWght: float = 0
-        for k in range(len(issues)):
-            value += valUtil[k] * issWeght[k]
-            sumOfWght += issWeght[k]
-
-        return value / sumOfWght
+        return self.freqMap.get_value(bid)
 
     def isOpGood(self, bid: Bid):
         if bid == None:
             return False
 
-        value: float = self.calcOpValue(bid)
+        return self.calcOpValue(bid) > self.getOpThreshold()
+
+    def getOpThreshold(self):
         index: int = int(((tSplit - 1) / (1 - tPhase) * (self.progress.get(int(
             time.time() * 1000)) - tPhase)))
         # change
         opThreshold: float = max(max(2 * self.opThreshold[index] - 1, self.opReject[index]),
                                  0.2) if self.opThreshold != None and self.opReject != None else 0.6
-        return value > opThreshold
+        return opThreshold
 
     def updateFreqMap(self, bid: Bid):
-        if not (bid == None):
-            issues = bid.getIssues()
-
-            for s in issues:
-                p: Pair = self.freqMap.get(s)
-                v: Value = bid.getValue(s)
-
-                vs: str = self.valueToStr(v, p)
-                p.vList[vs] = (p.vList.get(vs) + 1)
-
-    def valueToStr(self, v: Value, p: Pair):
-        v_str: str = ""
-        if p.type == 0:
-            v_str = cast(DiscreteValue, v).getValue()
-        elif p.type == 1:
-            v_str = cast(NumberValue, v).getValue()
-
-        if v_str == "":
-            print("Warning: Value wasn't found")
-        return v_str
+        self.freqMap.update(bid)
 
     def getPath(self, dataType: str, opponentName: str):
         return os.path.join(self.storage_dir, dataType + "_" + opponentName + ".json")
@@ -1,13 +1,12 @@
 import logging
 from random import randint
 from time import time
-from typing import cast
+from typing import Iterator, cast
 
 from geniusweb.actions.Accept import Accept
 from geniusweb.actions.Action import Action
 from geniusweb.actions.Offer import Offer
 from geniusweb.actions.PartyId import PartyId
-from geniusweb.bidspace.AllBidsList import AllBidsList
 from geniusweb.inform.ActionDone import ActionDone
 from geniusweb.inform.Finished import Finished
 from geniusweb.inform.Inform import Inform
@@ -27,6 +26,8 @@ from geniusweb.progress.ProgressTime import ProgressTime
 from geniusweb.references.Parameters import Parameters
 from tudelft_utilities_logging.ReportToLogger import ReportToLogger
 
+from utils.bid_enumerator import BidEnumerator
+
 #from agents.template_agent.utils.opponent_model import OpponentModel
 
 
@@ -53,6 +54,7 @@ class MiCROAgent(DefaultParty):
         self.logger.log(logging.INFO, "party is initialized")
         
         self.allMyBidsSorted: list = None
+        self.myBidsInOrder: Iterator[Bid] = None
         self.receivedBids = set()
         self.numUniqueProposalsMadeByMe = 0
         self.reservationValue = 0 # in ANAC 2022 the reservation value is always 0, so actually we don't really need this value.
@@ -87,11 +89,10 @@ class MiCROAgent(DefaultParty):
             profile_connection.close()
             
          
-            #Create a sorted list containing all possible bids.
-            domain = self.profile.getDomain()
-            all_bids = AllBidsList(domain)
-            self.allMyBidsSorted = list(all_bids)
-            self.allMyBidsSorted.sort(reverse=True,key=self.profile.getUtility) 
+            #Generate all possible bids in order of decreasing utility. Only the bids that we
+            #reach are stored in allMyBidsSorted, so huge domains never have to be sorted.
+            self.myBidsInOrder = BidEnumerator(self.profile).iter_bids()
+            self.allMyBidsSorted = []
             
             #Test that it is sorted correctly.
             #for bid in self.allMyBidsSorted:
@@ -201,7 +202,7 @@ class MiCROAgent(DefaultParty):
         # 3. If we did not accept, then make a counter-proposal (either a new one, or repeat an old one). 
         
             # 3a. Get the next bid from our sorted list, after the last one that we have already proposed.
-        myNextBid = self.allMyBidsSorted[self.numUniqueProposalsMadeByMe]
+        myNextBid = self.getSortedBid(self.numUniqueProposalsMadeByMe)
             
             # 3b. Determine whether to propose that one or to repeat one we already proposed before.
         if readyToConcede and self.profile.getUtility(myNextBid) > self.reservationValue:
@@ -231,7 +232,7 @@ class MiCROAgent(DefaultParty):
             return False;
         
         if readyToConcede:
-            lowestAcceptableBid = self.allMyBidsSorted[self.numUniqueProposalsMadeByMe]  #The next bid we are willing to propose. 
+            lowestAcceptableBid = self.getSortedBid(self.numUniqueProposalsMadeByMe)  #The next bid we are willing to propose. 
         else:
             lowestAcceptableBid = self.allMyBidsSorted[self.numUniqueProposalsMadeByMe-1] # The lowest bid we have already proposed.
         
@@ -242,6 +243,17 @@ class MiCROAgent(DefaultParty):
 
 
 
+    def getSortedBid(self, index: int) -> Bid:
+        """Bid at the given position in our ranking (0 is our best bid), generating the ranking
+        up to that position if needed. Past the end of the domain the worst bid is returned.
+        """
+        while len(self.allMyBidsSorted) <= index:
+            nextBid = next(self.myBidsInOrder, None)
+            if nextBid is None:
+                return self.allMyBidsSorted[-1]
+            self.allMyBidsSorted.append(nextBid)
+        return self.allMyBidsSorted[index]
+
     def save_data(self):
         """This method is called after the negotiation is finished. It can be used to store data
         for learning capabilities. Note that no extensive calculations can be done within this method.
@@ -1,7 +1,6 @@
 import logging
 import numpy as np
 
-from random import randint
 from time import time
 from typing import cast
 
@@ -30,6 +29,7 @@ from geniusweb.references.Parameters import Parameters
 from tudelft_utilities_logging.ReportToLogger import ReportToLogger
 
 from agents.template_agent.utils.opponent_model import OpponentModel
+from utils.joint_score_search import JointScoreSearch
 
 
 class RGAgent(DefaultParty):
@@ -58,7 +58,7 @@ class RGAgent(DefaultParty):
         self.max_acceptance_threshold = 0.9  # From optimal
         self.min_acceptance_threshold = 0.5  # From optimal
         self.compromising_factor = 4  # Higher value means compromise later
-        self.bids_to_consider = 800
+        self.bid_search: JointScoreSearch = None
         self.optimal_bid = None
         self.best_opponent_bid = None
         self.all_previous_bids = []
@@ -103,6 +103,7 @@ class RGAgent(DefaultParty):
             self.optimal_bid = optimal_bid[0]
             self.max_acceptance_threshold *= float(optimal_bid[1])
             self.min_acceptance_threshold *= float(optimal_bid[1])
+            self.bid_search = JointScoreSearch(self.profile)
 
             profile_connection.close()
 
@@ -245,25 +246,24 @@ class RGAgent(DefaultParty):
 
         return self.profile.getUtility(bid) >= acceptance_threshold
 
-    def find_bid(self) -> Bid:
+    def find_bid(self, alpha: float = 0.95, eps: float = 0.1) -> Bid:
         """
         @brief: Finds the bid.
 
+        @param alpha: Trade-off factor, see score_bid
+        @param eps: Time pressure factor, see score_bid
+
         @return: The chosen bid.
         """
-        # Compose a list of all possible bids
-        domain = self.profile.getDomain()
-        all_bids = AllBidsList(domain)
-
-        best_bid_score = 0.0
-        best_bid = None
-
-        # Take X attempts to find a bid according to a heuristic score
-        for _ in range(self.bids_to_consider):
-            bid = all_bids.get(randint(0, all_bids.size() - 1))
-            bid_score = self.score_bid(bid)
-            if bid_score > best_bid_score:
-                best_bid_score, best_bid = bid_score, bid
+        # Score all bids at once (a large sample of them on very large domains)
+        progress = self.progress.get(time() * 1000)
+        time_pressure = 1.0 - progress ** (1 / eps)
+
+        opponent_utilities = None
+        if self.opponent_model is not None:
+            opponent_utilities = self.opponent_model.get_issue_utilities(self.bid_search.codec)
+        best_code = self.bid_search.best(time_pressure, opponent_utilities, alpha)[0]
+        best_bid = self.bid_search.codec.decode(best_code)
         if self.accept_condition(best_bid):
             return best_bid
         else:
@@ -20,7 +20,6 @@ from geniusweb.inform.Finished import Finished
 from geniusweb.inform.Inform import Inform
 from geniusweb.inform.Settings import Settings
 from geniusweb.inform.YourTurn import YourTurn
-from geniusweb.issuevalue import DiscreteValue, NumberValue
 from geniusweb.issuevalue.Bid import Bid
 from geniusweb.issuevalue.Domain import Domain
 from geniusweb.party.Capabilities import Capabilities
@@ -42,6 +41,9 @@ from geniusweb.references.Parameters import Parameters
 from tudelft_utilities_logging.ReportToLogger import ReportToLogger
 
 from agents.template_agent.utils.opponent_model import OpponentModel
+from utils.utility_evaluator import UtilityEvaluator
+from utils.utility_optimizers import get_max_bid
+from utils.value_frequency_map import ValueFrequencyMap
 
 
 class SmartAgent(DefaultParty):
@@ -88,7 +90,7 @@ class SmartAgent(DefaultParty):
                                 "opponent_util_by_time": [0.0] * self.time_split}
         self.opponent_utility_by_time = self.negotiation_data["opponent_util_by_time"]
         self.need_to_read_persistent_data = True
-        self.freqMap = {}
+        self.freqMap: ValueFrequencyMap = None
         self.MAX_SEARCHABLE_BIDSPACE = 50000
         self.utilitySpace: UtilitySpace = None
         self.all_bid_list: AllBidsList
@@ -143,51 +145,12 @@ class SmartAgent(DefaultParty):
                                                                           self.getReporter())
                         domain = self.profileInt.getProfile().getDomain()
 
-                        if self.freqMap != {}:
-                            self.freqMap.clear()
-                        issues = domain.getIssues()
-                        for s in issues:
-                            pair = ({}, {})
-                            vlist = pair[1]
-                            vs = domain.getValues(s)
-                            if isinstance(vs.get(0), DiscreteValue.DiscreteValue.__class__):
-                                pair.type = 0
-                            elif isinstance(vs.get(0), NumberValue.NumberValue.__class__):
-                                pair.type = 1
-                            for v in vs:
-                                vlist[str(v)] = 0
-                            self.freqMap[s] = pair
+                        self.freqMap = ValueFrequencyMap(domain)
                         self.utilitySpace: UtilitySpace.UtilitySpace = self.profileInt.getProfile()
                         self.all_bid_list = AllBidsList(domain)
 
-                        bids_zise = self.all_bid_list.size()
-                        if bids_zise < self.MAX_SEARCHABLE_BIDSPACE:
-                            r = -1
-                        elif bids_zise == self.MAX_SEARCHABLE_BIDSPACE:
-                            r = 0
-                        else:
-                            r = 1
-                        if r == 0 or r == -1:
-                            mx_util = 0
-                            bidspace_size = self.all_bid_list.size()
-                            for i in range(0, bidspace_size, 1):
-                                b: Bid = self.all_bid_list.get(i)
-                                candidate = self.utilitySpace.getUtility(b)
-                                r = candidate.compare(mx_util)
-                                if r == 1:
-                                     mx_util = candidate
-                                     self.optimalBid = b
-                        else:
-                            # Searching for best bid in random subspace
-                            mx_util = 0
-                            for attempt in range(0,self.MAX_SEARCHABLE_BIDSPACE,1):
-                                irandom = random.random(self.all_bid_list.size())
-                                b = self.all_bid_list.get(irandom)
-                                candidate = self.utilitySpace.getUtility(b)
-                                r = candidate.compare(mx_util)
-                                if r == 1:
-                                    mx_util = candidate
-                                    self.optimalBid = b
+                        # the optimal bid follows directly from the profile, no need to search
+                        self.optimalBid = get_max_bid(UtilityEvaluator(self.utilitySpace))
                     except:
                         raise Exception("Illegal state exception")
                 profile_connection.close()
@@ -268,13 +231,7 @@ class SmartAgent(DefaultParty):
         return "Smart agent for the ANL 2022 competition"
 
     def update_frequency_map(self, bid):
-        if bid is not None:
-            issues = bid.getIssues()
-            for s in issues:
-                p = self.freqMap.get(s)
-                v = bid.getValue(s)
-                vList = p[1]
-                vList[str(v)] += 1
+        self.freqMap.update(bid)
 
     def opponent_action(self, action):
         """Process an action that was received from the opponent.
@@ -379,29 +336,16 @@ class SmartAgent(DefaultParty):
         # # own_utility = self.profile.getProfile().getUtility(bid)
         # opponent_utility = self.opponent_model.get_predicted_utility(bid)  # .getUtility(bid)
         # return opponent_utility
+        # the value utility of an issue is that of its last value in the domain, whatever the
+        # value in the bid
         value = 0
-        issues = bid.getIssues()
-        valUtil = [0.0]*len(issues)
-        isWeght = [0.0]*len(issues)
-        k = 0
-        for s in issues:
-            p = self.freqMap.get(s)
-            v = bid.getValue(s)
-            sumOfValues = 0
-            maxValue = 1
-            for vString in p[1].keys():
-                sumOfValues += p[1].get(vString)
-                maxValue = max(maxValue, p[1].get(vString))
-            valUtil[k] = float(p[1].get(vString)/maxValue)
-            mean = float(sumOfValues/len(p[1]))
-            for vString in p[1].keys():
-                isWeght[k] += math.pow(p[1].get(vString) - mean, 2)
-            isWeght[k] = 1.0/(math.sqrt(isWeght[k] + 0.1)/len(p[1]))
-            k += 1
         sumOfwght = 0
-        for k in range(0, len(issues)):
-            value += valUtil[k] * isWeght[k]
-            sumOfwght += isWeght[k]
+        for issue_index in range(len(self.freqMap.codec.issues)):
+            counts = self.freqMap.counts.counts(issue_index)
+            valUtil = float(counts[-1] / max(1, counts.max()))
+            isWeght = 1.0 / (math.sqrt(((counts - counts.mean()) ** 2).sum() + 0.1) / len(counts))
+            value += valUtil * isWeght
+            sumOfwght += isWeght
         return value/sumOfwght
 
     def is_opponents_proposal_is_good(self, bid: Bid):
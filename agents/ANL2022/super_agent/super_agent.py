@@ -3,9 +3,9 @@ import math
 import os.path
 import random
 import pickle
+import numpy as np
 from time import time
 from typing import cast
-from collections import defaultdict
 from typing import List
 from geniusweb.profileconnection.ProfileInterface import ProfileInterface
 from geniusweb.actions.Accept import Accept
@@ -22,9 +22,6 @@ from geniusweb.bidspace.AllBidsList import AllBidsList
 from geniusweb.party.Capabilities import Capabilities
 from geniusweb.party.DefaultParty import DefaultParty
 from geniusweb.utils import val
-from geniusweb.issuevalue.Value import Value
-from geniusweb.issuevalue import DiscreteValue
-from geniusweb.issuevalue import NumberValue
 from geniusweb.inform.Agreements import Agreements
 from geniusweb.references.Parameters import Parameters
 from geniusweb.profileconnection.ProfileConnectionFactory import (
@@ -33,9 +30,9 @@ from geniusweb.profileconnection.ProfileConnectionFactory import (
 from geniusweb.progress.ProgressRounds import ProgressRounds
 
 from .utils.utils import get_ms_current_time
-from .utils.pair import Pair
 from .utils.persistent_data import PersistentData
 from .utils.negotiation_data import NegotiationData
+from utils.value_frequency_map import ValueFrequencyMap
 
 
 class SuperAgent(DefaultParty):
@@ -67,7 +64,9 @@ class SuperAgent(DefaultParty):
         # self._data_paths: List[str] = []
         self._negotiation_data_paths: List[str] = []
         self._opponent_name = None
-        self._freq_map = defaultdict()
+        self._freq_map: ValueFrequencyMap = None
+        # codes of the bids in _sorted_bid_list, in the codec of the frequency map
+        self._sorted_codes: np.ndarray = None
         self._avg_utility = 0.95
         self._std_utility = 0.15
         self._util_threshold = 0.95
@@ -147,7 +146,7 @@ class SuperAgent(DefaultParty):
         if good_bid == 0:
             bid = self._optimal_bid
         else:
-            bid = max(self._sorted_bid_list[0:good_bid], key=self.calc_op_value)
+            bid = self._sorted_bid_list[int(np.argmax(self._freq_map.get_values(self._sorted_codes[0:good_bid])))]
 
         self.getReporter().log(logging.INFO, "chosen bid utility: {}".format(self._utility_space.getUtility(bid)))
         return bid
@@ -189,29 +188,14 @@ class SuperAgent(DefaultParty):
                 self._profile = self._profile_interface.getProfile()
                 self._domain = self._profile.getDomain()
 
-                if self._freq_map is None:
-                    self._freq_map = defaultdict()
-                else:
-                    self._freq_map.clear()
-
-                issues = self._domain.getIssues()
-                for issue in issues:
-                    p = Pair()
-                    vs = self._domain.getValues(issue)
-                    if isinstance(vs.get(0), DiscreteValue.DiscreteValue):
-                        p.value_type = 0
-                    elif isinstance(vs.get(0), NumberValue.NumberValue):
-                        p.value_type = 1
-                    for v in vs:
-                        vstr = self.value_to_str(v, p)
-                        p.vlist[vstr] = 0
-                    self._freq_map[issue] = p
+                self._freq_map = ValueFrequencyMap(self._domain)
 
                 self._utility_space = self._profile_interface.getProfile()
                 self._all_bid_list: AllBidsList = AllBidsList(domain=self._domain)
                 self._sorted_bid_list = sorted(AllBidsList(domain=self._domain),
                                                key=self._utility_space.getUtility, reverse=True)
                 self._len_sorted_bid_list = len(self._sorted_bid_list)
+                self._sorted_codes = self._freq_map.codec.encode_many(self._sorted_bid_list)
                 # after sort of bid list the optimal bid is in the first element
                 self._optimal_bid = self._sorted_bid_list[0]
 
@@ -288,17 +272,6 @@ class SuperAgent(DefaultParty):
         if self._profile_interface is not None:
             self._profile_interface.close()
 
-    def value_to_str(self, v: Value, p: Pair) -> str:
-        v_str = ""
-        if p.value_type == 0:
-            v_str = str(cast(DiscreteValue, v).getValue())
-        elif p.value_type == 1:
-            v_str = str(cast(NumberValue, v).getValue())
-
-        if v_str == "":
-            self.getReporter().log(logging.WARNING, "Warning: Value wasn't found")
-        return v_str
-
     def process_action(self, action: Action):
         if isinstance(action, Offer):
             self._last_received_bid = cast(Offer, action).getBid()
@@ -307,49 +280,20 @@ class SuperAgent(DefaultParty):
             self._negotiation_data.add_bid_util(util_value)
 
     def update_freq_map(self, bid: Bid):
-        if bid is not None:
-            issues = bid.getIssues()
-            for issue in issues:
-                p: Pair = self._freq_map[issue]
-                v: Value = bid.getValue(issue)
-                vs: str = self.value_to_str(v, p)
-                p.vlist[vs] = p.vlist[vs] + 1
+        self._freq_map.update(bid)
 
     def calc_op_value(self, bid: Bid):
-        value: float = 0
-        issues: set[str] = bid.getIssues()
-        val_util: list[float] = [0] * len(issues)
-        is_weight: list[float] = [0] * len(issues)
-        k: int = 0
-        for issue in issues:
-            p: Pair = self._freq_map[issue]
-            v: Value = bid.getValue(issue)
-            vs: str = self.value_to_str(v=v, p=p)
-            sum_of_values = 0
-            max_value = 1
-            for vString in p.vlist.keys():
-                sum_of_values = sum_of_values + p.vlist.get(vString)
-                max_value = max(max_value, p.vlist.get(vString))
-            val_util[k] = float(p.vlist.get(vs)) / max_value
-            mean = sum_of_values / len(p.vlist)
-            for v_string in p.vlist.keys():
-                is_weight[k] = is_weight[k] + math.pow(p.vlist.get(v_string) - mean, 2)
-            is_weight[k] = 1 / math.sqrt((is_weight[k] + 0.1) / len(p.vlist))
-            k = k + 1
-        sum_of_weight = 0
-        for k in range(len(issues)):
-            value = value + val_util[k] * is_weight[k]
-            sum_of_weight = sum_of_weight + is_weight[k]
-        return value / sum_of_weight
+        return self._freq_map.get_value(bid)
 
     def is_op_good(self, bid: Bid):
         if bid is None:
             return False
-        value = self.calc_op_value(bid=bid)
+        return self.calc_op_value(bid=bid) > self.get_op_threshold()
+
+    def get_op_threshold(self):
         index = int(
             ((self.t_split - 1) / (1 - self.t_phase) * (self._progress.get(get_ms_current_time()) - self.t_phase)))
-        op_threshold = max(1 - 2 * self.op_threshold[index], 0.2) if self.op_threshold is not None else 0.6
-        return value > op_threshold
+        return max(1 - 2 * self.op_threshold[index], 0.2) if self.op_threshold is not None else 0.6
         # index = (int)((t_split - 1) / (1 - t_phase) * (progress.get(System.currentTimeMillis()) - t_phase));
 
     def is_last_turn(self):
@@ -411,11 +355,11 @@ class SuperAgent(DefaultParty):
 
         slice_idx = self.first_is_good_idx()
         end_slice = int(min(slice_idx + 0.005 * self._len_sorted_bid_list - 1, self._len_sorted_bid_list - 1))
-        for i in range(slice_idx, 0, -1):
-            tmp_bid = self._sorted_bid_list[i]
-            if tmp_bid == self._optimal_bid or self.is_op_good(tmp_bid):
-                bid = tmp_bid
-                break
+        # the worst bid for us up to slice_idx (apart from the optimal bid) that is good for the opponent
+        op_good = np.flatnonzero(
+            self._freq_map.get_values(self._sorted_codes[1:slice_idx + 1]) > self.get_op_threshold())
+        if len(op_good) > 0:
+            bid = self._sorted_bid_list[int(op_good[-1]) + 1]
         if self._progress.get(get_ms_current_time()) > 0.992 and self.is_good(self._best_offer_bid):
             bid = self._best_offer_bid
         if bid is None or not self.is_good(bid):
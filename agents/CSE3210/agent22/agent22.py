@@ -1,7 +1,6 @@
 import logging
 import time
 import numpy as np
-import copy
 from geniusweb.progress.Progress import Progress
 from scipy.stats import chisquare
 from random import randint
@@ -16,7 +15,6 @@ from geniusweb.inform.Inform import Inform
 from geniusweb.inform.Settings import Settings
 from geniusweb.inform.YourTurn import YourTurn
 from geniusweb.issuevalue.Bid import Bid
-from geniusweb.issuevalue.Value import Value
 from decimal import Decimal
 from geniusweb.party.Capabilities import Capabilities
 from geniusweb.party.DefaultParty import DefaultParty
@@ -28,10 +26,12 @@ from geniusweb.profileconnection.ProfileConnectionFactory import (
 )
 from tudelft.utilities.immutablelist.ImmutableList import ImmutableList
 
-from .extended_util_space import ExtendedUtilSpace
+from agents.time_dependent_agent.extended_util_space import ExtendedUtilSpace
 from geniusweb.progress.ProgressRounds import ProgressRounds
 from tudelft_utilities_logging.Reporter import Reporter
 
+from .frequency_window import FrequencyWindow
+
 
 class Agent22(DefaultParty):
 
@@ -46,10 +46,10 @@ class Agent22(DefaultParty):
         self.bidList: list[Bid] = []
         self.bidListOpp: list[Bid] = []
         self.weightList: dict[str, Decimal] = {}
-        self.weightListOpp: dict[str, Decimal] = {}
-        self.issue_value_frequencies = {}
-        self.prev_issue_value_frequencies = {}
+        self.weightListOpp: dict[str, float] = {}
+        self.opponent_frequencies: FrequencyWindow = None
         self.cc = 1  # concession constant
+        self.gamma = 0.5  # exponent of the value estimation
 
     def notifyChange(self, info: Inform):
         """This is the entry point of all interaction with your agent after is has been initialised.
@@ -76,8 +76,8 @@ class Agent22(DefaultParty):
             self.weightList = profile.getWeights()
             self.issue_names = list(self.weightList.keys())
             n = len(self.issue_names)
-            self.weightListOpp = dict(zip(self.issue_names, np.full(n, Decimal(round(1 / n, 6)))))
-            self.issue_value_frequencies = dict(zip(self.issue_names, {}))
+            self.weightListOpp = {issue: round(1 / n, 6) for issue in self.issue_names}
+            self.opponent_frequencies = FrequencyWindow(profile.getDomain())
         # ActionDone is an action send by an opponent (an offer or an accept)
         elif isinstance(info, ActionDone):
             action: Action = cast(ActionDone, info).getAction()
@@ -160,25 +160,15 @@ class Agent22(DefaultParty):
         return self.time_dependent_bidding(beta)
 
     def _getTheirUtility(self, bid: Bid):
-        value_estimation = self.val_estimation()
         utility = 0
         for issue in bid.getIssues():
             value = bid.getValue(issue)
-            if issue in value_estimation and value in value_estimation[issue]:
-                utility += float(self.weightListOpp[issue]) * value_estimation[issue][value]
+            utility += self.weightListOpp[issue] * self.opponent_frequencies.value_utility(issue, value, self.gamma)
 
         return Decimal(utility)
 
     def _updateFrequencies(self, bid: Bid):
-        issue_values = bid.getIssueValues()
-        for issue in issue_values.keys():
-            value = issue_values[issue]
-            if not (issue in self.issue_value_frequencies):
-                self.issue_value_frequencies[issue] = {}
-            if not (value in self.issue_value_frequencies[issue]):
-                self.issue_value_frequencies[issue][value] = 0
-
-            self.issue_value_frequencies[issue][value] += 1
+        self.opponent_frequencies.update(bid)
 
     def _evaluate_bid(self, bid: Bid):
         profile = self._profile.getProfile()
@@ -279,70 +269,43 @@ class Agent22(DefaultParty):
         k = 10
         if len(self.bidListOpp) % k == 0:
             self.weightListOpp = self.oppWeights()
-            self.prev_issue_value_frequencies = copy.deepcopy(self.issue_value_frequencies)
-
-    def val_estimation(self) -> dict[str, dict[Value, float]]:
-        gamma = 0.5
-        freqs = copy.deepcopy(self.issue_value_frequencies)
-        value_func = copy.deepcopy(self.issue_value_frequencies)
-        for issue in freqs.keys():
-            max_value = max(freqs[issue], key=freqs[issue].get)
-            for value in freqs[issue].keys():
-                value_func[issue][value] = ((1 + freqs[issue][value]) ** gamma) / (
-                            (1 + freqs[issue][max_value]) ** gamma)
-
-        return value_func
+            self.opponent_frequencies.close_window()
 
-    def oppWeights(self) -> dict[str, Decimal]:
+    def oppWeights(self) -> dict[str, float]:
         alpha = 10  # alpha denotes how much importance is added to weights
         beta = 5  # beta denotes how much this importance matters over time
         e = []  # list of issues that did not change significantly in frequency
         concession = False
-        new_weights: dict[str, Decimal] = copy.deepcopy(self.weightListOpp)
-        issue_list = self.prev_issue_value_frequencies.keys()
-        value_func = self.val_estimation()
+        new_weights: dict[str, float] = dict(self.weightListOpp)
+        # the first window has nothing to compare with
+        issue_list = self.opponent_frequencies.issues if self.opponent_frequencies.has_previous() else []
         progress = self._progress.get(round(clock() * 1000))
-        n = len(issue_list)
         for issue in issue_list:
-            # Calculate the frequencies from the currently found values
-            frequencies = copy.deepcopy(self.issue_value_frequencies[issue])
-            N = sum(frequencies.values())
-            for value in frequencies.keys():
-                frequencies[value] /= float(N)
-
-            prev_frequencies = copy.deepcopy(self.prev_issue_value_frequencies[issue])
-            # Add the newly found values to the previous dictionary
-            for value in frequencies.keys():
-                if value not in prev_frequencies:
-                    prev_frequencies[value] = 0
-            # Calculate the frequencies from the previous found values
-            N = sum(prev_frequencies.values())
-            for value in prev_frequencies.keys():
-                prev_frequencies[value] /= float(N)
+            # Frequencies of the currently found values, now and at the end of the previous window
+            # (0 for the newly found values)
+            frequencies = self.opponent_frequencies.frequencies(issue)
+            prev_frequencies = self.opponent_frequencies.previous_frequencies(issue)
 
             # Do a chi squared distribution test on the frequencies to check if they have changed significantly
-            obs = list(frequencies.values())
-            exp = list(prev_frequencies.values())
-            _, p_val = chisquare(f_obs=obs, f_exp=exp)
+            _, p_val = chisquare(f_obs=frequencies, f_exp=prev_frequencies)
             # If our frequencies did not change significantely add this issue to e
             if p_val > 0.05:
                 e.append(issue)
             else:
                 # Calculate the expected value for the utility for each issue value and compare with the previous found one
-                prev_expected = {k: prev_frequencies[k] * value_func[issue][k] for k in prev_frequencies}
-                expected = {k: frequencies[k] * value_func[issue][k] for k in frequencies}
-                if sum(expected.values()) < sum(prev_expected.values()):
+                value_func = self.opponent_frequencies.value_utilities(issue, self.gamma)
+                if np.dot(frequencies, value_func) < np.dot(prev_frequencies, value_func):
                     concession = True
 
         if len(e) != len(issue_list) and concession:
             for issue in e:
-                delta_t = Decimal(alpha * (1 - progress ** beta))
+                delta_t = alpha * (1 - progress ** beta)
                 new_weights[issue] += delta_t
 
         # Normalize weights
         summed = sum(new_weights.values())
         for key in new_weights:
-            new_weights[key] = Decimal(round(new_weights[key] / summed, 6))
+            new_weights[key] = round(new_weights[key] / summed, 6)
 
         # print(new_weights)
         return new_weights
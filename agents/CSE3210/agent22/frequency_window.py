@@ -0,0 +1,82 @@
+from typing import Dict, List
+
+import numpy as np
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.Domain import Domain
+from geniusweb.issuevalue.Value import Value
+
+
+class FrequencyWindow:
+    """Counts of the values offered by the opponent, now and at the end of the previous
+    window, kept in place in one pair of count arrays per issue.
+
+    Values are indexed in the order in which they were first offered, so the counts of the
+    values seen so far are a prefix of the arrays. Offers since the end of the previous
+    window are kept in a delta log that is added to the previous counts when the window is
+    closed, so neither an offer nor a window copies the counts.
+    """
+
+    def __init__(self, domain: Domain):
+        self.issues: List[str] = list(domain.getIssues())
+        self._value_indices: Dict[str, Dict[Value, int]] = {issue: {} for issue in self.issues}
+        self._counts = {
+            issue: np.zeros(domain.getValues(issue).size(), dtype=np.int64) for issue in self.issues
+        }
+        self._max_counts = {issue: 0 for issue in self.issues}
+        self._total = 0
+
+        self._previous_counts = {issue: np.zeros_like(counts) for issue, counts in self._counts.items()}
+        self._previous_total = 0
+        self._has_previous = False
+        # value indices of every offer since the end of the previous window
+        self._delta_log: List[List[int]] = []
+
+    def update(self, bid: Bid):
+        indices = []
+        for issue in self.issues:
+            value_indices = self._value_indices[issue]
+            value = bid.getValue(issue)
+            index = value_indices.get(value)
+            if index is None:
+                index = value_indices[value] = len(value_indices)
+            counts = self._counts[issue]
+            counts[index] += 1
+            if counts[index] > self._max_counts[issue]:
+                self._max_counts[issue] = int(counts[index])
+            indices.append(index)
+        self._total += 1
+        self._delta_log.append(indices)
+
+    def close_window(self):
+        """Make the current counts the counts of the previous window"""
+        for indices in self._delta_log:
+            for issue, index in zip(self.issues, indices):
+                self._previous_counts[issue][index] += 1
+        self._previous_total = self._total
+        self._has_previous = True
+        self._delta_log.clear()
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def frequencies(self, issue: str) -> np.ndarray:
+        """Relative frequencies of the values offered so far, in order of first offer"""
+        return self._counts[issue][: len(self._value_indices[issue])] / float(self._total)
+
+    def previous_frequencies(self, issue: str) -> np.ndarray:
+        """Relative frequencies at the end of the previous window, of the same values as
+        frequencies (values that were first offered in this window have frequency 0)
+        """
+        return self._previous_counts[issue][: len(self._value_indices[issue])] / float(self._previous_total)
+
+    def value_utilities(self, issue: str, gamma: float) -> np.ndarray:
+        """Estimated utility of the values offered so far, in order of first offer"""
+        counts = self._counts[issue][: len(self._value_indices[issue])]
+        return ((1 + counts) ** gamma) / ((1 + self._max_counts[issue]) ** gamma)
+
+    def value_utility(self, issue: str, value: Value, gamma: float) -> float:
+        """Estimated utility of a value, 0 if it was never offered"""
+        index = self._value_indices[issue].get(value)
+        if index is None:
+            return 0.0
+        return ((1 + int(self._counts[issue][index])) ** gamma) / ((1 + self._max_counts[issue]) ** gamma)
@@ -1,6 +1,5 @@
 import logging
 import time
-from decimal import Decimal
 
 import numpy as np
 from random import randint
@@ -9,7 +8,6 @@ from typing import cast
 from geniusweb.actions.Accept import Accept
 from geniusweb.actions.Action import Action
 from geniusweb.actions.Offer import Offer
-from geniusweb.bidspace.AllBidsList import AllBidsList
 from geniusweb.inform.ActionDone import ActionDone
 from geniusweb.inform.Finished import Finished
 from geniusweb.inform.Inform import Inform
@@ -24,6 +22,10 @@ from geniusweb.profileconnection.ProfileConnectionFactory import (
 from geniusweb.progress.ProgressRounds import ProgressRounds
 from tudelft_utilities_logging.Reporter import Reporter
 
+from utils.bid_codec import BidCodec
+from utils.frequency_counts import FrequencyCounts
+from utils.similarity_index import SimilarityIndex
+
 
 class Agent29(DefaultParty):
     """
@@ -57,11 +59,9 @@ class Agent29(DefaultParty):
         self._log_times = [np.log(i / 200) for i in range(1, 201)]
         self._log_times.insert(0, 0)
         self._e = 1.0
-        self._last_ten_bids_counts = {}
-        self._all_possible_bids: AllBidsList
-        self._all_possible_bids_utils = []
-        self._all_possible_bids_ord: list[Bid] = []
-        self._all_possible_bids_ord_utils = []
+        self._last_ten_bids_counts: FrequencyCounts = None
+        # all possible bids, as codes sorted on utility
+        self._similarity_index: SimilarityIndex = None
         self._num_possible_bids = 0
 
     def notifyChange(self, info: Inform):
@@ -150,8 +150,6 @@ class Agent29(DefaultParty):
         if self._last_received_bid is not None:
             self._all_opponent_bids.append(self._last_received_bid)
         if len(self._all_opponent_bids) != 0:
-            if len(self._all_opponent_bids) > 10:
-                self._uncount_oldest_bid()
             self._count_last_bid()
         # check if the last received offer of the opponent is good enough
         if self._isGood(self._last_received_bid):
@@ -181,7 +179,7 @@ class Agent29(DefaultParty):
 
     def _findBid(self) -> Bid:
         # find bids with utilities closest to the target utility
-        target_utility = Decimal(1.0 - 0.3 * self._progress.get(time.time() * 1000))
+        target_utility = 1.0 - 0.3 * self._progress.get(time.time() * 1000)
         bids_to_consider = self.bids_close_to_target_util(target_utility)
         # only keep bids with utility above reservation value
         acceptable_bids = self.remove_bids_below_reservation(bids_to_consider)
@@ -265,35 +263,16 @@ class Agent29(DefaultParty):
     """
 
     def initialise_bid_counts(self):
-        domain = self._profile.getProfile().getDomain()
-        domain_issues = domain.getIssues()
-
-        self._num_possible_bids = 1
-        for issue in domain_issues:
-            self._last_ten_bids_counts[issue] = {}
-            issue_values = domain.getValues(issue)
-            self._num_possible_bids *= issue_values.size()
-            for issue_value in issue_values:
-                self._last_ten_bids_counts[issue][issue_value] = 0
+        codec = BidCodec(self._profile.getProfile().getDomain())
+        self._num_possible_bids = codec.size
+        self._last_ten_bids_counts = FrequencyCounts(codec, window=10)
 
     """
-    Initializes a list of bids in the agent's bid space, and sorts them as well. 
+    Initializes the agent's bid space, with the codes of all bids sorted on utility.
     """
 
     def initialise_all_possible_bids(self):
-        domain = self._profile.getProfile().getDomain()
-        self._all_possible_bids = AllBidsList(domain)
-        for i in range(self._all_possible_bids.size()):
-            current_bid = self._all_possible_bids.get(i)
-            self._all_possible_bids_utils.append(self._profile.getProfile().getUtility(current_bid))
-        self._all_possible_bids_utils = np.array(self._all_possible_bids_utils)
-        sort_indices = np.argsort(self._all_possible_bids_utils)
-        for i in range(self._all_possible_bids.size()):
-            self._all_possible_bids_ord.append(self._all_possible_bids.get(sort_indices[i]))
-
-        self._all_possible_bids_ord_utils = self._all_possible_bids_utils[sort_indices]
-        self._all_possible_bids_ord_utils = self._all_possible_bids_ord_utils = \
-            self._all_possible_bids_ord_utils.astype('float')
+        self._similarity_index = SimilarityIndex(self._profile.getProfile())
 
     """
     Initializes a reservation value, if a Reservation Bid is defined in the profile. 
@@ -305,46 +284,29 @@ class Agent29(DefaultParty):
             self._reservation_value = self._profile.getProfile().getUtility(reservation_bid)
 
     """
-    If the last received bid is not empty, add it to the histogram
+    If the last received bid is not empty, add it to the histogram. The histogram only keeps the last ten bids, the
+    11th most recent (i.e. the no longer relevant) bid is removed from it.
     """
 
     def _count_last_bid(self):
-        domain = self._profile.getProfile().getDomain()
-        domain_issues = domain.getIssues()
-
-        for issue in domain_issues:
-            opponent_bid = self._last_received_bid
-            opp_bid_value = opponent_bid.getValue(issue)
-            if opp_bid_value is not None:  # measure against the stupid agent
-                self._last_ten_bids_counts[issue][opp_bid_value] += 1
-
-    """
-    Remove the 11th most recent (i.e. the no longer relevant) bid from the histogram
-    """
-
-    def _uncount_oldest_bid(self):
-        domain = self._profile.getProfile().getDomain()
-        domain_issues = domain.getIssues()
-
-        for issue in domain_issues:
-            oldest_relevant_opp_bid = self._all_opponent_bids[-10]
-            opp_bid_value = oldest_relevant_opp_bid.getValue(issue)
-            self._last_ten_bids_counts[issue][opp_bid_value] -= 1
+        opponent_bid = self._last_received_bid
+        issues = self._last_ten_bids_counts.codec.issues
+        if all(opponent_bid.getValue(issue) is not None for issue in issues):  # measure against the stupid agent
+            self._last_ten_bids_counts.add(opponent_bid)
 
     """
     Return a number between 0 and 1 indicating how close the given bid is to the current opponent preference model.
     """
 
     def domain_similarity(self, bid: Bid):
-        domain = self._profile.getProfile().getDomain()
-        domain_issues = domain.getIssues()
-        num_issues = len(domain_issues)
+        codec = self._last_ten_bids_counts.codec
+        num_issues = len(codec.issues)
 
         similarity = 0.
 
-        for issue in domain_issues:
-            opp_bid_value = bid.getValue(issue)
-            similarity += (self._last_ten_bids_counts[issue][opp_bid_value] / 10.0) / num_issues
+        value_indices = codec.value_indices([codec.encode(bid)])[0]
+        for issue_index, value_index in enumerate(value_indices):
+            similarity += (self._last_ten_bids_counts.counts(issue_index)[value_index] / 10.0) / num_issues
 
         return similarity
 
@@ -353,12 +315,18 @@ class Agent29(DefaultParty):
     """
 
     def sort_bids_by_similarity(self, bids_to_consider) -> list[Bid]:
-        bid_similarities = []
-        for i in bids_to_consider:
-            bid_similarities.append(self.domain_similarity(i))
+        # domain_similarity for all bids (given as codes) at once: per issue, the score of a
+        # value is its share of the last ten opponent bids
+        codec = self._similarity_index.codec
+        num_issues = len(codec.issues)
+        value_scores = [
+            (self._last_ten_bids_counts.counts(issue_index) / 10.0) / num_issues
+            for issue_index in range(num_issues)
+        ]
+        bid_similarities = self._similarity_index.similarities(bids_to_consider, value_scores)
 
         bid_similarities_sort_index = np.argsort(bid_similarities)[::-1]
-        sorted_bids = np.array(bids_to_consider)[bid_similarities_sort_index]
+        sorted_bids = [codec.decode(code) for code in bids_to_consider[bid_similarities_sort_index]]
 
         return sorted_bids
 
@@ -417,42 +385,41 @@ class Agent29(DefaultParty):
         return chosen_bid
 
     """
-    From all possible bids, extract those that are close to the target utility.
+    From all possible bids, extract (the codes of) those that are close to the target utility.
     2 * fraction * 100% bids are expected to be extracted, but it can be less when the target utility is very high
     (not enough bids with higher utility) or very low (not enough bids with lower utility)
     """
 
     def bids_close_to_target_util(self, target_utility, fraction=0.025):
-        util_distances = np.abs(np.subtract(self._all_possible_bids_ord_utils, float(target_utility)))
-        closest_bid_index = np.argmin(util_distances)
+        sorted_utils = self._similarity_index.get_sorted_utilities()
+        # the bid closest to the target utility is one of the neighbours of its sorted position
+        position = int(np.searchsorted(sorted_utils, target_utility))
+        candidates = [p for p in (position - 1, position) if 0 <= p < len(sorted_utils)]
+        closest_bid_index = min(candidates, key=lambda p: abs(sorted_utils[p] - target_utility))
         radius = int(fraction * self._num_possible_bids)  # number of bids to consider
-        bids_to_consider = self._all_possible_bids_ord[max(0, closest_bid_index - radius):
-                                                       min(len(self._all_possible_bids_ord) - 1,
-                                                           closest_bid_index + radius)]
+        bids_to_consider = self._similarity_index.get_sorted_codes()[max(0, closest_bid_index - radius):
+                                                                     min(len(sorted_utils) - 1,
+                                                                         closest_bid_index + radius)]
         return bids_to_consider
 
     """
-    From the given list of bids, remove all those that cannot be offered because of utility below reservation value.
+    From the given codes of bids, remove all those that cannot be offered because of utility below reservation value.
     """
 
     def remove_bids_below_reservation(self, bids_to_consider):
-        acceptable_bids = []
-        for i in range(len(bids_to_consider)):
-            if self._profile.getProfile().getUtility(bids_to_consider[i]) >= self._reservation_value:
-                acceptable_bids.append(bids_to_consider[i])
-        return acceptable_bids
+        utils = self._similarity_index.evaluator.utilities(bids_to_consider)
+        return bids_to_consider[utils >= float(self._reservation_value)]
 
     """
     From all possible bids, choose the one with lowest utility that is higher than the reservation value.
     """
 
     def find_first_acceptable_bid(self):
-        best_bid = None
-        for i in range(len(self._all_possible_bids_ord)):
-            if self._all_possible_bids_ord_utils[i] >= self._reservation_value:
-                best_bid = self._all_possible_bids_ord[i]
-                break
-        return best_bid
+        sorted_utils = self._similarity_index.get_sorted_utilities()
+        position = int(np.searchsorted(sorted_utils, float(self._reservation_value), side="left"))
+        if position == len(sorted_utils):
+            return None
+        return self._similarity_index.decode(self._similarity_index.get_sorted_codes()[position])
 
     """
     Make a fixed number of attempts at finding a random bid that would be acceptable.
@@ -460,7 +427,7 @@ class Agent29(DefaultParty):
 
     def find_random_acceptable_bid(self, best_bid, best_bid_util, attempts=100):
         for _ in range(attempts):
-            bid = self._all_possible_bids.get(randint(0, self._all_possible_bids.size() - 1))
+            bid = self._similarity_index.decode(randint(0, self._num_possible_bids - 1))
             if self._isGoodDomainAgent(bid):  # if the bid is good, offer it
                 best_bid = bid
                 break
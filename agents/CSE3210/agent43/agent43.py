@@ -26,7 +26,7 @@ from decimal import Context
 from typing import Dict, Optional
 from geniusweb.progress.ProgressRounds import ProgressRounds
 from geniusweb.bidspace.BidsWithUtility import BidsWithUtility
-from .extended_util_space_group_43 import ExtendedUtilSpace
+from agents.time_dependent_agent.extended_util_space import ExtendedUtilSpace
 from .frequency_opponent_model_group_43 import FrequencyOpponentModel
 from tudelft_utilities_logging.Reporter import Reporter
 
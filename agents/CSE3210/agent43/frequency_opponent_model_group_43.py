@@ -12,7 +12,9 @@ from geniusweb.actions.Offer import Offer
 from geniusweb.references.Parameters import Parameters
 from geniusweb.utils import val, HASH, toStr
 
-class FrequencyOpponentModel(UtilitySpace, OpponentModel):
+from utils.lazy_snapshot import LazySnapshotFrequencies
+
+class FrequencyOpponentModel(LazySnapshotFrequencies, UtilitySpace, OpponentModel):
     '''
     implements an {@link OpponentModel} by counting frequencies of bids placed by
     the opponent.
@@ -22,7 +24,9 @@ class FrequencyOpponentModel(UtilitySpace, OpponentModel):
     (as you might expect as {@link NumberValueSetUtilities} is only affected by
     the endpoints).
     <p>
-    immutable.
+    immutable: WithAction updates the frequencies in place and hands them over to
+    the new model, the old model restores its own frequencies only if it is used
+    again (see LazySnapshotFrequencies).
     '''
 
     _DECIMALS = 4  # accuracy of our computations.
@@ -101,7 +105,8 @@ class FrequencyOpponentModel(UtilitySpace, OpponentModel):
 
         # Method altered so that it computes utilities in a more accurate way than just frequencies.
         bid: Bid = action.getBid()
-        newFreqs: Dict[str, Dict[Value, float]] = self.cloneMap(self._bidFrequencies)
+        newFreqs: Dict[str, Dict[Value, float]] = self._bidFrequencies
+        undo = {}
         for issue in self._domain.getIssues():  # type:ignore
             freqs: Dict[Value, float] = newFreqs[issue]
             values_in_issue = len(newFreqs[issue])
@@ -114,17 +119,15 @@ class FrequencyOpponentModel(UtilitySpace, OpponentModel):
 
                 for i in freqs:
                     if freqs[i] == 0:
-                        freqs[i] = avg_value
+                        self.set_frequency(undo, freqs, issue, i, avg_value)
 
-                freqs[value] = oldfreq + 0.05  # type:ignore
-                if freqs[value] > 1:
-                    freqs[value] = 1
+                self.set_frequency(undo, freqs, issue, value, min(oldfreq + 0.05, 1))
                 factor = values_in_issue * avg_value / sum(freqs.values())
                 for k in freqs:
-                    freqs[k] = freqs[k] * factor
+                    self.set_frequency(undo, freqs, issue, k, freqs[k] * factor)
 
-        return FrequencyOpponentModel(self._domain, newFreqs,
-                                      self._totalBids + 1, self._resBid)
+        return self.hand_over(FrequencyOpponentModel(self._domain, newFreqs,
+                                                     self._totalBids + 1, self._resBid), undo)
 
     def getCounts(self, issue: str) -> Dict[Value, float]:
         '''
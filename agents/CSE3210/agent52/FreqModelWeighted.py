@@ -1,19 +1,47 @@
+from geniusweb.actions.Action import Action
+from geniusweb.actions.Offer import Offer
 from geniusweb.opponentmodel import FrequencyOpponentModel
 from decimal import Decimal
 from geniusweb.issuevalue.Domain import Domain
 from geniusweb.issuevalue.Bid import Bid
 from typing import Dict, Optional
 from geniusweb.issuevalue.Value import Value
+from geniusweb.progress.Progress import Progress
 from geniusweb.utils import val
 import numpy as np
 
+from utils.lazy_snapshot import LazySnapshotFrequencies
 
-class FreqModelWeighted(FrequencyOpponentModel.FrequencyOpponentModel):
+
+class FreqModelWeighted(LazySnapshotFrequencies, FrequencyOpponentModel.FrequencyOpponentModel):
 
     def __init__(self, domain: Optional[Domain],
                  freqs: Dict[str, Dict[Value, int]], total: int,
                  resBid: Optional[Bid]):
-        super.__init__(domain, freqs, total, resBid)
+        super().__init__(domain, freqs, total, resBid)
+
+    """
+    Same update as FrequencyOpponentModel, but the frequencies are updated in place and handed over to the new model
+    instead of copied (see LazySnapshotFrequencies)
+    """
+    # Override
+    def WithAction(self, action: Action, progress: Progress) -> "FreqModelWeighted":
+        if self._domain == None:
+            raise ValueError("domain is not initialized")
+
+        if not isinstance(action, Offer):
+            return self
+
+        bid: Bid = action.getBid()
+        newFreqs: Dict[str, Dict[Value, int]] = self._bidFrequencies
+        undo = {}
+        for issue in self._domain.getIssues():
+            freqs: Dict[Value, int] = newFreqs[issue]
+            value = bid.getValue(issue)
+            if value != None:
+                self.set_frequency(undo, freqs, issue, value, freqs.get(value, 0) + 1)
+
+        return self.hand_over(FreqModelWeighted(self._domain, newFreqs, self._totalBids + 1, self._resBid), undo)
 
     # Override
     def getUtility(self, bid: Bid) -> Decimal:
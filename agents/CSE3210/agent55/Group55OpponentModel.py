@@ -11,8 +11,10 @@ from geniusweb.actions.Offer import Offer
 from geniusweb.references.Parameters import Parameters
 from geniusweb.utils import val, HASH, toStr
 
+from utils.lazy_snapshot import LazySnapshotFrequencies
 
-class FrequencyOpponentModel(UtilitySpace, OpponentModel):
+
+class FrequencyOpponentModel(LazySnapshotFrequencies, UtilitySpace, OpponentModel):
     '''
     implements an {@link OpponentModel} by counting frequencies of bids placed by
     the opponent.
@@ -22,7 +24,9 @@ class FrequencyOpponentModel(UtilitySpace, OpponentModel):
     (as you might expect as {@link NumberValueSetUtilities} is only affected by
     the endpoints).
     <p>
-    immutable.
+    immutable: WithAction updates the frequencies in place and hands them over to
+    the new model, the old model restores its own frequencies only if it is used
+    again (see LazySnapshotFrequencies).
     '''
 
     _DECIMALS = 4  # accuracy of our computations.
@@ -117,8 +121,8 @@ class FrequencyOpponentModel(UtilitySpace, OpponentModel):
             return self
 
         bid: Bid = action.getBid()
-        newFreqs: Dict[str, Dict[Value, int]
-                       ] = self.cloneMap(self._bidFrequencies)
+        newFreqs: Dict[str, Dict[Value, int]] = self._bidFrequencies
+        undo = {}
         for issue in self._domain.getIssues():  # type:ignore
             freqs: Dict[Value, int] = newFreqs[issue]
             value = bid.getValue(issue)
@@ -147,7 +151,7 @@ class FrequencyOpponentModel(UtilitySpace, OpponentModel):
                 oldfreq = 0
                 if value in freqs:
                     oldfreq = freqs[value]
-                freqs[value] = oldfreq + 1  # type:ignore
+                self.set_frequency(undo, freqs, issue, value, oldfreq + 1)
 
         """
         Added Group55:
@@ -171,8 +175,8 @@ class FrequencyOpponentModel(UtilitySpace, OpponentModel):
         End of Group55 contribution
         """
 
-        return FrequencyOpponentModel(self._domain, newFreqs,
-                                      self._totalBids+1, self._resBid)
+        return self.hand_over(FrequencyOpponentModel(self._domain, newFreqs,
+                                                     self._totalBids+1, self._resBid), undo)
 
     def getCounts(self, issue: str) -> Dict[Value, int]:
         '''
@@ -2,8 +2,10 @@ from decimal import Decimal
 from random import randint
 from typing import cast
 
+import numpy as np
 from geniusweb.bidspace.AllBidsList import AllBidsList
 
+from utils.bid_space_index import BidSpaceIndex
 from ..Constants import Constants
 
 
@@ -15,27 +17,15 @@ class TradeOff:
         self._tolerance = Constants.iso_bids_tolerance
         self._domain = domain
         self._issues = domain.getIssues()
-        self._sorted_bids = self._sort_bids(AllBidsList(self._domain))
+        # all bids sorted on utility
+        self._index = BidSpaceIndex(self._profile)
 
-    # sort bids on Utility descending
-    def _sort_bids(self, all_bids):
-        bids = []
-        for b in all_bids:
-            bid = {"bid": b, "utility": self._profile.getUtility(b)}
-            bids.append(bid)
-        return sorted(bids, key=lambda d: d['utility'], reverse=True)
-
-    # return set of iso curve bids
+    # return set of iso curve bids, the n with the highest utility strictly within the tolerance of the offer
     def _iso_bids(self, n=5):
-        bids = []
-        i = 0
-        for bid in self._sorted_bids:
-            if self._offer + self._tolerance > bid["utility"] > self._offer - self._tolerance:
-                bids.append(bid["bid"])
-                i += 1
-            if i == n:
-                break
-        return bids
+        min_utility = np.nextafter(self._offer - self._tolerance, np.inf)
+        max_utility = np.nextafter(self._offer + self._tolerance, -np.inf)
+        codes = self._index.get_codes(min_utility, max_utility)[:n]
+        return [self._index.decode(code) for code in codes]
 
     # return a random bid
     def _get_random_bid(self):
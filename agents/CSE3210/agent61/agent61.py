@@ -25,6 +25,8 @@ from geniusweb.profileconnection.ProfileConnectionFactory import (
 from geniusweb.progress.ProgressRounds import ProgressRounds
 from tudelft_utilities_logging.Reporter import Reporter
 
+from utils.bid_codec import BidCodec, BidHistory
+
 
 class Agent61(DefaultParty):
     """
@@ -36,7 +38,7 @@ class Agent61(DefaultParty):
         self.getReporter().log(logging.INFO, "party is initialized")
         self._profile = None
         self._received_bids = list()
-        self._sent_bids = list()
+        self._sent_bids: BidHistory = None
         self._best_bid = None
         self._last_received_bid: Bid = None
         self._last_sent_bid: Bid = None
@@ -63,6 +65,7 @@ class Agent61(DefaultParty):
             self._profile = ProfileConnectionFactory.create(
                 info.getProfile().getURI(), self.getReporter()
             )
+            self._sent_bids = BidHistory(BidCodec(self._profile.getProfile().getDomain()))
         # ActionDone is an action send by an opponent (an offer or an accept)
         elif isinstance(info, ActionDone):
             action: Action = cast(ActionDone, info).getAction()
@@ -187,7 +190,7 @@ class Agent61(DefaultParty):
             selected_bid = self._findCounterBidMutate()
 
         self._last_sent_bid = selected_bid
-        self._sent_bids.append(copy.deepcopy(selected_bid))
+        self._sent_bids.append(selected_bid)
         return selected_bid
     
     # Creates a bid by mutating the agent's ideal bid to fit closer
@@ -21,6 +21,8 @@ from geniusweb.profileconnection.ProfileConnectionFactory import (ProfileConnect
 from geniusweb.progress.ProgressRounds import ProgressRounds
 from tudelft_utilities_logging.Reporter import Reporter
 
+from utils.utility_evaluator import UtilityEvaluator
+
 
 class Agent64(DefaultParty):
     """
@@ -34,6 +36,7 @@ class Agent64(DefaultParty):
         super().__init__(reporter)
         self.getReporter().log(logging.INFO, "party is initialized")
         self._profile = None
+        self._evaluator: UtilityEvaluator = None
         self._last_received_bid: Bid = None
         self._last_received_action: Action = None
         self._opponent_model: FrequencyOpponentModel = None
@@ -120,6 +123,8 @@ class Agent64(DefaultParty):
 
     # execute a turn
     def _myTurn(self):
+        if self._evaluator is None:
+            self._evaluator = UtilityEvaluator(self._profile.getProfile())
         self._opponentModelling()
 
         # Store all received bids for acceptance purposes
@@ -128,22 +133,22 @@ class Agent64(DefaultParty):
         if self._last_received_bid is not None:
             # Store past 20 recieved bid utilities
             if (len(self._past_20_offers) < 20):
-                self._past_20_offers.append(self._profile.getProfile().getUtility(self._last_received_bid))
+                self._past_20_offers.append(self._evaluator.utility(self._last_received_bid))
             else:
                 self._past_20_offers = self._past_20_offers[1:]
 
-            if (self._profile.getProfile().getUtility(self._last_received_bid) / np.mean(
+            if (self._evaluator.utility(self._last_received_bid) / np.mean(
                     self._past_20_offers) > self._concesssion_treshold):
                 self._opponent_concedes = True
-            if (self._profile.getProfile().getUtility(self._last_received_bid) / np.mean(
+            if (self._evaluator.utility(self._last_received_bid) / np.mean(
                     self._past_20_offers) < self._concesssion_treshold):
                 self._opponent_concedes = False
                 self._can_modify = True
 
-        profile = self._profile.getProfile()
-        if self._best_bid is None or profile.getUtility(self._last_received_bid) > profile.getUtility(self._best_bid):
+        utility = self._evaluator.utility
+        if self._best_bid is None or utility(self._last_received_bid) > utility(self._best_bid):
             self._best_bid = self._last_received_bid
-        if self._lowest_bid is None or profile.getUtility(self._last_received_bid) < profile.getUtility(
+        if self._lowest_bid is None or utility(self._last_received_bid) < utility(
                 self._lowest_bid):
             self._lowest_bid = self._last_received_bid
 
@@ -167,9 +172,8 @@ class Agent64(DefaultParty):
             return False
 
         current_round = self._progress.get(time.time() * 1000)
-        profile = self._profile.getProfile()
-        current_offer = profile.getUtility(self._last_received_bid)
-        own_bid_util = profile.getUtility(bid)
+        current_offer = self._evaluator.utility(self._last_received_bid)
+        own_bid_util = self._evaluator.utility(bid)
 
         # if near deadline
         if current_round >= 0.98: # or datetime.now() >= self.accept_offer_now_time:
@@ -177,7 +181,7 @@ class Agent64(DefaultParty):
             bids = []
             for offer in self._all_received_offers[-window:]:
                 if offer:
-                    bids.append(profile.getUtility(offer) * self._opponent_model.getUtility(offer))
+                    bids.append(self._evaluator.utility(offer) * float(self._opponent_model.getUtility(offer)))
 
             # (This max method checks if the current offer is better than the all the offers in the window)
             if current_offer >= np.max(bids):
@@ -217,25 +221,25 @@ class Agent64(DefaultParty):
     def get_random_bid(self):
         available_bids = AllBidsList(self._profile.getProfile().getDomain())
         random_better_bids = [bid for bid in available_bids if
-                              self.cmin <= self._profile.getProfile().getUtility(bid) <= self.cmax]
+                              self.cmin <= self._evaluator.utility(bid) <= self.cmax]
         if len(random_better_bids) == 0:
             random_better_bids = [
-                max(map(lambda bid: (bid, self._profile.getProfile().getUtility(bid)), available_bids),
+                max(map(lambda bid: (bid, self._evaluator.utility(bid)), available_bids),
                     key=lambda tup: tup[1])[0]]
             return random_better_bids[0]
         best_bid_for_opponent = [
             max(map(
-                lambda bid: (bid, self._opponent_model.getUtility(bid) * self._profile.getProfile().getUtility(bid)),
+                lambda bid: (bid, float(self._opponent_model.getUtility(bid)) * self._evaluator.utility(bid)),
                 random_better_bids),
                 key=lambda tup: tup[1])[0]]
         return best_bid_for_opponent[0]
 
     def get_true_random_bid(self):
         available_bids = AllBidsList(self._profile.getProfile().getDomain())
-        random_better_bids = [bid for bid in available_bids if self._profile.getProfile().getUtility(bid) >= self.cmin]
+        random_better_bids = [bid for bid in available_bids if self._evaluator.utility(bid) >= self.cmin]
         if len(random_better_bids) == 0:
             random_better_bids = [
-                max(map(lambda bid: (bid, self._profile.getProfile().getUtility(bid)), available_bids),
+                max(map(lambda bid: (bid, self._evaluator.utility(bid)), available_bids),
                     key=lambda tup: tup[1])[0]]
         return np.random.choice(random_better_bids)
 
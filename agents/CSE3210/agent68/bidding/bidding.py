@@ -18,7 +18,7 @@ from typing import cast, Dict, List, Set, Collection
 
 # from main.bidding.extended_util_space import ExtendedUtilSpace
 # from Group68_NegotiationAssignment_Agent.Group68_NegotiationAssignment_Agent.bidding.extended_util_space import ExtendedUtilSpace
-from .extended_util_space import ExtendedUtilSpace
+from agents.time_dependent_agent.extended_util_space import ExtendedUtilSpace
 from geniusweb.progress.Progress import Progress
 import numpy as np
 
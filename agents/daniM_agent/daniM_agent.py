@@ -1,6 +1,5 @@
 import logging
 
-from collections import defaultdict
 from time import time
 from typing import cast, Optional
 
@@ -9,7 +8,6 @@ from geniusweb.actions.Accept import Accept
 from geniusweb.actions.Action import Action
 from geniusweb.actions.Offer import Offer
 from geniusweb.actions.PartyId import PartyId
-from geniusweb.bidspace.AllBidsList import AllBidsList
 from geniusweb.inform.ActionDone import ActionDone
 from geniusweb.inform.Finished import Finished
 from geniusweb.inform.Inform import Inform
@@ -29,17 +27,31 @@ from geniusweb.progress.ProgressTime import ProgressTime
 from geniusweb.references.Parameters import Parameters
 from tudelft_utilities_logging.ReportToLogger import ReportToLogger
 
-from agents.daniM_agent.utils.opponent_model import OpponentModel
 from agents.daniM_agent.enums import Fairness, Stance, NegotiationType
 
 from agents.daniM_agent.negotiation_strategies.negotiation_strategy_factory import NegotiationStrategyFactory
 
 from agents.daniM_agent.negotiation_strategies.negotiation_strategy import NegotiationStrategy
 from agents.daniM_agent.negotiation_strategies.aggressive_early_offers_strategy import AggressiveEarlyOffersStrategy
+from utils.bid_codec import BidCounter, BidHistory
+from utils.array_opponent_model import ArrayOpponentModel
+from utils.bid_index_cache import load_bid_space_index
+from utils.bid_space_index import BidSpaceIndex
+from utils import opponent_behaviour
+from utils.opponent_behaviour import OpponentBehaviour
 
 # Time limit for exploration phase -> 10% of the negotiation time
 EXPLORATION_TIME_LIMIT = 0.1
 
+# boulware opponents concede too, there is no separate negotiation type for them
+NEGOTIATION_TYPES = {
+    opponent_behaviour.BOULWARE: NegotiationType.CONCEDER,
+    opponent_behaviour.CONCEDER: NegotiationType.CONCEDER,
+    opponent_behaviour.HARDLINER: NegotiationType.HARDLINER,
+    opponent_behaviour.RANDOM: NegotiationType.RANDOM,
+    opponent_behaviour.UNKNOWN: NegotiationType.UNKNOWN,
+}
+
 
 class DaniMAgent(DefaultParty):
 
@@ -47,11 +59,13 @@ class DaniMAgent(DefaultParty):
         super().__init__()
         self.logger: ReportToLogger = self.getReporter()
 
-        self.all_bids: list[Bid] = []
-        self.bids_times: dict[Bid, int] = defaultdict(int)
+        # bids are kept as codes of the bid index, and only decoded when they are scored or sent
+        self.all_bids: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.bid_index: BidSpaceIndex = None
+        self.bids_times: BidCounter = None
         self.last_received_bid: Bid = None
         self.last_bid_sent_index: int = 0
-        self.own_bids: list[Bid] = []
+        self.own_bids: BidHistory = None
 
         self.domain: Domain = None
         self.parameters: Parameters = None
@@ -67,8 +81,9 @@ class DaniMAgent(DefaultParty):
         self.alpha: float = 0.95
         self.eps: float = 0.1
 
-        self.opponent_model: OpponentModel = None
-        self.opponent_utilities: list[float] = []
+        self.opponent_model: ArrayOpponentModel = None
+        # running statistics of our utility of the opponent's offers
+        self.opponent_behaviour: OpponentBehaviour = OpponentBehaviour()
         self.opponent_negotiation_type: NegotiationType = NegotiationType.UNKNOWN
         self.opponent_fairness: Fairness = Fairness.FAIR
         self.opponent_stance: Stance = Stance.NEUTRAL
@@ -113,12 +128,11 @@ class DaniMAgent(DefaultParty):
             batna_bid = self.profile.getReservationBid()
             self.batna = self.profile.getUtility(batna_bid) if batna_bid is not None else 0
 
-            # compose a list of all possible bids
-            all_bids_list = AllBidsList(self.domain)
-            self.all_bids = []
-            for i in range(all_bids_list.size()):
-                self.all_bids.append(all_bids_list.get(i))
-            self.all_bids.sort(key=lambda x: self.profile.getUtility(x), reverse=True)
+            # compose a list of all possible bids, sorted by our utility
+            self.bid_index = load_bid_space_index(self.profile)
+            self.all_bids = self.bid_index.get_codes()
+            self.bids_times = BidCounter(self.bid_index.codec)
+            self.own_bids = BidHistory(self.bid_index.codec)
 
         # ActionDone informs you of an action (an offer or an accept)
         # that is performed by one of the agents (including yourself).
@@ -242,7 +256,7 @@ class DaniMAgent(DefaultParty):
         # if it is an offer, set the last received bid
         if isinstance(action, Offer):
             if self.opponent_model is None:
-                self.opponent_model = OpponentModel(self.domain)
+                self.opponent_model = ArrayOpponentModel(self.domain)
 
             bid = cast(Offer, action).getBid()
 
@@ -250,34 +264,23 @@ class DaniMAgent(DefaultParty):
             self.opponent_model.update(bid)
             # set bid as last received
             self.last_received_bid = bid
-            if self.profile and bid:
-                self.opponent_utilities.append(float(self.profile.getUtility(bid)))
-
             progress = self.progress.get(int(time() * 1000))
+            if self.profile and bid:
+                self.opponent_behaviour.update(float(self.profile.getUtility(bid)), progress)
 
             # Classification after progress exceeds 10% of the negotiation time
             if (not self.classification_done) and (progress >= EXPLORATION_TIME_LIMIT):
-                diffs = np.diff(self.opponent_utilities)
-                positive_diffs = np.sum(diffs > 0)
-                negative_diffs = np.sum(diffs < 0)
-                # Check if the opponent is a random agent -> considered random if the offers fluctuate between being positive or negative for their utility
-                if positive_diffs > int(0.45 * len(self.opponent_utilities)) and negative_diffs > int(
-                        0.45 * len(self.opponent_utilities)):
-                    self.opponent_negotiation_type = NegotiationType.RANDOM
-                else:
-                    diff = self.opponent_utilities[-1] - self.opponent_utilities[0]
-                    if diff > 0.15:
-                        self.opponent_negotiation_type = NegotiationType.CONCEDER
-                    else:
-                        self.opponent_negotiation_type = NegotiationType.HARDLINER
+                # random if the offers fluctuate between being better and worse for us, a
+                # conceder if they got more than 0.15 better, a hardliner otherwise
+                self.opponent_negotiation_type = NEGOTIATION_TYPES[self.opponent_behaviour.classify()]
                 self.classification_done = True
                 self.adjust_strategy_by_opponent_type()
 
                 # Sort the bids condescendingly by the total welfare score
                 self.last_bid_sent_index = 0
-                self.all_bids.sort(
-                    key=lambda x: float(self.profile.getUtility(x)) + self.opponent_model.get_predicted_utility(x),
-                    reverse=True)
+                welfare = self.bid_index.evaluator.utilities(self.all_bids) + self.opponent_model.predict_batch(
+                    self.all_bids)
+                self.all_bids = self.all_bids[np.argsort(-welfare, kind="stable")]
 
             # Update the opponent model with the last bid
             self.adjust_opponent_fairness(bid)
@@ -352,12 +355,13 @@ class DaniMAgent(DefaultParty):
         # Right boundary bounded on the search space length
         right_boundary: int = min(int(self.last_bid_sent_index + window_size), len(self.all_bids))
         # Do not include last sent bid if we already sent it 10 times
-        move_on: bool = all(e == self.own_bids[-1] for e in self.own_bids[-10:]) if 10 <= len(self.own_bids) else False
+        last_codes = self.own_bids.last_codes(10)
+        move_on: bool = bool(np.all(last_codes == last_codes[-1])) if len(last_codes) == 10 else False
 
         for i in range(self.last_bid_sent_index + move_on, right_boundary):
-            bid = self.all_bids[i]
+            bid = self.bid_index.decode(self.all_bids[i])
             bid_score = self.negotiation_strategy.score_bid(bid, self)
-            own_utility = self.profile.getUtility(bid)
+            own_utility = self.bid_index.get_utility(bid)
             # Find best bid above our reservation value
             if bid_score > best_bid_score and own_utility > self.reservation_value:
                 best_bid_score, best_bid, best_bid_index = bid_score, bid, i
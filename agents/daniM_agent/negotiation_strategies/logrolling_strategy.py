@@ -44,8 +44,9 @@ class LogrollingStrategy(NegotiationStrategy):
 
         # sort issues based on predicted opponent weights
         opponent_weights: dict[str, float] = dict()
-        for issue, issue_estimator in agent.opponent_model.issue_estimators.items():
-            opponent_weights[issue] = issue_estimator.weight
+        issue_weights = agent.opponent_model.get_issue_weights()
+        for issue, weight in zip(agent.opponent_model.codec.issues, issue_weights):
+            opponent_weights[issue] = weight
         opponent_weights = OrderedDict(sorted(opponent_weights.items(), key=lambda item: item[1]))
 
         # get the target issue and value for the own agent
@@ -65,12 +66,12 @@ class LogrollingStrategy(NegotiationStrategy):
                 max_own_utility = own_values_and_utilities.getUtility(value)
 
         # get the target issue and value for the opponent agent
-        opponent_target_value_tracker = agent.opponent_model.issue_estimators[opponent_target_issue].value_trackers
+        opponent_target_value_counts = agent.opponent_model.get_value_counts(opponent_target_issue)
         opponent_target_value: str = ""
         max_target_value_count = -1
-        for value, value_estimator in opponent_target_value_tracker.items():
-            if value_estimator.count > max_target_value_count:
-                max_target_value_count = value_estimator.count
+        for value, count in opponent_target_value_counts.items():
+            if count > max_target_value_count:
+                max_target_value_count = count
                 opponent_target_value = value
 
         return {own_target_issue: own_target_value, opponent_target_issue: opponent_target_value}
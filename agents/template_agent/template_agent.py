@@ -1,5 +1,4 @@
 import logging
-from random import randint
 from time import time
 from typing import cast
 
@@ -7,7 +6,6 @@ from geniusweb.actions.Accept import Accept
 from geniusweb.actions.Action import Action
 from geniusweb.actions.Offer import Offer
 from geniusweb.actions.PartyId import PartyId
-from geniusweb.bidspace.AllBidsList import AllBidsList
 from geniusweb.inform.ActionDone import ActionDone
 from geniusweb.inform.Finished import Finished
 from geniusweb.inform.Inform import Inform
@@ -27,6 +25,7 @@ from geniusweb.progress.ProgressTime import ProgressTime
 from geniusweb.references.Parameters import Parameters
 from tudelft_utilities_logging.ReportToLogger import ReportToLogger
 
+from utils.joint_score_search import JointScoreSearch
 from .utils.opponent_model import OpponentModel
 
 
@@ -50,6 +49,7 @@ class TemplateAgent(DefaultParty):
 
         self.last_received_bid: Bid = None
         self.opponent_model: OpponentModel = None
+        self.bid_search: JointScoreSearch = None
         self.logger.log(logging.INFO, "party is initialized")
 
     def notifyChange(self, data: Inform):
@@ -81,6 +81,9 @@ class TemplateAgent(DefaultParty):
             self.domain = self.profile.getDomain()
             profile_connection.close()
 
+            # index of all bids, to score them all at once when searching for a bid
+            self.bid_search = JointScoreSearch(self.profile)
+
         # ActionDone informs you of an action (an offer or an accept)
         # that is performed by one of the agents (including yourself).
         elif isinstance(data, ActionDone):
@@ -202,22 +205,19 @@ class TemplateAgent(DefaultParty):
         ]
         return all(conditions)
 
-    def find_bid(self) -> Bid:
-        # compose a list of all possible bids
-        domain = self.profile.getDomain()
-        all_bids = AllBidsList(domain)
-
-        best_bid_score = 0.0
-        best_bid = None
+    def find_bid(self, alpha: float = 0.95, eps: float = 0.1) -> Bid:
+        """Find the bid with the highest heuristic score (see score_bid). All bids are scored
+        at once, on very large domains a large random sample of them.
+        """
+        progress = self.progress.get(time() * 1000)
+        time_pressure = 1.0 - progress ** (1 / eps)
 
-        # take 500 attempts to find a bid according to a heuristic score
-        for _ in range(500):
-            bid = all_bids.get(randint(0, all_bids.size() - 1))
-            bid_score = self.score_bid(bid)
-            if bid_score > best_bid_score:
-                best_bid_score, best_bid = bid_score, bid
+        opponent_utilities = None
+        if self.opponent_model is not None:
+            opponent_utilities = self.opponent_model.get_issue_utilities(self.bid_search.codec)
 
-        return best_bid
+        best_code = self.bid_search.best(time_pressure, opponent_utilities, alpha)[0]
+        return self.bid_search.codec.decode(best_code)
 
     def score_bid(self, bid: Bid, alpha: float = 0.95, eps: float = 0.1) -> float:
         """Calculate heuristic score for a bid
@@ -1,14 +1,18 @@
 from collections import defaultdict
+from typing import List
 
+import numpy as np
 from geniusweb.issuevalue.Bid import Bid
 from geniusweb.issuevalue.DiscreteValueSet import DiscreteValueSet
 from geniusweb.issuevalue.Domain import Domain
 from geniusweb.issuevalue.Value import Value
 
+from utils.bid_codec import BidCodec, BidHistory
+
 
 class OpponentModel:
     def __init__(self, domain: Domain):
-        self.offers = []
+        self.offers = BidHistory(BidCodec(domain))
         self.domain = domain
 
         self.issue_estimators = {
@@ -56,6 +60,26 @@ class OpponentModel:
 
         return predicted_utility
 
+    def get_issue_utilities(self, codec: BidCodec) -> List[np.ndarray]:
+        """Predicted utility as one table per issue (in the order of the codec) that holds
+        the normalised issue weight times the value utility, such that the predicted
+        utility of a bid is the sum of its entries. Used to score many bids at once.
+        """
+        if len(self.offers) == 0:
+            return [np.zeros(radix) for radix in codec.radices]
+
+        issue_weights = [self.issue_estimators[issue].weight for issue in codec.issues]
+        total_issue_weight = sum(issue_weights)
+        if total_issue_weight == 0.0:
+            issue_weights = [1 / len(issue_weights) for _ in issue_weights]
+        else:
+            issue_weights = [iw / total_issue_weight for iw in issue_weights]
+
+        return [
+            iw * np.array([self.issue_estimators[issue].get_value_utility(v) for v in values], dtype=float)
+            for iw, issue, values in zip(issue_weights, codec.issues, codec.values)
+        ]
+
 
 class IssueEstimator:
     def __init__(self, value_set: DiscreteValueSet):
@@ -1,38 +1,65 @@
-from geniusweb.bidspace.BidsWithUtility import BidsWithUtility
-from geniusweb.bidspace.Interval import Interval
-from geniusweb.bidspace.IssueInfo import IssueInfo
 from geniusweb.issuevalue.Bid import Bid
-from geniusweb.issuevalue.Value import Value
 from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+from tudelft.utilities.immutablelist.AbstractImmutableList import AbstractImmutableList
 from tudelft.utilities.immutablelist.ImmutableList import ImmutableList
 from decimal import Decimal
 from typing import List
 
+import numpy as np
+
+from utils.bid_codec import BidCodec
+from utils.bid_index_cache import load_bid_space_index
+from utils.bid_space_index import PartitionedBidSpaceIndex
+
+# domains up to this size are indexed as a whole, larger ones are split in two halves
+INDEX_MAX_SIZE = 10_000_000
+# slack on the float interval bounds, so that bids that are exactly on a (Decimal) bound
+# are not lost to rounding
+UTILITY_EPSILON = 1e-9
+
 
 class ExtendedUtilSpace:
     """
     Inner class for TimeDependentParty, made public for testing purposes. This
     class may change in the future, use at your own risk.
+
+    All bids are indexed on utility once, after which getBids is a binary search
+    instead of a search through the issue tree on every call.
     """
 
     def __init__(self, space: LinearAdditive):
         self._utilspace = space
-        self._bidutils = BidsWithUtility.create(self._utilspace)
+        if BidCodec(space.getDomain()).size <= INDEX_MAX_SIZE:
+            self._index = load_bid_space_index(space)
+        else:
+            self._index = PartitionedBidSpaceIndex(space)
+        self._weighted_utils = self._computeWeightedUtils()
         self._computeMinMax()
         self._tolerance = self._computeTolerance()
 
+    def _computeWeightedUtils(self) -> List[List[Decimal]]:
+        """
+        @return per issue the weighted utilities of its values, as exact
+                Decimals
+        """
+        utilities = self._utilspace.getUtilities()
+        weighted_utils = []
+        for issue, values in zip(self._index.codec.issues, self._index.codec.values):
+            weight = self._utilspace.getWeight(issue)
+            weighted_utils.append(
+                [weight * utilities[issue].getUtility(val) for val in values]
+            )
+        return weighted_utils
+
     def _computeMinMax(self):
         """
-        Computes the fields minutil and maxUtil.
-        <p>
-        TODO this is simplistic, very expensive method and may cause us to run
-        out of time on large domains.
+        Computes the fields minutil and maxUtil, as the sum of the worst and best
+        weighted value utility of every issue.
         <p>
-        Assumes that utilspace and bidutils have been set properly.
+        Assumes that utilspace and weighted_utils have been set properly.
         """
-        range = self._bidutils.getRange()
-        self._minUtil = range.getMin()
-        self._maxUtil = range.getMax()
+        self._minUtil = sum((min(utils) for utils in self._weighted_utils), Decimal(0))
+        self._maxUtil = sum((max(utils) for utils in self._weighted_utils), Decimal(0))
 
         rvbid = self._utilspace.getReservationBid()
         if rvbid != None:
@@ -51,14 +78,10 @@ class ExtendedUtilSpace:
                 value.
         """
         tolerance = Decimal(1)
-        for iss in self._bidutils.getInfo():
-            if iss.getValues().size() > 1:
+        for utils in self._weighted_utils:
+            if len(utils) > 1:
                 # we have at least 2 values.
-                values: List[Decimal] = []
-                for val in iss.getValues():
-                    values.append(iss.getWeightedUtil(val))
-                values.sort()
-                values.reverse()
+                values = sorted(utils, reverse=True)
                 tolerance = min(tolerance, values[0] - values[1])
         return tolerance
 
@@ -72,8 +95,26 @@ class ExtendedUtilSpace:
         """
         @param utilityGoal the requested utility
         @return bids with utility inside [utilitygoal-{@link #tolerance},
-                utilitygoal]
+                utilitygoal], best bid first
         """
-        return self._bidutils.getBids(
-            Interval(utilityGoal - self._tolerance, utilityGoal)
+        codes = self._index.get_codes(
+            float(utilityGoal - self._tolerance) - UTILITY_EPSILON,
+            float(utilityGoal) + UTILITY_EPSILON,
         )
+        return _CodedBids(self._index.codec, codes)
+
+
+class _CodedBids(AbstractImmutableList[Bid]):
+    """
+    Immutable list of bids that are only decoded when they are accessed.
+    """
+
+    def __init__(self, codec: BidCodec, codes: np.ndarray):
+        self._codec = codec
+        self._codes = codes
+
+    def get(self, index: int) -> Bid:
+        return self._codec.decode(self._codes[int(index)])
+
+    def size(self) -> int:
+        return len(self._codes)
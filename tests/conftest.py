@@ -0,0 +1,56 @@
+from decimal import Decimal
+from itertools import product
+
+import pytest
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.DiscreteValue import DiscreteValue
+from geniusweb.issuevalue.DiscreteValueSet import DiscreteValueSet
+from geniusweb.issuevalue.Domain import Domain
+from geniusweb.profile.utilityspace.DiscreteValueSetUtilities import (
+    DiscreteValueSetUtilities,
+)
+from geniusweb.profile.utilityspace.LinearAdditiveUtilitySpace import (
+    LinearAdditiveUtilitySpace,
+)
+
+# small domain (2 * 3 * 4 = 24 bids) whose bid space can be checked exhaustively, with
+# the issues deliberately not in sorted order and value utilities not in value order
+VALUE_UTILITIES = {
+    "issueC": {"c0": "0.3", "c1": "1.0", "c2": "0.0", "c3": "0.65"},
+    "issueA": {"a0": "0.2", "a1": "1.0"},
+    "issueB": {"b0": "1.0", "b1": "0.45", "b2": "0.0"},
+}
+ISSUE_WEIGHTS = {"issueA": "0.5", "issueB": "0.3", "issueC": "0.2"}
+
+
+@pytest.fixture
+def domain() -> Domain:
+    return Domain(
+        "testdomain",
+        {
+            issue: DiscreteValueSet([DiscreteValue(value) for value in utilities])
+            for issue, utilities in VALUE_UTILITIES.items()
+        },
+    )
+
+
+@pytest.fixture
+def profile(domain) -> LinearAdditiveUtilitySpace:
+    utilities = {
+        issue: DiscreteValueSetUtilities(
+            {DiscreteValue(value): Decimal(u) for value, u in value_utilities.items()}
+        )
+        for issue, value_utilities in VALUE_UTILITIES.items()
+    }
+    weights = {issue: Decimal(weight) for issue, weight in ISSUE_WEIGHTS.items()}
+    return LinearAdditiveUtilitySpace(domain, "testprofile", utilities, weights)
+
+
+@pytest.fixture
+def all_bids(domain) -> list:
+    """Every bid of the domain, by brute force"""
+    issues = sorted(VALUE_UTILITIES)
+    return [
+        Bid({issue: DiscreteValue(value) for issue, value in zip(issues, values)})
+        for values in product(*(VALUE_UTILITIES[issue] for issue in issues))
+    ]
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from agents.template_agent.utils.opponent_model import OpponentModel
+from utils import array_opponent_model
+from utils.array_opponent_model import ArrayOpponentModel
+
+
+def _offers(all_bids, n, seed=0):
+    rng = np.random.default_rng(seed)
+    # offers concentrated on a few bids, so that the issue weights differ
+    favourites = rng.choice(len(all_bids), 4, replace=False)
+    return [
+        all_bids[rng.choice(favourites) if rng.random() < 0.7 else rng.integers(len(all_bids))]
+        for _ in range(n)
+    ]
+
+
+def test_predictions_match_template_model(domain, all_bids):
+    template, model = OpponentModel(domain), ArrayOpponentModel(domain)
+    codes = model.codec.encode_many(all_bids)
+
+    assert model.get_predicted_utility(all_bids[0]) == 0
+    for bid in _offers(all_bids, 40):
+        template.update(bid)
+        model.update(bid)
+
+        expected = [template.get_predicted_utility(b) for b in all_bids]
+        assert [model.get_predicted_utility(b) for b in all_bids] == pytest.approx(expected)
+        assert model.predict_batch(codes) == pytest.approx(expected)
+
+
+def test_cached_predictions(domain, all_bids, monkeypatch):
+    monkeypatch.setattr(array_opponent_model, "PREDICTION_CACHE_SIZE", 10)
+    template, model = OpponentModel(domain), ArrayOpponentModel(domain)
+
+    for bid in _offers(all_bids, 10, seed=3):
+        template.update(bid)
+        model.update(bid)
+
+        expected = [template.get_predicted_utility(b) for b in all_bids]
+        # the second pass is served from the cache for the first 10 bids only
+        for _ in range(2):
+            assert [model.get_predicted_utility(b) for b in all_bids] == pytest.approx(expected)
+        assert len(model._predictions) == 10
+
+
+@pytest.mark.parametrize("window, decay", [(5, None), (None, 0.8), (4, 0.5)])
+def test_single_predictions_match_batch(domain, all_bids, window, decay):
+    model = ArrayOpponentModel(domain, window, decay)
+    codes = model.codec.encode_many(all_bids)
+
+    for bid in _offers(all_bids, 30, seed=1):
+        model.update(bid)
+        single = [model.get_predicted_utility(b) for b in all_bids]
+        assert single == pytest.approx(model.predict_batch(codes))
+
+
+def test_value_counts(domain, all_bids):
+    model = ArrayOpponentModel(domain)
+    offers = _offers(all_bids, 25, seed=2)
+    for bid in offers:
+        model.update(bid)
+
+    for issue in model.codec.issues:
+        expected = {}
+        for bid in offers:
+            expected[bid.getValue(issue)] = expected.get(bid.getValue(issue), 0) + 1
+        assert model.get_value_counts(issue) == expected
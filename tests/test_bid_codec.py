@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from utils.bid_codec import BidCodec, BidCounter, BidHistory, BidSet
+
+
+def test_codes_cover_the_domain(domain, all_bids):
+    codec = BidCodec(domain)
+    codes = [codec.encode(bid) for bid in all_bids]
+
+    assert codec.size == len(all_bids)
+    assert sorted(codes) == list(range(codec.size))
+
+
+def test_decode_inverts_encode(domain, all_bids):
+    codec = BidCodec(domain)
+    for bid in all_bids:
+        assert codec.decode(codec.encode(bid)) == bid
+    assert codec.decode_many(codec.encode_many(all_bids)) == all_bids
+
+
+def test_codes_follow_numpy_ravel_order(domain, all_bids):
+    codec = BidCodec(domain)
+    codes = codec.encode_many(all_bids)
+    value_indices = codec.value_indices(codes)
+
+    for bid, row in zip(all_bids, value_indices):
+        for issue_index, (issue, value_index) in enumerate(zip(codec.issues, row)):
+            assert codec.value_index(issue_index, bid.getValue(issue)) == value_index
+    assert np.array_equal(np.ravel_multi_index(value_indices.T, codec.radices), codes)
+
+
+def test_restrict(domain, all_bids):
+    allowed_c = list(domain.getValues("issueC").getValues())[1:3]
+    codec = BidCodec(domain).restrict({"issueC": allowed_c})
+    allowed = [bid for bid in all_bids if bid.getValue("issueC") in allowed_c]
+
+    assert codec.size == len(allowed)
+    assert sorted(codec.encode(bid) for bid in allowed) == list(range(codec.size))
+    with pytest.raises(ValueError):
+        BidCodec(domain, {"issueC": []})
+
+
+def test_bid_set(domain, all_bids):
+    codec = BidCodec(domain)
+    bids = BidSet(codec, [all_bids[5], all_bids[2], all_bids[5]])
+
+    assert len(bids) == 2
+    assert all_bids[2] in bids and all_bids[3] not in bids
+    assert set(bids) == {all_bids[2], all_bids[5]}
+
+
+def test_bid_history(domain, all_bids):
+    codec = BidCodec(domain)
+    offered = [all_bids[7], all_bids[1], all_bids[7], all_bids[20]]
+    history = BidHistory(codec, offered)
+
+    assert len(history) == 4
+    assert list(history) == offered
+    assert history[-1] == offered[-1] and history[1:3] == offered[1:3]
+    assert list(history.codes()) == [codec.encode(bid) for bid in offered]
+    assert list(history.last_codes(2)) == [codec.encode(bid) for bid in offered[-2:]]
+    assert list(history.last_codes(10)) == list(history.codes())
+    assert len(history.last_codes(0)) == 0
+
+
+def test_bid_counter(domain, all_bids):
+    counter = BidCounter(BidCodec(domain))
+    counter.add(all_bids[3])
+    counter.add(all_bids[4], 2)
+    counter.add(all_bids[3], 2)
+
+    assert counter[all_bids[3]] == 3 and counter[all_bids[0]] == 0
+    assert all_bids[4] in counter and all_bids[0] not in counter
+    assert counter.most_common(1) == [(all_bids[3], 3)]
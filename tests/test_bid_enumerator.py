@@ -0,0 +1,38 @@
+import pytest
+
+from utils.bid_enumerator import BidEnumerator
+
+
+def _utilities(profile, bids):
+    return [float(profile.getUtility(bid)) for bid in bids]
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_yields_every_bid_once_in_utility_order(profile, all_bids, descending):
+    enumerator = BidEnumerator(profile)
+    codes, utilities = zip(*enumerator.iter_codes(descending))
+
+    assert sorted(codes) == list(range(len(all_bids)))
+    expected = sorted(_utilities(profile, all_bids), reverse=descending)
+    assert list(utilities) == pytest.approx(expected)
+    assert _utilities(profile, enumerator.codec.decode_many(codes)) == pytest.approx(expected)
+
+
+def test_iter_bids_matches_iter_codes(profile):
+    enumerator = BidEnumerator(profile)
+    codes = [code for code, _ in enumerator.iter_codes()]
+
+    assert list(enumerator.iter_bids()) == enumerator.codec.decode_many(codes)
+
+
+@pytest.mark.parametrize("descending", [True, False])
+# cutoffs between bid utilities, so that rounding can not decide which bids are in
+@pytest.mark.parametrize("cutoff", [-0.1, 0.2975, 0.5125, 0.7125, 0.9999, 1.1])
+def test_cutoff(profile, all_bids, descending, cutoff):
+    utilities = _utilities(profile, BidEnumerator(profile).iter_bids(descending, cutoff))
+
+    if descending:
+        expected = sorted((u for u in _utilities(profile, all_bids) if u >= cutoff), reverse=True)
+    else:
+        expected = sorted(u for u in _utilities(profile, all_bids) if u <= cutoff)
+    assert utilities == pytest.approx(expected)
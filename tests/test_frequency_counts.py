@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from utils.bid_codec import BidCodec
+from utils.frequency_counts import FrequencyCounts
+
+
+def _expected_counts(codec, offers, window, decay):
+    """Brute force: every offer in the window counts decay ** (number of offers since)"""
+    counted = offers if window is None else offers[-window:]
+    counts = [np.zeros(radix) for radix in codec.radices]
+    for age, bid in enumerate(reversed(counted)):
+        weight = 1.0 if decay is None else decay ** age
+        for issue_index, issue in enumerate(codec.issues):
+            counts[issue_index][codec.value_index(issue_index, bid.getValue(issue))] += weight
+    total = sum(1.0 if decay is None else decay ** age for age in range(len(counted)))
+    return counts, total, len(counted)
+
+
+@pytest.mark.parametrize(
+    "window, decay",
+    [(None, None), (1, None), (7, None), (None, 0.9), (None, 1e-3), (5, 0.5), (3, 1e-3)],
+)
+def test_counts_match_brute_force(domain, all_bids, window, decay):
+    codec = BidCodec(domain)
+    counts = FrequencyCounts(codec, window, decay)
+    rng = np.random.default_rng(0)
+
+    offers = []
+    # 1e-3 ** 100 forces several rescales of the stored counts
+    for code in rng.integers(0, codec.size, 100):
+        offers.append(all_bids[code])
+        counts.add(all_bids[code])
+
+        expected, total, num_offers = _expected_counts(codec, offers, window, decay)
+        assert counts.total() == pytest.approx(total, rel=1e-9)
+        assert len(counts) == num_offers
+        for issue_index, issue_counts in enumerate(expected):
+            scale = max(1.0, issue_counts.max())
+            assert np.allclose(
+                counts.counts(issue_index), issue_counts, rtol=1e-9, atol=1e-12 * scale
+            )
+            assert counts.max_count(issue_index) == pytest.approx(issue_counts.max(), rel=1e-9)
+            assert np.allclose(
+                counts.frequencies(issue_index), issue_counts / total, rtol=1e-9, atol=1e-12
+            )
+            for value_index, count in enumerate(issue_counts):
+                assert counts.count(issue_index, value_index) == pytest.approx(
+                    count, rel=1e-9, abs=1e-12 * scale
+                )
+
+
+def test_add_code_matches_add(domain, all_bids):
+    codec = BidCodec(domain)
+    by_bid, by_code = FrequencyCounts(codec, 4, 0.8), FrequencyCounts(codec, 4, 0.8)
+    for bid in all_bids[::3]:
+        by_bid.add(bid)
+        by_code.add_code(codec.encode(bid))
+
+    for issue_index in range(len(codec.issues)):
+        assert np.array_equal(by_bid.counts(issue_index), by_code.counts(issue_index))
+
+
+def test_empty(domain):
+    counts = FrequencyCounts(BidCodec(domain))
+
+    assert counts.total() == 0.0 and len(counts) == 0
+    assert not counts.frequencies(0).any() and counts.max_count(0) == 0.0
+
+
+@pytest.mark.parametrize("window, decay", [(0, None), (None, 0.0), (None, 1.5)])
+def test_invalid_parameters(domain, window, decay):
+    with pytest.raises(ValueError):
+        FrequencyCounts(BidCodec(domain), window, decay)
@@ -0,0 +1,76 @@
+import random
+from collections import Counter
+
+import pytest
+
+from utils.lazy_snapshot import LazySnapshotFrequencies
+
+ISSUES = {"issueA": ["a0", "a1"], "issueB": ["b0", "b1", "b2"], "issueC": ["c0", "c1", "c2", "c3"]}
+
+
+class _FrequencyModel(LazySnapshotFrequencies):
+    """Immutable frequency model in the style of the geniusweb-style opponent models"""
+
+    def __init__(self, freqs, total):
+        self._bidFrequencies = freqs
+        self._totalBids = total
+
+    def with_bid(self, bid: dict) -> "_FrequencyModel":
+        freqs = self._bidFrequencies
+        undo = {}
+        for issue, value in bid.items():
+            self.set_frequency(undo, freqs[issue], issue, value, freqs[issue].get(value, 0) + 1)
+        return self.hand_over(_FrequencyModel(freqs, self._totalBids + 1), undo)
+
+    def snapshot(self):
+        freqs = {issue: dict(values) for issue, values in self._bidFrequencies.items()}
+        return freqs, self._totalBids
+
+
+def _random_bids(n, seed=0):
+    rng = random.Random(seed)
+    return [{issue: rng.choice(values) for issue, values in ISSUES.items()} for _ in range(n)]
+
+
+def _expected(bids):
+    freqs = {issue: dict(Counter(bid[issue] for bid in bids)) for issue in ISSUES}
+    return freqs, len(bids)
+
+
+def _chain(bids):
+    models = [_FrequencyModel({issue: {} for issue in ISSUES}, 0)]
+    for bid in bids:
+        models.append(models[-1].with_bid(bid))
+    return models
+
+
+@pytest.mark.parametrize("order", ["newest_first", "oldest_first", "random"])
+def test_every_model_keeps_its_own_frequencies(order):
+    bids = _random_bids(20)
+    models = _chain(bids)
+
+    positions = list(range(len(models)))
+    if order == "newest_first":
+        positions.reverse()
+    elif order == "random":
+        random.Random(1).shuffle(positions)
+    for i in positions:
+        assert models[i].snapshot() == _expected(bids[:i])
+
+
+def test_old_model_can_be_updated_again():
+    bids = _random_bids(12)
+    models = _chain(bids)
+    other = _random_bids(5, seed=2)
+
+    # branch off an old model, after which both lines of models keep their frequencies
+    branch = [models[4]]
+    for bid in other:
+        branch.append(branch[-1].with_bid(bid))
+
+    assert branch[-1].snapshot() == _expected(bids[:4] + other)
+    assert models[-1].snapshot() == _expected(bids)
+    for i, model in enumerate(branch):
+        assert model.snapshot() == _expected(bids[:4] + other[:i])
+    for i, model in enumerate(models):
+        assert model.snapshot() == _expected(bids[:i])
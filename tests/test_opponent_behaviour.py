@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from utils.opponent_behaviour import (
+    BOULWARE,
+    CONCEDER,
+    HARDLINER,
+    RANDOM,
+    UNKNOWN,
+    OpponentBehaviour,
+)
+
+
+def _behaviour(utilities, progress=None, window=10):
+    behaviour = OpponentBehaviour(window)
+    for i, utility in enumerate(utilities):
+        behaviour.update(utility, None if progress is None else progress[i])
+    return behaviour
+
+
+@pytest.mark.parametrize("window", [1, 3, 10, 50])
+def test_statistics_match_brute_force(window):
+    rng = np.random.default_rng(window)
+    utilities = rng.random(30).round(2).tolist()
+    progress = np.sort(rng.random(30)).tolist()
+
+    for n in range(1, len(utilities) + 1):
+        behaviour = _behaviour(utilities[:n], window=window)
+        recent = utilities[max(0, n - window) : n]
+        assert behaviour.window_mean() == pytest.approx(np.mean(recent))
+        assert behaviour.window_variance() == pytest.approx(np.var(recent), abs=1e-12)
+        assert behaviour.concession() == pytest.approx(utilities[n - 1] - utilities[0])
+
+        diffs = np.sign(np.diff(utilities[:n]))
+        assert behaviour.increases == np.sum(diffs > 0)
+        assert behaviour.decreases == np.sum(diffs < 0)
+        signs = diffs[diffs != 0]
+        assert behaviour.sign_changes == np.sum(signs[1:] != signs[:-1])
+
+        if n > 1:
+            assert behaviour.slope() == pytest.approx(np.polyfit(np.arange(n), utilities[:n], 1)[0])
+            timed = _behaviour(utilities[:n], progress[:n], window)
+            assert timed.slope() == pytest.approx(np.polyfit(progress[:n], utilities[:n], 1)[0])
+
+
+def test_empty_and_constant():
+    behaviour = OpponentBehaviour()
+    assert behaviour.classify() == UNKNOWN
+    assert behaviour.slope() == behaviour.concession() == behaviour.window_mean() == 0.0
+
+    behaviour = _behaviour([0.4] * 5, progress=[0.5] * 5)
+    assert behaviour.slope() == 0.0
+    assert behaviour.window_variance() == 0.0
+
+
+def test_classify():
+    assert _behaviour([0.3, 0.32, 0.31, 0.35]).classify() == HARDLINER
+    # alternates, more than 45% of the offers go up and more than 45% go down
+    assert _behaviour([0.1, 0.9] * 10 + [0.1]).classify() == RANDOM
+    # 4 of 10 offers go down, not more than 45%
+    assert _behaviour([0.1, 0.9] * 5).classify() == CONCEDER
+    # steady concession
+    assert _behaviour(np.linspace(0.1, 0.6, 30).tolist()).classify() == CONCEDER
+    # holds out, then concedes in the last offers
+    assert _behaviour([0.1] * 25 + [0.2, 0.3, 0.4, 0.5, 0.6]).classify() == BOULWARE
+
+
+def test_invalid_window():
+    with pytest.raises(ValueError):
+        OpponentBehaviour(0)
@@ -0,0 +1,43 @@
+import pytest
+
+from utils.bid_space_index import BidSpaceIndex
+from utils.similarity_index import SimilarityIndex
+
+
+def _hamming(bid, other, weights):
+    return sum(
+        weight
+        for issue, weight in zip(sorted(bid.getIssues()), weights)
+        if bid.getValue(issue) != other.getValue(issue)
+    )
+
+
+@pytest.mark.parametrize("weights", [None, [0.5, 2.0, 1.0]])
+@pytest.mark.parametrize("band", [(None, None), (0.3, 0.8), (0.95, None), (2.0, None)])
+def test_closest_bids_match_brute_force(profile, all_bids, weights, band):
+    index = SimilarityIndex(profile)
+    issue_weights = weights or [1.0] * 3
+    min_utility, max_utility = band
+    in_band = [
+        bid
+        for bid in all_bids
+        if (min_utility is None or index.get_utility(bid) >= min_utility)
+        and (max_utility is None or index.get_utility(bid) <= max_utility)
+    ]
+
+    for target in all_bids:
+        for k in (1, 3, 30):
+            closest = index.closest_bids(target, k, min_utility, max_utility, weights)
+            expected = sorted(
+                (_hamming(target, bid, issue_weights), -index.get_utility(bid)) for bid in in_band
+            )[:k]
+            found = [
+                (_hamming(target, bid, issue_weights), -index.get_utility(bid)) for bid in closest
+            ]
+            assert found == pytest.approx(expected)
+
+
+def test_nearest_is_the_utility_lookup(profile, all_bids):
+    index, plain = SimilarityIndex(profile), BidSpaceIndex(profile)
+    for utility in (-1.0, 0.0, 0.33, 0.5, 0.77, 1.0, 2.0):
+        assert index.nearest(utility) == plain.nearest(utility)
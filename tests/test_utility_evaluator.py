@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from utils.bid_codec import BidCodec
+from utils.utility_evaluator import UtilityEvaluator
+
+
+def test_utility_matches_profile(profile, all_bids):
+    evaluator = UtilityEvaluator(profile)
+    for bid in all_bids:
+        assert evaluator.utility(bid) == pytest.approx(float(profile.getUtility(bid)))
+
+
+def test_utilities_of_codes_and_value_indices(profile, all_bids):
+    evaluator = UtilityEvaluator(profile)
+    codes = evaluator.codec.encode_many(all_bids)
+    expected = [float(profile.getUtility(bid)) for bid in all_bids]
+
+    assert evaluator.utilities(codes) == pytest.approx(expected)
+    assert evaluator.utilities(evaluator.codec.value_indices(codes)) == pytest.approx(expected)
+
+
+def test_all_utilities_indexed_by_code(profile, all_bids):
+    evaluator = UtilityEvaluator(profile)
+    utilities = evaluator.all_utilities()
+
+    assert len(utilities) == len(all_bids)
+    for bid in all_bids:
+        code = evaluator.codec.encode(bid)
+        assert utilities[code] == pytest.approx(float(profile.getUtility(bid)))
+
+
+def test_restricted_codec(profile, all_bids):
+    values_c = list(profile.getDomain().getValues("issueC").getValues())
+    codec = BidCodec(profile.getDomain()).restrict({"issueC": values_c[:2]})
+    evaluator = UtilityEvaluator(profile, codec)
+    allowed = [bid for bid in all_bids if bid.getValue("issueC") in codec.values[2]]
+
+    assert codec.size == len(allowed)
+    assert np.allclose(
+        evaluator.utilities(codec.encode_many(allowed)),
+        [float(profile.getUtility(bid)) for bid in allowed],
+    )
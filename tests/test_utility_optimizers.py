@@ -0,0 +1,104 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from geniusweb.profile.utilityspace.DiscreteValueSetUtilities import (
+    DiscreteValueSetUtilities,
+)
+from geniusweb.profile.utilityspace.LinearAdditiveUtilitySpace import (
+    LinearAdditiveUtilitySpace,
+)
+
+from utils.bid_space_index import PartitionedBidSpaceIndex
+from utils.utility_evaluator import UtilityEvaluator
+from utils.utility_optimizers import (
+    count_bids_above,
+    get_best_bids,
+    get_closest_bid,
+    get_max_bid,
+    get_min_bid,
+)
+
+
+@pytest.fixture(params=["coarse", "fine"])
+def profile(request, domain, profile):
+    """The test profile, and one whose bid utilities lie closer together than the 1e-4 steps
+    of a quantised search
+    """
+    if request.param == "coarse":
+        return profile
+
+    rng = np.random.default_rng(0)
+    utilities = {
+        issue: DiscreteValueSetUtilities(
+            {
+                value: Decimal(f"{u:.5f}")
+                for value, u in zip(domain.getValues(issue).getValues(), rng.uniform(0, 1, 4))
+            }
+        )
+        for issue in domain.getIssues()
+    }
+    weights = {
+        "issueA": Decimal("0.33331"),
+        "issueB": Decimal("0.33334"),
+        "issueC": Decimal("0.33335"),
+    }
+    return LinearAdditiveUtilitySpace(domain, "fineprofile", utilities, weights)
+
+
+@pytest.fixture
+def utilities(profile, all_bids) -> np.ndarray:
+    return np.array([float(profile.getUtility(bid)) for bid in all_bids])
+
+
+def _thresholds(utilities: np.ndarray) -> list:
+    # between and just next to bid utilities, with a margin that is below the differences
+    # between bid utilities but far above rounding errors
+    distinct = np.unique(utilities)
+    midpoints = (distinct[:-1] + distinct[1:]) / 2
+    return [-1.0, 2.0, *midpoints, *(distinct + 1e-6), *(distinct - 1e-6)]
+
+
+def test_max_and_min_bid(profile, utilities):
+    evaluator = UtilityEvaluator(profile)
+
+    assert float(profile.getUtility(get_max_bid(evaluator))) == pytest.approx(utilities.max())
+    assert float(profile.getUtility(get_min_bid(evaluator))) == pytest.approx(utilities.min())
+
+
+@pytest.mark.parametrize("k", [1, 5, 24, 30])
+def test_best_bids(profile, utilities, k):
+    best = get_best_bids(UtilityEvaluator(profile), k)
+
+    expected = sorted(utilities, reverse=True)[:k]
+    assert [float(profile.getUtility(bid)) for bid in best] == pytest.approx(expected)
+
+
+def test_count_bids_above(profile, utilities):
+    evaluator = UtilityEvaluator(profile)
+    for threshold in _thresholds(utilities):
+        assert count_bids_above(evaluator, threshold) == int((utilities >= threshold).sum())
+
+
+def test_closest_bid(profile, utilities):
+    evaluator = UtilityEvaluator(profile)
+    for target in _thresholds(utilities):
+        closest = float(profile.getUtility(get_closest_bid(evaluator, target)))
+        assert abs(closest - target) == pytest.approx(np.abs(utilities - target).min(), abs=1e-12)
+
+
+def test_partitioned_index_queries(profile, all_bids, utilities):
+    index = PartitionedBidSpaceIndex(profile)
+    codes = index.codec.encode_many(all_bids)
+    thresholds = _thresholds(utilities)
+
+    for low, high in zip(thresholds[:-1], thresholds[1:]):
+        if low > high:
+            low, high = high, low
+        expected = codes[(utilities >= low) & (utilities <= high)]
+        found = index.get_codes(low, high)
+        assert sorted(found) == sorted(expected)
+        assert index.count(low, high) == len(expected)
+        # best bid first
+        assert np.all(np.diff(index.evaluator.utilities(found)) <= 1e-12)
+    assert index.count() == len(all_bids)
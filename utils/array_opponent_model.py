@@ -0,0 +1,172 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.DiscreteValueSet import DiscreteValueSet
+from geniusweb.issuevalue.Domain import Domain
+from geniusweb.issuevalue.Value import Value
+
+from utils.bid_codec import BidCodec, BidHistory
+from utils.frequency_counts import FrequencyCounts
+
+# maximum number of predictions kept between two updates, further bids are not cached
+PREDICTION_CACHE_SIZE = 100_000
+
+
+class ArrayOpponentModel:
+    """Frequency opponent model of the template agent (agents/template_agent/utils/
+    opponent_model.py) with the value counts kept in one NumPy array per issue.
+
+    An update increments the count of the offered value of every issue and recalculates the
+    issue weights from the highest counts, without touching the other values. A single
+    prediction computes the value utilities of the bid only, and is cached by bid code until
+    the next update, so asking for the same bid again costs its encoding and one dictionary
+    lookup. Predicting many bids between two offers rebuilds the tables of all value
+    utilities once, after which it costs one table lookup per issue and bid (see
+    predict_batch). Predictions are the same as those of the template model, except that
+    issues with a single value get weight 0 instead of dividing by zero.
+
+    Offers can also be counted over a window of recent offers, or with decaying weights (see
+    FrequencyCounts), in which case the number of received bids is the (weighted) number of
+    counted offers.
+    """
+
+    def __init__(
+        self, domain: Domain, window: Optional[int] = None, decay: Optional[float] = None
+    ):
+        self.domain = domain
+        self.codec = BidCodec(domain)
+        self.offers = BidHistory(self.codec)
+
+        for issue in self.codec.issues:
+            if not isinstance(domain.getValues(issue), DiscreteValueSet):
+                raise TypeError(
+                    "This opponent model only supports issues with discrete values"
+                )
+
+        self._counts = FrequencyCounts(self.codec, window, decay)
+        self._weights = [0.0] * len(self.codec.issues)
+        # denominator of the value utilities per issue, (highest count + 1) ** (1 - weight) - 1
+        self._denominators = [0.0] * len(self.codec.issues)
+        # weighted value utilities per issue, None when outdated
+        self._issue_utilities: Optional[List[np.ndarray]] = None
+        # predicted utility per bid code since the last update
+        self._predictions: Dict[int, float] = {}
+
+    def update(self, bid: Bid):
+        # keep track of all bids received
+        code = self.codec.encode(bid)
+        self.offers.append_code(code)
+        self._counts.add_code(code)
+        bids_received = self._counts.total()
+
+        for i, num_values in enumerate(self.codec.radices):
+            # predicted issue weight, 1.0 if all offers had the same value for this issue,
+            # 0.0 if the offered values are spread evenly over all values
+            max_value_count = self._counts.max_count(i)
+            if num_values == 1:
+                self._weights[i] = 0.0
+            else:
+                equal_shares = bids_received / num_values
+                self._weights[i] = (max_value_count - equal_shares) / (bids_received - equal_shares)
+            self._denominators[i] = (max_value_count + 1.0) ** (1 - self._weights[i]) - 1
+
+        self._issue_utilities = None
+        self._predictions.clear()
+
+    def get_issue_weights(self) -> np.ndarray:
+        """Predicted issue weights, normalised to sum to 1.0, in the order of the codec"""
+        weights = np.array(self._weights)
+        total_issue_weight = weights.sum()
+        if total_issue_weight == 0.0:
+            return np.full(len(weights), 1 / len(weights))
+        return weights / total_issue_weight
+
+    def get_value_counts(self, issue: str) -> Dict[Value, float]:
+        """(Weighted) number of offers per value of the issue, for the values that were
+        offered
+        """
+        i = self.codec.issues.index(issue)
+        counts, values = self._counts.counts(i), self.codec.values[i]
+        return {values[j]: float(counts[j]) for j in np.flatnonzero(counts)}
+
+    def get_issue_utilities(self, codec: Optional[BidCodec] = None) -> List[np.ndarray]:
+        """Predicted utility as one table per issue that holds the normalised issue weight
+        times the value utility, such that the predicted utility of a bid is the sum of its
+        entries. The tables follow the values of the given codec (e.g. a restricted one),
+        defaults to the codec of the model.
+        """
+        if len(self.offers) == 0:
+            tables = [np.zeros(radix) for radix in self.codec.radices]
+        else:
+            if self._issue_utilities is None:
+                self._issue_utilities = self._compute_issue_utilities()
+            tables = self._issue_utilities
+
+        if codec is None or codec.values == self.codec.values:
+            return tables
+        return [
+            table[[self.codec.values[i].index(v) for v in values]]
+            for i, (table, values) in enumerate(zip(tables, codec.values))
+        ]
+
+    def get_predicted_utility(self, bid: Bid) -> float:
+        if len(self.offers) == 0 or bid is None:
+            return 0
+
+        code = self.codec.encode(bid)
+        predicted_utility = self._predictions.get(code)
+        if predicted_utility is None:
+            predicted_utility = self._predict(bid)
+            if len(self._predictions) < PREDICTION_CACHE_SIZE:
+                self._predictions[code] = predicted_utility
+        return predicted_utility
+
+    def _predict(self, bid: Bid) -> float:
+        predicted_utility = 0.0
+        unweighted_utility = 0.0
+        for i, (issue, weight, denominator) in enumerate(
+            zip(self.codec.issues, self._weights, self._denominators)
+        ):
+            value_count = self._counts.count(i, self.codec.value_index(i, bid.getValue(issue)))
+            # values that were never offered have utility 0
+            if value_count == 0.0:
+                continue
+            if weight >= 1:
+                value_utility = 1.0
+            else:
+                value_utility = ((value_count + 1.0) ** (1 - weight) - 1) / denominator
+            predicted_utility += weight * value_utility
+            unweighted_utility += value_utility
+
+        total_issue_weight = sum(self._weights)
+        if total_issue_weight == 0.0:
+            return unweighted_utility / len(self._weights)
+        return predicted_utility / total_issue_weight
+
+    def predict_batch(self, encoded_bids: np.ndarray) -> np.ndarray:
+        """Predicted utility of many bids, given as codes of the codec of the model"""
+        encoded_bids = np.asarray(encoded_bids, dtype=np.int64)
+        predicted = np.zeros(len(encoded_bids))
+        if len(self.offers) == 0:
+            return predicted
+
+        value_indices = np.unravel_index(encoded_bids, self.codec.radices)
+        for table, indices in zip(self.get_issue_utilities(), value_indices):
+            predicted += table[indices]
+        return predicted
+
+    def _compute_issue_utilities(self) -> List[np.ndarray]:
+        tables = []
+        for i, (weight, issue_weight) in enumerate(zip(self._weights, self.get_issue_weights())):
+            counts = self._counts.counts(i)
+            max_value_count = counts.max()
+            if weight < 1:
+                exponent = 1 - weight
+                utilities = ((counts + 1.0) ** exponent - 1) / ((max_value_count + 1.0) ** exponent - 1)
+            else:
+                utilities = np.ones(len(counts))
+            # values that were never offered have utility 0
+            utilities[counts == 0] = 0.0
+            tables.append(issue_weight * utilities)
+        return tables
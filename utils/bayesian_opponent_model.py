@@ -0,0 +1,203 @@
+from itertools import combinations
+from math import comb
+from typing import List, Optional
+
+import numpy as np
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.Domain import Domain
+
+from utils.bid_codec import BidCodec, BidHistory
+
+# the weight hypotheses are the points of the simplex grid with the finest resolution that
+# has at most this many points
+MAX_WEIGHT_HYPOTHESES = 20_000
+MAX_WEIGHT_RESOLUTION = 10
+# utility of the second best value in the value-utility shapes that have one
+RUNNER_UP_UTILITY = 0.5
+# the opponent is assumed to offer bids with utility 1 - CONCESSION * progress, with an
+# error of standard deviation SIGMA
+CONCESSION = 0.3
+SIGMA = 0.2
+# hypotheses with a posterior below this fraction of the most likely one are dropped
+PRUNE_THRESHOLD = 1e-6
+
+
+class BayesianOpponentModel:
+    """Bayesian opponent model over a grid of hypotheses on the issue weights and the value
+    utilities of the opponent, kept in NumPy arrays.
+
+    The issue weights are a point of a discretised weight simplex. The value utilities of
+    every issue have one of a set of shapes: a favourite value with utility 1, optionally a
+    runner-up with RUNNER_UP_UTILITY and utility 0 for the other values (like a normalised
+    profile, in which the worst value of an issue has utility 0). The posterior is
+    factorised into one distribution over the weight grid and one over the shapes of every
+    issue, so that an offer updates every distribution with one vectorised likelihood
+    computation, given the expected values of the others. Hypotheses that became
+    negligible are pruned, which shrinks the weight grid as the model gets more certain.
+
+    The likelihood of an offer assumes that the opponent offers bids with a utility around
+    1 - CONCESSION * progress. The predicted utility of a bid is its expected utility under
+    the posterior: the expected weights times the expected value utilities, which are
+    matrix products of the posteriors with the hypotheses.
+
+    Same interface as the OpponentModel of the template agent (update,
+    get_predicted_utility, get_issue_utilities) and ArrayOpponentModel (predict_batch).
+    """
+
+    def __init__(
+        self,
+        domain: Domain,
+        max_weight_hypotheses: int = MAX_WEIGHT_HYPOTHESES,
+        sigma: float = SIGMA,
+    ):
+        self.domain = domain
+        self.codec = BidCodec(domain)
+        self.offers = BidHistory(self.codec)
+        self.sigma = sigma
+
+        self.weight_hypotheses = self._weight_grid(len(self.codec.issues), max_weight_hypotheses)
+        self._weight_log_posterior = np.zeros(len(self.weight_hypotheses))
+        self.shape_hypotheses = [self._shapes(radix) for radix in self.codec.radices]
+        self._shape_log_posteriors = [np.zeros(len(shapes)) for shapes in self.shape_hypotheses]
+
+        # weighted value utilities per issue, None when outdated
+        self._issue_utilities: Optional[List[np.ndarray]] = None
+
+    def update(self, bid: Bid, progress: Optional[float] = None):
+        """Update the posterior with an offer of the opponent
+
+        Args:
+            bid (Bid): offered bid
+            progress (float, optional): progress of the negotiation at the time of the offer,
+                between 0 and 1. Defaults to None (0, the opponent is assumed to offer bids
+                that are close to ideal for it).
+        """
+        self.offers.append(bid)
+        value_indices = self.codec.value_indices([self.codec.encode(bid)])[0]
+        target = 1.0 - CONCESSION * (progress or 0.0)
+
+        # expected utility of the offered value of every issue, and the expected weights
+        value_utilities = np.array(
+            [
+                self._posterior(log_posterior) @ shapes[:, value_index]
+                for log_posterior, shapes, value_index in zip(
+                    self._shape_log_posteriors, self.shape_hypotheses, value_indices
+                )
+            ]
+        )
+        weights = self.get_issue_weights()
+
+        # weights: utility of the offer under every weight hypothesis
+        utilities = self.weight_hypotheses @ value_utilities
+        self._weight_log_posterior += self._log_likelihood(utilities, target)
+
+        # shapes: utility of the offer under every shape of an issue, others as expected
+        expected_utility = weights @ value_utilities
+        for i, (shapes, value_index) in enumerate(zip(self.shape_hypotheses, value_indices)):
+            rest = expected_utility - weights[i] * value_utilities[i]
+            utilities = rest + weights[i] * shapes[:, value_index]
+            self._shape_log_posteriors[i] += self._log_likelihood(utilities, target)
+
+        self._prune()
+        self._issue_utilities = None
+
+    def get_issue_weights(self) -> np.ndarray:
+        """Expected issue weights, in the order of the codec"""
+        return self._posterior(self._weight_log_posterior) @ self.weight_hypotheses
+
+    def get_value_utilities(self) -> List[np.ndarray]:
+        """Expected (unweighted) utility of every value, one array per issue"""
+        return [
+            self._posterior(log_posterior) @ shapes
+            for log_posterior, shapes in zip(self._shape_log_posteriors, self.shape_hypotheses)
+        ]
+
+    def get_issue_utilities(self, codec: Optional[BidCodec] = None) -> List[np.ndarray]:
+        """Predicted utility as one table per issue that holds the expected issue weight
+        times the expected value utility, such that the predicted utility of a bid is the
+        sum of its entries. The tables follow the values of the given codec (e.g. a
+        restricted one), defaults to the codec of the model.
+        """
+        if len(self.offers) == 0:
+            tables = [np.zeros(radix) for radix in self.codec.radices]
+        else:
+            if self._issue_utilities is None:
+                self._issue_utilities = [
+                    weight * utilities
+                    for weight, utilities in zip(self.get_issue_weights(), self.get_value_utilities())
+                ]
+            tables = self._issue_utilities
+
+        if codec is None or codec.values == self.codec.values:
+            return tables
+        return [
+            table[[self.codec.values[i].index(v) for v in values]]
+            for i, (table, values) in enumerate(zip(tables, codec.values))
+        ]
+
+    def get_predicted_utility(self, bid: Bid) -> float:
+        if len(self.offers) == 0 or bid is None:
+            return 0
+        return float(self.predict_batch(np.array([self.codec.encode(bid)]))[0])
+
+    def predict_batch(self, encoded_bids: np.ndarray) -> np.ndarray:
+        """Predicted utility of many bids, given as codes of the codec of the model"""
+        encoded_bids = np.asarray(encoded_bids, dtype=np.int64)
+        predicted = np.zeros(len(encoded_bids))
+        value_indices = np.unravel_index(encoded_bids, self.codec.radices)
+        for table, indices in zip(self.get_issue_utilities(), value_indices):
+            predicted += table[indices]
+        return predicted
+
+    def num_hypotheses(self) -> int:
+        """Number of remaining weight hypotheses plus value-utility shapes"""
+        return len(self.weight_hypotheses) + sum(len(shapes) for shapes in self.shape_hypotheses)
+
+    def _log_likelihood(self, utilities: np.ndarray, target: float) -> np.ndarray:
+        return -((utilities - target) ** 2) / (2 * self.sigma ** 2)
+
+    def _prune(self):
+        threshold = np.log(PRUNE_THRESHOLD)
+
+        self._weight_log_posterior -= self._weight_log_posterior.max()
+        keep = self._weight_log_posterior > threshold
+        self.weight_hypotheses = self.weight_hypotheses[keep]
+        self._weight_log_posterior = self._weight_log_posterior[keep]
+
+        for i, log_posterior in enumerate(self._shape_log_posteriors):
+            log_posterior = log_posterior - log_posterior.max()
+            keep = log_posterior > threshold
+            self.shape_hypotheses[i] = self.shape_hypotheses[i][keep]
+            self._shape_log_posteriors[i] = log_posterior[keep]
+
+    @staticmethod
+    def _posterior(log_posterior: np.ndarray) -> np.ndarray:
+        posterior = np.exp(log_posterior - log_posterior.max())
+        return posterior / posterior.sum()
+
+    @staticmethod
+    def _weight_grid(num_issues: int, max_size: int) -> np.ndarray:
+        """Points of the weight simplex with coordinates that are multiples of 1 / resolution,
+        for the largest resolution with at most max_size points (stars and bars)
+        """
+        resolution = MAX_WEIGHT_RESOLUTION
+        while resolution > 1 and comb(resolution + num_issues - 1, num_issues - 1) > max_size:
+            resolution -= 1
+
+        points = []
+        for bars in combinations(range(resolution + num_issues - 1), num_issues - 1):
+            edges = (-1,) + bars + (resolution + num_issues - 1,)
+            points.append([edges[i + 1] - edges[i] - 1 for i in range(num_issues)])
+        return np.array(points, dtype=float) / resolution
+
+    @staticmethod
+    def _shapes(num_values: int) -> np.ndarray:
+        shapes = []
+        for favourite in range(num_values):
+            for runner_up in [None] + [v for v in range(num_values) if v != favourite]:
+                shape = np.zeros(num_values)
+                shape[favourite] = 1.0
+                if runner_up is not None:
+                    shape[runner_up] = RUNNER_UP_UTILITY
+                shapes.append(shape)
+        return np.array(shapes)
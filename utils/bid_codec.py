@@ -0,0 +1,189 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.Domain import Domain
+
+# domains up to this size keep bid sets as a bitmap (1 byte per bid) instead of a set of codes
+BITMAP_MAX_SIZE = 1 << 24
+
+
+class BidCodec:
+    """Maps the bids of a discrete domain to integers and back.
+
+    A bid is encoded as a mixed-radix number over the indices of its values, with the issues
+    in sorted order (the first issue is the most significant digit). Codes run from 0 to
+    size - 1 and follow the order of np.unravel_index / np.ravel_multi_index.
+    """
+
+    def __init__(self, domain: Domain, allowed_values: Optional[Dict[str, list]] = None):
+        """
+        Args:
+            domain (Domain): discrete domain
+            allowed_values (dict, optional): restrict the given issues to these values, other
+                issues keep all their values. Defaults to None (the full domain).
+        """
+        self.domain = domain
+        self.issues = sorted(domain.getIssues())
+        self.values = [domain.getValues(issue).getValues() for issue in self.issues]
+        if allowed_values is not None:
+            self.values = [
+                [v for v in values if v in allowed_values[issue]] if issue in allowed_values else values
+                for issue, values in zip(self.issues, self.values)
+            ]
+            if not all(self.values):
+                raise ValueError("every issue needs at least one allowed value")
+        self.radices = [len(values) for values in self.values]
+        self.size = int(np.prod(self.radices, dtype=object))
+
+        self._value_indices = [
+            {value: i for i, value in enumerate(values)} for values in self.values
+        ]
+        self.strides = [
+            int(np.prod(self.radices[i + 1 :], dtype=object)) for i in range(len(self.radices))
+        ]
+
+    def encode(self, bid: Bid) -> int:
+        code = 0
+        for issue, value_indices, radix in zip(self.issues, self._value_indices, self.radices):
+            code = code * radix + value_indices[bid.getValue(issue)]
+        return code
+
+    def value_index(self, issue_index: int, value) -> int:
+        """Index of a value of the issue at issue_index (in the order of the codec)"""
+        return self._value_indices[issue_index][value]
+
+    def decode(self, code: int) -> Bid:
+        issue_values = {}
+        for issue, values, stride in zip(self.issues, self.values, self.strides):
+            value_index, code = divmod(int(code), stride)
+            issue_values[issue] = values[value_index]
+        return Bid(issue_values)
+
+    def encode_many(self, bids: Iterable[Bid]) -> np.ndarray:
+        return np.fromiter((self.encode(bid) for bid in bids), dtype=np.int64)
+
+    def decode_many(self, codes: Iterable[int]) -> List[Bid]:
+        return [self.decode(code) for code in codes]
+
+    def value_indices(self, codes: np.ndarray) -> np.ndarray:
+        """Value index matrix of shape (number of codes, number of issues)"""
+        return np.stack(np.unravel_index(np.asarray(codes), self.radices), axis=-1)
+
+    def restrict(self, allowed_values: Dict[str, list]) -> "BidCodec":
+        """Codec over the sub-domain with only the allowed values for the given issues. Codes
+        of both codecs are not interchangeable, translate through Bid or value indices.
+        """
+        return BidCodec(self.domain, allowed_values)
+
+
+class BidSet:
+    """Set of bids stored as codes: a bitmap for domains up to BITMAP_MAX_SIZE bids,
+    a set of integers for larger ones.
+    """
+
+    def __init__(self, codec: BidCodec, bids: Iterable[Bid] = ()):
+        self.codec = codec
+        self._bitmap = None
+        self._codes = None
+        self._len = 0
+        if codec.size <= BITMAP_MAX_SIZE:
+            self._bitmap = np.zeros(codec.size, dtype=bool)
+        else:
+            self._codes = set()
+        for bid in bids:
+            self.add(bid)
+
+    def add(self, bid: Bid):
+        self.add_code(self.codec.encode(bid))
+
+    def add_code(self, code: int):
+        if self._bitmap is not None:
+            if not self._bitmap[code]:
+                self._bitmap[code] = True
+                self._len += 1
+        else:
+            self._codes.add(code)
+            self._len = len(self._codes)
+
+    def contains_code(self, code: int) -> bool:
+        if self._bitmap is not None:
+            return bool(self._bitmap[code])
+        return code in self._codes
+
+    def codes(self) -> np.ndarray:
+        if self._bitmap is not None:
+            return np.flatnonzero(self._bitmap)
+        return np.array(sorted(self._codes), dtype=np.int64)
+
+    def __contains__(self, bid: Bid) -> bool:
+        return self.contains_code(self.codec.encode(bid))
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Bid]:
+        return (self.codec.decode(code) for code in self.codes())
+
+
+class BidHistory:
+    """Append-only sequence of bids stored as an array of codes. Indexing decodes the bid."""
+
+    def __init__(self, codec: BidCodec, bids: Iterable[Bid] = ()):
+        self.codec = codec
+        self._codes = array("q")
+        for bid in bids:
+            self.append(bid)
+
+    def append(self, bid: Bid):
+        self.append_code(self.codec.encode(bid))
+
+    def append_code(self, code: int):
+        self._codes.append(code)
+
+    def codes(self) -> np.ndarray:
+        """Codes of the bids, oldest first"""
+        return np.array(self._codes, dtype=np.int64)
+
+    def last_codes(self, n: int) -> np.ndarray:
+        """Codes of the last n bids (or fewer), oldest first, without copying the others"""
+        if n <= 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.array(self._codes[-n:], dtype=np.int64)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.codec.decode(code) for code in self._codes[index]]
+        return self.codec.decode(self._codes[index])
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __iter__(self) -> Iterator[Bid]:
+        return (self.codec.decode(code) for code in self._codes)
+
+
+class BidCounter:
+    """Number of occurrences per bid, keyed by code"""
+
+    def __init__(self, codec: BidCodec):
+        self.codec = codec
+        self._counts: Dict[int, int] = {}
+
+    def add(self, bid: Bid, count: int = 1):
+        code = self.codec.encode(bid)
+        self._counts[code] = self._counts.get(code, 0) + count
+
+    def most_common(self, k: int = None) -> List[Tuple[Bid, int]]:
+        ranked = sorted(self._counts.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.codec.decode(code), count) for code, count in ranked[:k]]
+
+    def __getitem__(self, bid: Bid) -> int:
+        return self._counts.get(self.codec.encode(bid), 0)
+
+    def __contains__(self, bid: Bid) -> bool:
+        return self.codec.encode(bid) in self._counts
+
+    def __len__(self) -> int:
+        return len(self._counts)
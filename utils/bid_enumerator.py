@@ -0,0 +1,72 @@
+import heapq
+from typing import Iterator, Optional, Tuple
+
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+
+from utils.utility_evaluator import UtilityEvaluator
+
+
+class BidEnumerator:
+    """Lazily generates the bids of a linear additive profile in order of utility, without
+    enumerating or sorting the full bid space.
+
+    The values of every issue are ranked on utility, so that a bid is a vector of ranks and
+    its distance to the best bid is the sum of the per-issue utility losses of those ranks.
+    Rank vectors are expanded best-first from a priority queue. Every vector is generated
+    by exactly one parent (the vector with its last non-zero rank decremented), which keeps
+    the queue free of duplicates and its size linear in the number of bids yielded.
+    """
+
+    def __init__(self, profile: LinearAdditive, evaluator: UtilityEvaluator = None):
+        self.evaluator = evaluator if evaluator is not None else UtilityEvaluator(profile)
+        self.codec = self.evaluator.codec
+
+    def iter_codes(
+        self, descending: bool = True, cutoff: Optional[float] = None
+    ) -> Iterator[Tuple[int, float]]:
+        """Yield (code, utility) of all bids in order of utility.
+
+        Args:
+            descending (bool, optional): best bid first. Defaults to True.
+            cutoff (float, optional): stop at the first bid with a utility below (descending)
+                or above (ascending) this value. Defaults to None (all bids).
+        """
+        # per issue: value indices ordered from best to worst (or worst to best), and the
+        # utility lost with respect to the first value of that order
+        orders, losses = [], []
+        start_utility = 0.0
+        for issue_utilities in self.evaluator.issue_utilities:
+            utilities = issue_utilities.tolist()
+            order = sorted(range(len(utilities)), key=utilities.__getitem__, reverse=descending)
+            first = utilities[order[0]]
+            orders.append(order)
+            losses.append([abs(first - utilities[i]) for i in order])
+            start_utility += first
+
+        strides = self.codec.strides
+        start_code = sum(order[0] * stride for order, stride in zip(orders, strides))
+        num_issues = len(orders)
+
+        # (loss, code, ranks, index of last non-zero rank)
+        queue = [(0.0, start_code, (0,) * num_issues, 0)]
+        while queue:
+            loss, code, ranks, last = heapq.heappop(queue)
+            utility = start_utility - loss if descending else start_utility + loss
+            if cutoff is not None and (utility < cutoff if descending else utility > cutoff):
+                return
+            yield code, utility
+
+            for k in range(last, num_issues):
+                rank = ranks[k]
+                if rank + 1 >= len(orders[k]):
+                    continue
+                child_ranks = ranks[:k] + (rank + 1,) + ranks[k + 1 :]
+                child_loss = loss - losses[k][rank] + losses[k][rank + 1]
+                child_code = code + (orders[k][rank + 1] - orders[k][rank]) * strides[k]
+                heapq.heappush(queue, (child_loss, child_code, child_ranks, k))
+
+    def iter_bids(self, descending: bool = True, cutoff: Optional[float] = None) -> Iterator[Bid]:
+        """Yield all bids in order of utility, see iter_codes"""
+        for code, _ in self.iter_codes(descending, cutoff):
+            yield self.codec.decode(code)
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+import numpy as np
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+
+from utils.bid_space_index import BidSpaceIndex
+from utils.utility_evaluator import UtilityEvaluator
+
+# shared by all sessions and processes on this machine, can be safely deleted at any time
+BID_INDEX_CACHE_DIR = os.environ.get(
+    "BID_INDEX_CACHE_DIR", os.path.join(tempfile.gettempdir(), "bid_index_cache")
+)
+# bump when the layout of the cached arrays changes
+CACHE_VERSION = 1
+
+
+def load_bid_space_index(
+    profile: LinearAdditive, cache_dir: Optional[str] = BID_INDEX_CACHE_DIR
+) -> BidSpaceIndex:
+    """BidSpaceIndex of a profile, backed by read-only memory-mapped arrays in cache_dir.
+
+    The cache is keyed by a hash of the content of the profile (issues, values and weighted
+    utilities), so sessions that use the same profile share one index, whatever the path of
+    the profile file. The first process that needs an index builds it in a temporary
+    directory and moves it into place atomically; concurrent builders race harmlessly.
+
+    Args:
+        profile (LinearAdditive): own profile
+        cache_dir (str, optional): cache directory, None builds the index in memory.
+            Defaults to BID_INDEX_CACHE_DIR.
+    """
+    if cache_dir is None:
+        return BidSpaceIndex(profile)
+
+    evaluator = UtilityEvaluator(profile)
+    entry_dir = os.path.join(cache_dir, get_profile_key(evaluator))
+    if not os.path.isdir(entry_dir):
+        _build_entry(profile, cache_dir, entry_dir)
+
+    codes = np.load(os.path.join(entry_dir, "codes.npy"), mmap_mode="r")
+    utilities = np.load(os.path.join(entry_dir, "utilities.npy"), mmap_mode="r")
+    return BidSpaceIndex.from_sorted(evaluator, codes, utilities)
+
+
+def get_profile_key(evaluator: UtilityEvaluator) -> str:
+    """Hash of everything the bid index of a profile depends on"""
+    content = {
+        "version": CACHE_VERSION,
+        "issues": evaluator.issues,
+        "values": [[str(v) for v in values] for values in evaluator.values],
+        "utilities": [u.tolist() for u in evaluator.issue_utilities],
+    }
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()
+
+
+def _build_entry(profile: LinearAdditive, cache_dir: str, entry_dir: str):
+    os.makedirs(cache_dir, exist_ok=True)
+    index = BidSpaceIndex(profile)
+
+    build_dir = tempfile.mkdtemp(dir=cache_dir, prefix=".build-")
+    try:
+        np.save(os.path.join(build_dir, "codes.npy"), index.get_sorted_codes())
+        np.save(os.path.join(build_dir, "utilities.npy"), index.get_sorted_utilities())
+        try:
+            os.replace(build_dir, entry_dir)
+        except OSError:
+            # another process finished the same entry first
+            if not os.path.isdir(entry_dir):
+                raise
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
@@ -0,0 +1,218 @@
+from math import prod
+from typing import List, Optional
+
+import numpy as np
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+
+from utils.bid_codec import BidCodec
+from utils.utility_evaluator import UtilityEvaluator
+
+
+class BidSpaceIndex:
+    """All bids of the domain of a linear additive profile, encoded as integers and sorted on
+    (float) utility. Built once per profile, after which rank, interval, top-k and
+    nearest-utility queries are binary searches on the sorted arrays.
+
+    Bids are encoded with the BidCodec of the domain, or with the given (restricted) codec
+    to index only part of the domain (e.g. the bids without dominated values).
+    """
+
+    def __init__(self, profile: LinearAdditive, codec: BidCodec = None):
+        self.evaluator = UtilityEvaluator(profile, codec)
+        self.codec = self.evaluator.codec
+
+        bid_utilities = self.evaluator.all_utilities()
+        order = np.argsort(bid_utilities, kind="stable")
+        self._codes: np.ndarray = order
+        self._utilities: np.ndarray = bid_utilities[order]
+
+    @classmethod
+    def from_sorted(
+        cls, evaluator: UtilityEvaluator, codes: np.ndarray, utilities: np.ndarray
+    ) -> "BidSpaceIndex":
+        """Index from previously sorted arrays (see get_sorted_codes), e.g. memory-mapped
+        from a cache, without evaluating or sorting the bid space again.
+        """
+        index = cls.__new__(cls)
+        index.evaluator = evaluator
+        index.codec = evaluator.codec
+        index._codes = codes
+        index._utilities = utilities
+        return index
+
+    def size(self) -> int:
+        return len(self._codes)
+
+    def get_sorted_codes(self) -> np.ndarray:
+        """Codes of all bids in order of ascending utility"""
+        return self._codes
+
+    def get_sorted_utilities(self) -> np.ndarray:
+        """Utilities of all bids in ascending order, matching get_sorted_codes"""
+        return self._utilities
+
+    def encode(self, bid: Bid) -> int:
+        return self.codec.encode(bid)
+
+    def decode(self, code: int) -> Bid:
+        return self.codec.decode(code)
+
+    def get_utility(self, bid: Bid) -> float:
+        return self.evaluator.utility(bid)
+
+    def get_max_utility(self) -> float:
+        return float(self._utilities[-1])
+
+    def get_min_utility(self) -> float:
+        return float(self._utilities[0])
+
+    def rank(self, bid: Bid) -> int:
+        """Number of bids with a strictly higher utility than bid (0 for a best bid)"""
+        position = np.searchsorted(self._utilities, self.get_utility(bid), side="right")
+        return self.size() - int(position)
+
+    def interval(
+        self, min_utility: Optional[float] = None, max_utility: Optional[float] = None
+    ) -> slice:
+        """Positions in the (ascending) sorted order of the bids with utility in
+        [min_utility, max_utility]. Omitted bounds are unbounded.
+        """
+        start, end = 0, self.size()
+        if min_utility is not None:
+            start = int(np.searchsorted(self._utilities, min_utility, side="left"))
+        if max_utility is not None:
+            end = int(np.searchsorted(self._utilities, max_utility, side="right"))
+        return slice(start, max(start, end))
+
+    def get_codes(
+        self, min_utility: Optional[float] = None, max_utility: Optional[float] = None
+    ) -> np.ndarray:
+        """Codes of the bids with utility in [min_utility, max_utility], best bid first.
+        Omitted bounds are unbounded.
+        """
+        return self._codes[self.interval(min_utility, max_utility)][::-1]
+
+    def get_bids(
+        self, min_utility: Optional[float] = None, max_utility: Optional[float] = None
+    ) -> List[Bid]:
+        """Bids with utility in [min_utility, max_utility], best bid first"""
+        return [self.decode(code) for code in self.get_codes(min_utility, max_utility)]
+
+    def top_k(self, k: int) -> List[Bid]:
+        """The k bids with the highest utility, best bid first"""
+        k = min(k, self.size())
+        return [self.decode(code) for code in self._codes[::-1][:k]]
+
+    def nearest(self, utility: float) -> Bid:
+        """A bid with the utility closest to the target utility"""
+        position = int(np.searchsorted(self._utilities, utility))
+        candidates = [p for p in (position - 1, position) if 0 <= p < self.size()]
+        best = min(candidates, key=lambda p: abs(self._utilities[p] - utility))
+        return self.decode(self._codes[best])
+
+
+class PartitionedBidSpaceIndex:
+    """Interval queries on bid spaces that are too large to index as a whole. The issues
+    are split in two parts of (nearly) equal size whose sub-bids are indexed separately
+    (meet-in-the-middle), so memory grows with the square root of the domain size. Same
+    query interface as BidSpaceIndex.get_codes, with the same codes, plus exact counts and
+    nearest-utility queries.
+    """
+
+    def __init__(self, profile: LinearAdditive):
+        self._build(UtilityEvaluator(profile))
+
+    @classmethod
+    def from_evaluator(cls, evaluator: UtilityEvaluator) -> "PartitionedBidSpaceIndex":
+        index = cls.__new__(cls)
+        index._build(evaluator)
+        return index
+
+    def _build(self, evaluator: UtilityEvaluator):
+        self.evaluator = evaluator
+        self.codec = evaluator.codec
+
+        # the issues are split at the position that balances the sizes of the two parts
+        issue_utilities = evaluator.issue_utilities
+        radices = [int(radix) for radix in self.codec.radices]
+        sizes = [prod(radices[:i]) for i in range(len(radices) + 1)]
+        half = min(range(len(radices) + 1), key=lambda i: max(sizes[i], sizes[-1] // sizes[i]))
+        self._low_size = sizes[-1] // sizes[half]
+        self._high_codes, self._high_utilities = self._sorted_part(issue_utilities[:half])
+        self._low_codes, self._low_utilities = self._sorted_part(issue_utilities[half:])
+
+    @staticmethod
+    def _sorted_part(issue_utilities: list):
+        utilities = np.zeros(1)
+        for utils in issue_utilities:
+            utilities = np.add.outer(utilities, utils).ravel()
+        order = np.argsort(utilities, kind="stable")
+        return order, utilities[order]
+
+    def size(self) -> int:
+        return self.codec.size
+
+    def get_utility(self, bid: Bid) -> float:
+        return self.evaluator.utility(bid)
+
+    def get_max_utility(self) -> float:
+        return float(self._high_utilities[-1] + self._low_utilities[-1])
+
+    def get_min_utility(self) -> float:
+        return float(self._high_utilities[0] + self._low_utilities[0])
+
+    def get_codes(
+        self, min_utility: Optional[float] = None, max_utility: Optional[float] = None
+    ) -> np.ndarray:
+        """Codes of the bids with utility in [min_utility, max_utility], best bid first.
+        Omitted bounds are unbounded.
+        """
+        starts, counts = self._ranges(min_utility, max_utility)
+        total = int(counts.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        high = np.repeat(np.arange(len(counts)), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        low = np.repeat(starts, counts) + offsets
+        utilities = self._high_utilities[high] + self._low_utilities[low]
+        codes = self._high_codes[high] * self._low_size + self._low_codes[low]
+        return codes[np.argsort(-utilities, kind="stable")]
+
+    def get_bids(
+        self, min_utility: Optional[float] = None, max_utility: Optional[float] = None
+    ) -> List[Bid]:
+        """Bids with utility in [min_utility, max_utility], best bid first"""
+        return [self.codec.decode(code) for code in self.get_codes(min_utility, max_utility)]
+
+    def count(
+        self, min_utility: Optional[float] = None, max_utility: Optional[float] = None
+    ) -> int:
+        """Number of bids with utility in [min_utility, max_utility], without listing them"""
+        return int(self._ranges(min_utility, max_utility)[1].sum())
+
+    def nearest(self, utility: float) -> Bid:
+        """A bid with the utility closest to the target utility"""
+        # for every high half, the closest low half is one of the neighbours of its position
+        positions = np.searchsorted(self._low_utilities, utility - self._high_utilities)
+        last = len(self._low_utilities) - 1
+        below = np.clip(positions - 1, 0, last)
+        above = np.clip(positions, 0, last)
+        distance_below = np.abs(self._high_utilities + self._low_utilities[below] - utility)
+        distance_above = np.abs(self._high_utilities + self._low_utilities[above] - utility)
+        low = np.where(distance_below <= distance_above, below, above)
+
+        high = int(np.argmin(np.minimum(distance_below, distance_above)))
+        code = int(self._high_codes[high]) * self._low_size + int(self._low_codes[low[high]])
+        return self.codec.decode(code)
+
+    def _ranges(self, min_utility: Optional[float], max_utility: Optional[float]):
+        if min_utility is None:
+            min_utility = -np.inf
+        if max_utility is None:
+            max_utility = np.inf
+        # for every high half, the matching low halves form a contiguous range
+        starts = np.searchsorted(self._low_utilities, min_utility - self._high_utilities, side="left")
+        ends = np.searchsorted(self._low_utilities, max_utility - self._high_utilities, side="right")
+        return starts, np.maximum(ends - starts, 0)
@@ -2,7 +2,6 @@ import json
 import math
 import os
 from itertools import product
-from math import sqrt
 from random import randint
 from shutil import rmtree
 from string import ascii_uppercase
@@ -11,16 +10,28 @@ from typing import Iterable
 import numpy as np
 import plotly.graph_objects as go
 from numpy.random import dirichlet
+from scipy.spatial import cKDTree
+
+from utils.domain_catalog import update_catalog
 
 NUM_DOMAINS_TO_GENERATE = 50
+NUM_PROFILES_PER_DOMAIN = 2
+# domains with more bids are visualised as density heatmap instead of scatter plot
+SCATTER_BID_LIMIT = 5000
+DENSITY_BINS = 200
+# the Pareto skyline computation processes bids in blocks, which are filtered by comparing
+# them to small batches of the skyline so far (dominated bids are dropped between batches)
+SKYLINE_BLOCK_SIZE = 512
+SKYLINE_FILTER_SIZE = 32
 
 
 def main():
     for i in range(NUM_DOMAINS_TO_GENERATE):
-        domain = Domain.create_random(f"domain{i:03d}")
+        domain = Domain.create_random(f"domain{i:03d}", NUM_PROFILES_PER_DOMAIN)
         domain.calculate_specials()
         domain.generate_visualisation()
         domain.to_file("domains/")
+    update_catalog("domains/")
 
 
 class Profile:
@@ -103,13 +114,27 @@ class Profile:
             self.issue_weights[i] * self.value_weights[i][v] for i, v in bid.items()
         )
 
+    def get_utility_array(self, issues_values: dict) -> np.ndarray:
+        """Utility of every bid in the Cartesian product of issues_values, in the order
+        of itertools.product (last issue changes fastest).
+        """
+        utilities = np.zeros(1)
+        for issue, values in issues_values.items():
+            issue_utilities = np.array(
+                [
+                    self.issue_weights[issue] * self.value_weights[issue][v]
+                    for v in values["values"]
+                ]
+            )
+            utilities = np.add.outer(utilities, issue_utilities).ravel()
+        return utilities
+
 
 class Domain:
     def __init__(
         self,
         domain,
-        profile_A: Profile,
-        profile_B: Profile,
+        profiles: list,
         SW_bid=None,
         nash_bid=None,
         kalai_bid=None,
@@ -119,8 +144,7 @@ class Domain:
         visualisation=None,
     ):
         self.domain = domain
-        self.profile_A = profile_A
-        self.profile_B = profile_B
+        self.profiles = profiles
         self.SW_bid = SW_bid
         self.nash_bid = nash_bid
         self.kalai_bid = kalai_bid
@@ -129,8 +153,16 @@ class Domain:
         self.opposition = opposition
         self.visualisation = visualisation
 
+    @property
+    def profile_A(self) -> Profile:
+        return self.profiles[0]
+
+    @property
+    def profile_B(self) -> Profile:
+        return self.profiles[1]
+
     @classmethod
-    def create_random(cls, name):
+    def create_random(cls, name, num_profiles=2):
         domain_size = randint(200, 10000)
 
         while True:
@@ -149,16 +181,22 @@ class Domain:
             issuesValues[f"issue{issue}"] = values
 
         domain = {"name": name, "issuesValues": issuesValues}
-        profile_A = Profile.create_random(domain, "profileA")
-        profile_B = Profile.create_random(domain, "profileB")
-        return cls(domain, profile_A, profile_B)
+        profiles = [
+            Profile.create_random(domain, f"profile{ascii_uppercase[i]}")
+            for i in range(num_profiles)
+        ]
+        return cls(domain, profiles)
 
     @classmethod
     def from_directory(cls, directory):
         name = os.path.basename(directory)
-        profile_B = Profile.from_file(f"{directory}/profileB.json")
-        profile_A = Profile.from_file(f"{directory}/profileA.json")
-        domain = {"name": name, "issuesValues": profile_A.get_issues_values()}
+        profile_files = sorted(
+            f
+            for f in os.listdir(directory)
+            if f.startswith("profile") and f.endswith(".json")
+        )
+        profiles = [Profile.from_file(f"{directory}/{f}") for f in profile_files]
+        domain = {"name": name, "issuesValues": profiles[0].get_issues_values()}
 
         specials_path = f"{directory}/specials.json"
         if os.path.exists(specials_path):
@@ -166,8 +204,7 @@ class Domain:
                 specials = json.load(f)
             return cls(
                 domain,
-                profile_A,
-                profile_B,
+                profiles,
                 SW_bid=specials["social_welfare"],
                 nash_bid=specials["nash"],
                 kalai_bid=specials["kalai"],
@@ -176,54 +213,75 @@ class Domain:
                 opposition=specials["opposition"],
             )
         else:
-            domain = cls(domain, profile_A, profile_B)
+            domain = cls(domain, profiles)
             return domain
 
     def calculate_specials(self):
         if self.nash_bid:
             return False
-        self.pareto_front = self.get_pareto(list(self.iter_bids()))
-        self.distribution = self.get_distribution(self.iter_bids())
-
-        SW_utility = 0
-        nash_utility = 0
-        kalai_diff = 10
-
-        for pareto_bid in self.pareto_front:
-            utility_A, utility_B = pareto_bid["utility"][0], pareto_bid["utility"][1]
-
-            utility_diff = abs(utility_A - utility_B)
-            utility_prod = utility_A * utility_B
-            utility_sum = utility_A + utility_B
-
-            if utility_diff < kalai_diff:
-                self.kalai_bid = pareto_bid
-                kalai_diff = utility_diff
-                self.opposition = sqrt((utility_A - 1.0) ** 2 + (utility_B - 1.0) ** 2)
-            if utility_prod > nash_utility:
-                self.nash_bid = pareto_bid
-                nash_utility = utility_prod
-            if utility_sum > SW_utility:
-                self.SW_bid = pareto_bid
-                SW_utility = utility_sum
+        bid_utils = self.get_utilities_array()
+        self.pareto_front = self.get_pareto(bid_utils)
+        pareto_utils = np.array([bid["utility"] for bid in self.pareto_front])
+        self.distribution = self.get_distribution(bid_utils)
+
+        # with more than 2 parties, Kalai-Smorodinsky minimises the spread of utilities
+        # (the absolute difference for 2 parties), first occurrence wins on ties
+        kalai_index = np.argmin(pareto_utils.max(axis=1) - pareto_utils.min(axis=1))
+        self.kalai_bid = self.pareto_front[kalai_index]
+        self.nash_bid = self.pareto_front[np.argmax(pareto_utils.prod(axis=1))]
+        self.SW_bid = self.pareto_front[np.argmax(pareto_utils.sum(axis=1))]
+        self.opposition = float(np.linalg.norm(pareto_utils[kalai_index] - 1.0))
 
         return True
 
-    def generate_visualisation(self):
-        bid_utils = [self.get_utilities(bid) for bid in self.iter_bids()]
-        bid_utils = list(zip(*bid_utils))
+    def generate_visualisation(self, mode: str = "auto"):
+        """Create a plotly figure of the bid space in terms of utility.
+
+        Args:
+            mode (str, optional): "scatter" draws every bid as a vector marker, "density"
+                draws a 2D histogram of the bids that is rasterized on export, which keeps
+                the export time constant for large domains. "auto" uses "scatter" up to
+                SCATTER_BID_LIMIT bids. Pareto front and special bids are always vector traces.
+                Defaults to "auto".
+
+        With more than 2 profiles, the utilities of the first two profiles are plotted.
+        """
+        bid_utils = self.get_utilities_array()
+        if mode == "auto":
+            mode = "scatter" if len(bid_utils) <= SCATTER_BID_LIMIT else "density"
 
         fig = go.Figure()
 
-        fig.add_trace(
-            go.Scatter(
-                x=bid_utils[0],
-                y=bid_utils[1],
-                mode="markers",
-                name="bids",
-                marker=dict(size=3),
+        if mode == "scatter":
+            fig.add_trace(
+                go.Scatter(
+                    x=bid_utils[:, 0],
+                    y=bid_utils[:, 1],
+                    mode="markers",
+                    name="bids",
+                    marker=dict(size=3),
+                )
             )
-        )
+        elif mode == "density":
+            edges = np.linspace(0.0, 1.0, DENSITY_BINS + 1)
+            counts, _, _ = np.histogram2d(bid_utils[:, 0], bid_utils[:, 1], bins=edges)
+            centers = (edges[:-1] + edges[1:]) / 2
+            # empty cells are left blank instead of coloured as zero
+            counts = np.where(counts > 0, counts, np.nan).T
+            fig.add_trace(
+                go.Heatmap(
+                    x=centers,
+                    y=centers,
+                    z=counts,
+                    name="bids",
+                    colorscale="Blues",
+                    showscale=False,
+                    showlegend=True,
+                    hovertemplate="bids: %{z}<extra></extra>",
+                )
+            )
+        else:
+            raise ValueError(f"unknown visualisation mode: {mode}")
 
         if self.pareto_front:
             pareto_utils = [bid["utility"] for bid in self.pareto_front]
@@ -240,7 +298,7 @@ class Domain:
             )
 
         if self.nash_bid:
-            x, y = self.nash_bid["utility"]
+            x, y = self.nash_bid["utility"][:2]
             fig.add_trace(
                 go.Scatter(
                     x=[x],
@@ -252,7 +310,7 @@ class Domain:
             )
 
         if self.kalai_bid:
-            x, y = self.kalai_bid["utility"]
+            x, y = self.kalai_bid["utility"][:2]
             fig.add_trace(
                 go.Scatter(
                     x=[x],
@@ -268,7 +326,7 @@ class Domain:
 
         fig.update_layout(
             title=dict(
-                text=f"{self.get_name()}<br><sub>(size: {len(list(self.iter_bids()))}, opposition: {self.opposition:.4f}, distribution: {self.distribution:.4f})</sub>",
+                text=f"{self.get_name()}<br><sub>(size: {len(bid_utils)}, opposition: {self.opposition:.4f}, distribution: {self.distribution:.4f})</sub>",
                 x=0.5,
                 xanchor="center",
             )
@@ -284,15 +342,15 @@ class Domain:
 
         with open(os.path.join(path, f"{self.domain['name']}.json"), "w") as f:
             f.write(json.dumps(self.domain, indent=2))
-        self.profile_A.to_file(parent_path)
-        self.profile_B.to_file(parent_path)
+        for profile in self.profiles:
+            profile.to_file(parent_path)
 
         if self.nash_bid:
             with open(os.path.join(path, "specials.json"), "w") as f:
                 f.write(
                     json.dumps(
                         {
-                            "size": len(list(self.iter_bids())),
+                            "size": self.get_size(),
                             "opposition": self.opposition,
                             "distribution": self.distribution,
                             "social_welfare": self.SW_bid,
@@ -313,67 +371,54 @@ class Domain:
         return iter(self)
 
     def get_utilities(self, bid):
-        return self.profile_A.get_utility(bid), self.profile_B.get_utility(bid)
+        return tuple(profile.get_utility(bid) for profile in self.profiles)
 
-    def get_pareto(self, all_bids: list):
-        pareto_front = []
-        # dominated_bids = set()
-        while True:
-            candidate_bid = all_bids.pop(0)
-            bid_nr = 0
-            dominated = False
-            while len(all_bids) != 0 and bid_nr < len(all_bids):
-                bid = all_bids[bid_nr]
-                if self._dominates(candidate_bid, bid):
-                    # If it is dominated remove the bid from all bids
-                    all_bids.pop(bid_nr)
-                    # dominated_bids.add(frozenset(bid.items()))
-                elif self._dominates(bid, candidate_bid):
-                    dominated = True
-                    # dominated_bids.add(frozenset(candidate_bid.items()))
-                    bid_nr += 1
-                else:
-                    bid_nr += 1
-
-            if not dominated:
-                # add the non-dominated bid to the Pareto frontier
-                pareto_front.append(
-                    {
-                        "bid": candidate_bid,
-                        "utility": [
-                            self.profile_A.get_utility(candidate_bid),
-                            self.profile_B.get_utility(candidate_bid),
-                        ],
-                    }
-                )
-
-            if len(all_bids) == 0:
-                break
-
-        pareto_front = sorted(pareto_front, key=lambda d: d["utility"][0])
+    def get_utilities_array(self) -> np.ndarray:
+        """Utilities of all bids as array of shape (size, number of profiles), in the
+        order of iter_bids.
+        """
+        issues_values = self.domain["issuesValues"]
+        return np.stack(
+            [profile.get_utility_array(issues_values) for profile in self.profiles],
+            axis=1,
+        )
 
-        return pareto_front
+    def get_size(self) -> int:
+        return math.prod(len(v["values"]) for v in self.domain["issuesValues"].values())
+
+    def get_bid(self, index: int) -> dict:
+        """Bid at position index of iter_bids"""
+        issues_values = self.domain["issuesValues"]
+        shape = [len(v["values"]) for v in issues_values.values()]
+        value_indices = np.unravel_index(index, shape)
+        return {
+            issue: values["values"][value_index]
+            for (issue, values), value_index in zip(issues_values.items(), value_indices)
+        }
 
-    def get_distribution(self, bids_iter) -> float:
-        min_distance_sum = 0.0
+    def get_pareto(self, bid_utils: np.ndarray) -> list:
+        """Pareto front as list of {"bid", "utility"} dicts, sorted on the utility of the
+        first profile. Of bids with equal utilities only the first one is kept.
 
-        for i, bid in enumerate(bids_iter):
-            min_distance = self.distance_to_pareto(bid)
-            min_distance_sum += min_distance
+        Args:
+            bid_utils (np.ndarray): utilities of all bids, see get_utilities_array
+        """
+        pareto_indices = get_pareto_indices(bid_utils)
+        pareto_indices = pareto_indices[
+            np.lexsort((pareto_indices, bid_utils[pareto_indices, 0]))
+        ]
 
-        distribution = min_distance_sum / (i + 1)
+        return [
+            {"bid": self.get_bid(index), "utility": bid_utils[index].tolist()}
+            for index in pareto_indices
+        ]
 
-        return distribution
+    def get_distribution(self, bid_utils: np.ndarray) -> float:
+        """Average Euclidean distance in utility space from a bid to the Pareto front"""
+        pareto_utils = np.array([bid["utility"] for bid in self.pareto_front])
+        min_distances, _ = cKDTree(pareto_utils).query(bid_utils)
 
-    def _dominates(self, bid, candidate_bid):
-        if self.profile_A.get_utility(bid) < self.profile_A.get_utility(candidate_bid):
-            return False
-        elif self.profile_B.get_utility(bid) < self.profile_B.get_utility(
-            candidate_bid
-        ):
-            return False
-        else:
-            return True
+        return float(np.mean(min_distances))
 
     def distance_to_pareto(self, bid):
         if not self.pareto_front:
@@ -399,14 +444,14 @@ class Domain:
             float: Euclidian distance
         """
         if bid2 and bid1:
-            a = (self.profile_A.get_utility(bid1) - self.profile_A.get_utility(bid2)) ** 2
-            b = (self.profile_B.get_utility(bid1) - self.profile_B.get_utility(bid2)) ** 2
+            squares = [
+                (p.get_utility(bid1) - p.get_utility(bid2)) ** 2 for p in self.profiles
+            ]
         elif bid1:
-            a = self.profile_A.get_utility(bid1) ** 2
-            b = self.profile_B.get_utility(bid1) ** 2
+            squares = [p.get_utility(bid1) ** 2 for p in self.profiles]
         else:
             raise ValueError("receive None bid")
-        return math.sqrt(a + b)
+        return math.sqrt(sum(squares))
 
     def get_name(self):
         return self.domain["name"]
@@ -425,5 +470,57 @@ class Domain:
         return str(self.domain)
 
 
+def get_pareto_indices(utilities: np.ndarray) -> np.ndarray:
+    """Indices of the rows of utilities that are not weakly dominated by another row, where
+    only the first of a set of equal rows is kept. Uses a sweep for 2 objectives and a
+    blocked sort-filter-skyline for more objectives.
+
+    Args:
+        utilities (np.ndarray): array of shape (number of bids, number of objectives)
+
+    Returns:
+        np.ndarray: indices of the non-dominated rows (unordered)
+    """
+    num_bids, num_objectives = utilities.shape
+    indices = np.arange(num_bids)
+
+    # Sorting descending lexicographically (after the sum if there are more than 2
+    # objectives) guarantees that every bid is preceded by all bids that weakly dominate it.
+    sort_keys = [indices] + [-utilities[:, i] for i in reversed(range(num_objectives))]
+
+    if num_objectives == 2:
+        # a bid is on the front iff its second utility beats all preceding bids
+        order = np.lexsort(sort_keys)
+        utilities_B = utilities[order, 1]
+        preceding_max = np.maximum.accumulate(np.concatenate(([-np.inf], utilities_B[:-1])))
+        return order[utilities_B > preceding_max]
+
+    order = np.lexsort(sort_keys + [-utilities.sum(axis=1)])
+    skyline = np.empty((0, num_objectives))
+    skyline_indices = []
+    for start in range(0, num_bids, SKYLINE_BLOCK_SIZE):
+        block_indices = order[start : start + SKYLINE_BLOCK_SIZE]
+        block = utilities[block_indices]
+
+        # filter out bids dominated by the skyline found so far, strongest bids first
+        for s in range(0, len(skyline), SKYLINE_FILTER_SIZE):
+            dominators = skyline[s : s + SKYLINE_FILTER_SIZE]
+            dominated = (dominators[:, None, :] >= block[None, :, :]).all(axis=2).any(axis=0)
+            block, block_indices = block[~dominated], block_indices[~dominated]
+            if len(block) == 0:
+                break
+
+        # filter out bids dominated within the block, only the first of equal bids remains
+        weakly = (block[:, None, :] >= block[None, :, :]).all(axis=2)
+        strictly = (block[:, None, :] > block[None, :, :]).any(axis=2)
+        earlier = np.triu(np.ones((len(block), len(block)), dtype=bool), k=1)
+        dominated = (weakly & (strictly | earlier)).any(axis=0)
+
+        skyline = np.concatenate((skyline, block[~dominated]))
+        skyline_indices.extend(block_indices[~dominated])
+
+    return np.array(skyline_indices, dtype=int)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+from typing import Optional
+
+DOMAINS_DIR = "domains/"
+CATALOG_FILE = "catalog.json"
+
+
+def main():
+    catalog = update_catalog(DOMAINS_DIR)
+    print(f"catalog contains {len(catalog['domains'])} domains")
+
+
+def update_catalog(domains_dir: str) -> dict:
+    """(Re)generate the catalog file of a directory of domains. Entries of domains whose
+    files did not change since the previous run (same content hash) are reused, so only new
+    or modified domains are parsed. The catalog only stores content hashes, no modification
+    times, so it is the same on every machine.
+
+    Args:
+        domains_dir (str): directory that contains a subdirectory for every domain
+
+    Returns:
+        dict: the updated catalog
+    """
+    previous = load_catalog(domains_dir)["domains"]
+
+    domains = {}
+    for name in sorted(os.listdir(domains_dir)):
+        directory = os.path.join(domains_dir, name)
+        if not os.path.isfile(os.path.join(directory, f"{name}.json")):
+            continue
+
+        files = _hash_files(directory)
+        if name in previous and _same_files(previous[name]["files"], files):
+            entry = previous[name]
+            entry["files"] = files
+        else:
+            entry = create_entry(directory, files)
+        domains[name] = entry
+
+    catalog = {"domains": domains}
+    with open(os.path.join(domains_dir, CATALOG_FILE), "w") as f:
+        f.write(json.dumps(catalog, indent=2))
+
+    return catalog
+
+
+def load_catalog(domains_dir: str) -> dict:
+    catalog_path = os.path.join(domains_dir, CATALOG_FILE)
+    if not os.path.exists(catalog_path):
+        return {"domains": {}}
+
+    with open(catalog_path, "r") as f:
+        return json.load(f)
+
+
+def create_entry(directory: str, files: dict) -> dict:
+    name = os.path.basename(os.path.normpath(directory))
+    with open(os.path.join(directory, f"{name}.json"), "r") as f:
+        domain = json.load(f)
+
+    values_per_issue = {
+        issue: len(values["values"])
+        for issue, values in domain["issuesValues"].items()
+    }
+    size = 1
+    for num_values in values_per_issue.values():
+        size *= num_values
+
+    entry = {
+        "name": name,
+        "size": size,
+        "num_issues": len(values_per_issue),
+        "values_per_issue": values_per_issue,
+        "profiles": sorted(f for f in files if f.startswith("profile")),
+        "opposition": None,
+        "distribution": None,
+        "pareto_size": None,
+        "files": files,
+    }
+
+    # the specials are only loaded here, so that users of the catalog never have to
+    if "specials.json" in files:
+        with open(os.path.join(directory, "specials.json"), "r") as f:
+            specials = json.load(f)
+        entry["opposition"] = specials["opposition"]
+        entry["distribution"] = specials["distribution"]
+        entry["pareto_size"] = len(specials["pareto_front"])
+
+    return entry
+
+
+def filter_domains(
+    catalog: dict,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+    min_opposition: Optional[float] = None,
+    max_opposition: Optional[float] = None,
+) -> list:
+    """Select the catalog entries that satisfy all of the given bounds (inclusive).
+
+    Returns:
+        list[dict]: matching catalog entries, ordered by domain name
+    """
+    selected = []
+    for entry in catalog["domains"].values():
+        if min_size is not None and entry["size"] < min_size:
+            continue
+        if max_size is not None and entry["size"] > max_size:
+            continue
+        opposition = entry["opposition"]
+        if min_opposition is not None and (opposition is None or opposition < min_opposition):
+            continue
+        if max_opposition is not None and (opposition is None or opposition > max_opposition):
+            continue
+        selected.append(entry)
+
+    return selected
+
+
+def stratify_domains(entries: list, key: str = "opposition", num_strata: int = 3) -> list:
+    """Split catalog entries into strata of (nearly) equal count, ordered by the value of key.
+    Entries that lack the key (e.g. no specials calculated) are left out.
+
+    Returns:
+        list[list[dict]]: num_strata lists of entries, from low to high value of key
+    """
+    entries = sorted(
+        (e for e in entries if e.get(key) is not None), key=lambda e: e[key]
+    )
+    bounds = [round(i * len(entries) / num_strata) for i in range(num_strata + 1)]
+    return [entries[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def get_profile_sets(entries: list, domains_dir: str = DOMAINS_DIR) -> list:
+    """Translate catalog entries to the "profile_sets" setting of a tournament."""
+    return [
+        [os.path.join(domains_dir, e["name"], profile) for profile in e["profiles"]]
+        for e in entries
+    ]
+
+
+def _hash_files(directory: str) -> dict:
+    return {
+        file_name: {"sha256": _hash_file(os.path.join(directory, file_name))}
+        for file_name in sorted(os.listdir(directory))
+        if file_name.endswith(".json")
+    }
+
+
+def _same_files(previous_files: dict, files: dict) -> bool:
+    if previous_files.keys() != files.keys():
+        return False
+    return all(previous_files[f]["sha256"] == files[f]["sha256"] for f in files)
+
+
+def _hash_file(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+from typing import Optional
+
+import numpy as np
+from geniusweb.issuevalue.Bid import Bid
+
+from utils.bid_codec import BidCodec
+
+# stored counts are rescaled once the weight of a new offer exceeds this (decay only)
+_MAX_INCREMENT = 1e100
+
+
+class FrequencyCounts:
+    """Counts of the offered values per issue, in one array per issue (in the order of the
+    codec), over all offers, over the last `window` offers, or with exponentially decaying
+    weights, in which case an offer counts for decay ** (number of offers since).
+
+    Every update costs O(number of issues), whatever the mode:
+    - the window is a ring buffer of the value indices of the offers in it, the offer that
+      leaves the window is subtracted from the counts. The highest count of an issue is
+      only searched again when the value that leaves the window had it.
+    - decay does not touch the counts of the other values. Counts are stored relative to a
+      global scale, that shrinks by the decay factor per offer, and a new offer is added
+      as 1 / scale. The stored counts are rescaled when that gets too large.
+    """
+
+    def __init__(
+        self, codec: BidCodec, window: Optional[int] = None, decay: Optional[float] = None
+    ):
+        """
+        Args:
+            codec (BidCodec): codec of the domain
+            window (int, optional): number of most recent offers to count. Defaults to None
+                (all offers).
+            decay (float, optional): weight factor in (0, 1] per later offer. Defaults to
+                None (no decay).
+        """
+        if window is not None and window < 1:
+            raise ValueError("window should be at least 1")
+        if decay is not None and not 0.0 < decay <= 1.0:
+            raise ValueError("decay should be in (0, 1]")
+
+        self.codec = codec
+        self.window = window
+        self.decay = decay
+        self._counts = [np.zeros(radix) for radix in codec.radices]
+        # highest stored count per issue
+        self._max_counts = [0.0] * len(codec.radices)
+        self._total = 0.0
+        self._num_offers = 0
+        self._scale = 1.0
+
+        if window is not None:
+            self._buffer = np.zeros((window, len(codec.radices)), dtype=np.int64)
+            self._buffer_weights = np.zeros(window)
+
+    def add(self, bid: Bid):
+        self.add_code(self.codec.encode(bid))
+
+    def add_code(self, code: int):
+        value_indices = []
+        for stride in self.codec.strides:
+            value_index, code = divmod(int(code), stride)
+            value_indices.append(value_index)
+
+        if self.decay is not None:
+            self._scale *= self.decay
+            if 1.0 / self._scale > _MAX_INCREMENT:
+                self._rescale()
+        weight = 1.0 / self._scale
+
+        outdated_max = []
+        if self.window is not None:
+            slot = self._num_offers % self.window
+            if self._num_offers >= self.window:
+                # the oldest offer leaves the window
+                old_weight = self._buffer_weights[slot]
+                for i, (counts, value_index) in enumerate(zip(self._counts, self._buffer[slot])):
+                    if counts[value_index] >= self._max_counts[i]:
+                        outdated_max.append(i)
+                    counts[value_index] -= old_weight
+                self._total -= old_weight
+            self._buffer[slot] = value_indices
+            self._buffer_weights[slot] = weight
+
+        for i, (counts, value_index) in enumerate(zip(self._counts, value_indices)):
+            counts[value_index] += weight
+            self._max_counts[i] = max(self._max_counts[i], float(counts[value_index]))
+        for i in outdated_max:
+            self._max_counts[i] = float(self._counts[i].max())
+        self._total += weight
+        self._num_offers += 1
+
+    def counts(self, issue_index: int) -> np.ndarray:
+        """(Weighted) count of every value of the issue"""
+        return self._counts[issue_index] * self._scale
+
+    def count(self, issue_index: int, value_index: int) -> float:
+        """(Weighted) count of one value of the issue"""
+        return self._counts[issue_index].item(value_index) * self._scale
+
+    def max_count(self, issue_index: int) -> float:
+        """Highest (weighted) count of a value of the issue"""
+        return self._max_counts[issue_index] * self._scale
+
+    def frequencies(self, issue_index: int) -> np.ndarray:
+        """Share of every value of the issue in the counted offers"""
+        if self._total == 0.0:
+            return np.zeros(len(self._counts[issue_index]))
+        return self._counts[issue_index] / self._total
+
+    def total(self) -> float:
+        """(Weighted) number of counted offers"""
+        return self._total * self._scale
+
+    def __len__(self) -> int:
+        """Number of offers in the counts, the oldest ones may have (almost) no weight"""
+        if self.window is None:
+            return self._num_offers
+        return min(self._num_offers, self.window)
+
+    def _rescale(self):
+        for counts in self._counts:
+            counts *= self._scale
+        self._max_counts = [max_count * self._scale for max_count in self._max_counts]
+        self._total *= self._scale
+        if self.window is not None:
+            self._buffer_weights *= self._scale
+        self._scale = 1.0
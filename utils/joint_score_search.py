@@ -0,0 +1,101 @@
+from typing import List, Optional
+
+import numpy as np
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+
+from utils.utility_evaluator import UtilityEvaluator
+from utils.value_pruning import get_undominated_indices
+
+# domains up to this size are searched exhaustively, larger ones through a random sample
+EXACT_SEARCH_MAX_SIZE = 1_000_000
+SAMPLE_SIZE = 100_000
+
+
+class JointScoreSearch:
+    """Finds the bids that maximise the joint score of the template agent,
+
+        alpha * time_pressure * own utility + (1 - alpha * time_pressure) * opponent utility,
+
+    by scoring all bids of the domain in one NumPy pass. On huge domains the best bid is
+    searched among the bids without dominated values, or in a large random sample if that
+    space is still too large. The opponent utility is given per issue as a table of weighted value
+    utilities, in the order of the BidCodec (see OpponentModel.get_issue_utilities).
+    """
+
+    def __init__(
+        self,
+        profile: LinearAdditive,
+        exact_search_max_size: int = EXACT_SEARCH_MAX_SIZE,
+        sample_size: int = SAMPLE_SIZE,
+    ):
+        self.evaluator = UtilityEvaluator(profile)
+        self.codec = self.evaluator.codec
+        self._exact_search_max_size = exact_search_max_size
+        self._exact = self.codec.size <= exact_search_max_size
+        self._sample_size = sample_size
+        self._own_utilities = self.evaluator.all_utilities() if self._exact else None
+
+    def scores(
+        self,
+        codes: np.ndarray,
+        time_pressure: float,
+        opponent_utilities: Optional[List[np.ndarray]] = None,
+        alpha: float = 0.95,
+    ) -> np.ndarray:
+        """Joint score of the given bids, opponent_utilities None leaves out the opponent term"""
+        scores = alpha * time_pressure * self.evaluator.utilities(codes)
+        if opponent_utilities is not None:
+            value_indices = np.unravel_index(codes, self.codec.radices)
+            opponent = np.zeros(len(codes))
+            for utilities, indices in zip(opponent_utilities, value_indices):
+                opponent += utilities[indices]
+            scores += (1.0 - alpha * time_pressure) * opponent
+        return scores
+
+    def best(
+        self,
+        time_pressure: float,
+        opponent_utilities: Optional[List[np.ndarray]] = None,
+        alpha: float = 0.95,
+        k: int = 1,
+    ) -> np.ndarray:
+        """Codes of the k bids with the highest joint score, best bid first"""
+        if self._exact:
+            scores = alpha * time_pressure * self._own_utilities
+            if opponent_utilities is not None:
+                opponent = np.zeros(1)
+                for utilities in opponent_utilities:
+                    opponent = np.add.outer(opponent, utilities).ravel()
+                scores += (1.0 - alpha * time_pressure) * opponent
+            codes = None
+        else:
+            if opponent_utilities is not None and k == 1:
+                # the best bid is never Pareto-dominated, so bids with dominated values can be
+                # left out of the search
+                kept = get_undominated_indices(self.evaluator.issue_utilities, opponent_utilities)
+                if np.prod([len(keep) for keep in kept], dtype=object) <= self._exact_search_max_size:
+                    return self._best_in_subspace(kept, time_pressure, opponent_utilities, alpha)
+            codes = np.unique(np.random.randint(0, self.codec.size, self._sample_size, dtype=np.int64))
+            scores = self.scores(codes, time_pressure, opponent_utilities, alpha)
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return top if codes is None else codes[top]
+
+    def _best_in_subspace(
+        self,
+        kept: List[np.ndarray],
+        time_pressure: float,
+        opponent_utilities: List[np.ndarray],
+        alpha: float,
+    ) -> np.ndarray:
+        own, opponent = np.zeros(1), np.zeros(1)
+        for keep, own_utils, opponent_utils in zip(kept, self.evaluator.issue_utilities, opponent_utilities):
+            own = np.add.outer(own, own_utils[keep]).ravel()
+            opponent = np.add.outer(opponent, np.asarray(opponent_utils)[keep]).ravel()
+        scores = alpha * time_pressure * own + (1.0 - alpha * time_pressure) * opponent
+
+        sub_indices = np.unravel_index(int(np.argmax(scores)), [len(keep) for keep in kept])
+        value_indices = [keep[i] for keep, i in zip(kept, sub_indices)]
+        return np.array([np.ravel_multi_index(value_indices, self.codec.radices)], dtype=np.int64)
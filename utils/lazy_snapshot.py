@@ -0,0 +1,82 @@
+from typing import Dict, Tuple
+
+from geniusweb.issuevalue.Value import Value
+
+_MISSING = object()
+
+
+class LazySnapshotFrequencies:
+    """Mixin for the geniusweb-style frequency opponent models, whose WithAction returns a new
+    (immutable) model instead of updating the model itself.
+
+    Instead of copying all frequency maps on every action, WithAction updates the maps in
+    place through set_frequency and hands them over to the new model (see hand_over). The
+    old model keeps an undo record of the frequencies it changed, and only rebuilds its own
+    maps from those of its successor if it is used again. As the agents replace their model
+    with the new one, that normally never happens.
+    """
+
+    @property
+    def _bidFrequencies(self) -> Dict[str, Dict[Value, float]]:
+        if self.__dict__.get("_successor") is not None:
+            self._materialize()
+        return self.__dict__["_bidFrequencies"]
+
+    @_bidFrequencies.setter
+    def _bidFrequencies(self, freqs: Dict[str, Dict[Value, float]]):
+        self.__dict__["_bidFrequencies"] = freqs
+
+    @property
+    def _totalBids(self) -> int:
+        if self.__dict__.get("_successor") is not None:
+            self._materialize()
+        return self.__dict__["_totalBids"]
+
+    @_totalBids.setter
+    def _totalBids(self, total: int):
+        self.__dict__["_totalBids"] = total
+
+    @staticmethod
+    def set_frequency(
+        undo: Dict[Tuple[str, Value], object],
+        freqs: Dict[Value, float],
+        issue: str,
+        value: Value,
+        frequency: float,
+    ):
+        """Set the frequency of a value in place, remembering its frequency before the update"""
+        undo.setdefault((issue, value), freqs.get(value, _MISSING))
+        freqs[value] = frequency
+
+    def hand_over(self, successor, undo: Dict[Tuple[str, Value], object]):
+        """Make successor (created on the maps of this model, updated in place) the owner
+        of the maps, this model will restore its own frequencies from the undo record
+        when it is used again.
+
+        Returns:
+            the successor
+        """
+        self.__dict__["_undo"] = (undo, self.__dict__["_totalBids"])
+        self.__dict__["_successor"] = successor
+        return successor
+
+    def _materialize(self):
+        chain = [self]
+        while chain[-1].__dict__.get("_successor") is not None:
+            chain.append(chain[-1].__dict__["_successor"])
+
+        owner = chain[-1].__dict__
+        freqs = {issue: dict(values) for issue, values in owner["_bidFrequencies"].items()}
+        total = owner["_totalBids"]
+        # undo the updates from the newest model back to this one
+        for model in reversed(chain[:-1]):
+            undo, total = model.__dict__["_undo"]
+            for (issue, value), frequency in undo.items():
+                if frequency is _MISSING:
+                    del freqs[issue][value]
+                else:
+                    freqs[issue][value] = frequency
+
+        self.__dict__.update(
+            _bidFrequencies=freqs, _totalBids=total, _successor=None, _undo=None
+        )
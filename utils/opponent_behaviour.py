@@ -0,0 +1,144 @@
+from collections import deque
+from typing import Optional
+
+# number of most recent offers in the windowed statistics
+WINDOW = 10
+# the opponent is random if more than this share of its offers went up for us, and also down
+RANDOM_SHARE = 0.45
+# minimum increase of our utility from the first to the last offer of a conceding opponent
+CONCESSION_THRESHOLD = 0.15
+# a conceding opponent is boulware if its recent concession rate is this many times its average
+BOULWARE_ACCELERATION = 1.5
+
+BOULWARE = "boulware"
+CONCEDER = "conceder"
+HARDLINER = "hardliner"
+RANDOM = "random"
+UNKNOWN = "unknown"
+
+
+class OpponentBehaviour:
+    """Running statistics of the utilities (for us) of the offers of the opponent, updated in
+    O(1) per offer, so that they can be queried every turn at a cost that does not grow with
+    the length of the negotiation:
+    - the concession slope: least squares slope of the utilities over time (or offer index),
+      from running sums
+    - the number of increases, decreases and sign changes of consecutive utilities
+    - the mean and variance of the last `window` utilities, from a running sum and sum of
+      squares over a ring buffer
+    - a classification of the opponent as boulware, conceder, hardliner or random
+    """
+
+    def __init__(self, window: int = WINDOW):
+        if window < 1:
+            raise ValueError("window should be at least 1")
+
+        self.count = 0
+        self.first: Optional[float] = None
+        self.last: Optional[float] = None
+
+        self.increases = 0
+        self.decreases = 0
+        self.sign_changes = 0
+        self._last_sign = 0
+
+        # running sums for the least squares slope
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self._sum_xx = 0.0
+        self._sum_xy = 0.0
+
+        self._window = deque(maxlen=window)
+        self._window_sum = 0.0
+        self._window_squares = 0.0
+
+    def update(self, utility: float, progress: Optional[float] = None):
+        """Add the utility of an offer of the opponent
+
+        Args:
+            utility (float): our utility of the offer
+            progress (float, optional): progress of the negotiation at the time of the offer.
+                Defaults to None (the slope is measured per offer).
+        """
+        if self.count == 0:
+            self.first = utility
+        else:
+            sign = (utility > self.last) - (utility < self.last)
+            if sign > 0:
+                self.increases += 1
+            elif sign < 0:
+                self.decreases += 1
+            if sign != 0:
+                if self._last_sign != 0 and sign != self._last_sign:
+                    self.sign_changes += 1
+                self._last_sign = sign
+        self.last = utility
+
+        x = float(self.count) if progress is None else progress
+        self._sum_x += x
+        self._sum_y += utility
+        self._sum_xx += x * x
+        self._sum_xy += x * utility
+        self.count += 1
+
+        if len(self._window) == self._window.maxlen:
+            oldest = self._window[0]
+            self._window_sum -= oldest
+            self._window_squares -= oldest * oldest
+        self._window.append(utility)
+        self._window_sum += utility
+        self._window_squares += utility * utility
+
+    def concession(self) -> float:
+        """Increase of our utility from the first to the last offer"""
+        if self.count == 0:
+            return 0.0
+        return self.last - self.first
+
+    def slope(self) -> float:
+        """Least squares slope of our utility of the offers over time, positive if the
+        opponent concedes
+        """
+        denominator = self.count * self._sum_xx - self._sum_x * self._sum_x
+        if self.count < 2 or denominator <= 0.0:
+            return 0.0
+        return (self.count * self._sum_xy - self._sum_x * self._sum_y) / denominator
+
+    def window_mean(self) -> float:
+        if not self._window:
+            return 0.0
+        return self._window_sum / len(self._window)
+
+    def window_variance(self) -> float:
+        if not self._window:
+            return 0.0
+        mean = self.window_mean()
+        # clip the rounding error of the running sums
+        return max(0.0, self._window_squares / len(self._window) - mean * mean)
+
+    def classify(
+        self, random_share: float = RANDOM_SHARE, concession_threshold: float = CONCESSION_THRESHOLD
+    ) -> str:
+        """Classify the opponent from its offers so far.
+
+        The opponent is random if more than random_share of its offers went up for us, and
+        also down. Otherwise it is a hardliner if it conceded no more than
+        concession_threshold since its first offer, and a conceder or a boulware opponent
+        if it did. A boulware opponent concedes BOULWARE_ACCELERATION times faster in the
+        recent window than on average, a conceder does not speed up.
+
+        Returns:
+            str: BOULWARE, CONCEDER, HARDLINER, RANDOM or UNKNOWN (no offers yet)
+        """
+        if self.count == 0:
+            return UNKNOWN
+        if self.increases > int(random_share * self.count) and self.decreases > int(
+            random_share * self.count
+        ):
+            return RANDOM
+        if self.concession() <= concession_threshold:
+            return HARDLINER
+
+        average_rate = self.concession() / (self.count - 1)
+        window_rate = (self.last - self._window[0]) / max(1, len(self._window) - 1)
+        return BOULWARE if window_rate > BOULWARE_ACCELERATION * average_rate else CONCEDER
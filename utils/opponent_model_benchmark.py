@@ -0,0 +1,378 @@
+import glob
+import json
+import random
+import sys
+from decimal import Decimal
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from geniusweb.actions.Offer import Offer
+from geniusweb.actions.PartyId import PartyId
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.DiscreteValue import DiscreteValue
+from geniusweb.issuevalue.Domain import Domain
+from geniusweb.issuevalue.NumberValue import NumberValue
+from scipy.stats import spearmanr
+
+from utils.runners import get_utility_function
+
+# number of points in time (equal shares of the offers of the opponent) at which the
+# prediction error is measured
+NUM_CHECKPOINTS = 10
+# the error is measured on the distinct bids offered in the session, subsampled to at most
+# this many bids
+MAX_EVALUATION_BIDS = 200
+RESULTS_TRACES = "results/*/session_results_trace.json"
+
+
+class ModelSpec:
+    """How to create, update and query one opponent model, so that models with different
+    interfaces (in place updates, geniusweb-style WithAction, ...) are replayed alike.
+
+    Args:
+        create (Callable): domain -> model
+        update (Callable): (model, bid, progress) -> updated model (the same model if it
+            is updated in place)
+        predict (Callable): (model, bid) -> predicted utility of the bid for the opponent
+    """
+
+    def __init__(self, create: Callable, update: Callable, predict: Callable):
+        self.create = create
+        self.update = update
+        self.predict = predict
+
+
+def _update_in_place(update: Callable) -> Callable:
+    def _update(model, bid: Bid, progress: float):
+        update(model, bid)
+        return model
+
+    return _update
+
+
+def _with_action(model, bid: Bid, progress: float):
+    # none of the geniusweb-style models looks at the progress
+    return model.WithAction(Offer(PartyId("opponent"), bid), None)
+
+
+def _template_model() -> ModelSpec:
+    from agents.template_agent.utils.opponent_model import OpponentModel
+
+    return ModelSpec(
+        OpponentModel, _update_in_place(OpponentModel.update), OpponentModel.get_predicted_utility
+    )
+
+
+def _group55_model() -> ModelSpec:
+    from agents.CSE3210.agent55.Group55OpponentModel import FrequencyOpponentModel
+
+    return ModelSpec(
+        lambda domain: FrequencyOpponentModel.create().With(domain, None),
+        _with_action,
+        lambda model, bid: float(model.getUtility(bid)),
+    )
+
+
+def _agent43_model() -> ModelSpec:
+    from agents.CSE3210.agent43.frequency_opponent_model_group_43 import FrequencyOpponentModel
+
+    def create(domain: Domain):
+        # initialised like agent43 does, with 0.5 for every value
+        freqs = {
+            issue: {value: 0.5 for value in domain.getValues(issue)} for issue in domain.getIssues()
+        }
+        return FrequencyOpponentModel(domain, freqs, 0, None)
+
+    return ModelSpec(create, _with_action, lambda model, bid: float(model.getUtility(bid)))
+
+
+def _agent52_model() -> ModelSpec:
+    from agents.CSE3210.agent52.FreqModelWeighted import FreqModelWeighted
+
+    def create(domain: Domain):
+        model = FreqModelWeighted.create().With(domain, None)
+        model.__class__ = FreqModelWeighted
+        return model
+
+    def update(model, bid: Bid, progress: float):
+        model = _with_action(model, bid, progress)
+        model.updateIssueWeights()
+        return model
+
+    return ModelSpec(create, update, lambda model, bid: float(model.getUtility(bid)))
+
+
+def _agent11_model() -> ModelSpec:
+    from agents.CSE3210.agent11.MyOpponentModel import MyOpponentModel
+
+    return ModelSpec(
+        lambda domain: MyOpponentModel.create().With(domain, None),
+        _with_action,
+        lambda model, bid: float(model.getUtility(bid)),
+    )
+
+
+def _agent68_model() -> ModelSpec:
+    from agents.CSE3210.agent68.opponent.opponent import Opponent
+
+    def create(domain: Domain):
+        model = Opponent()
+        model.init_domain(domain)
+        return model
+
+    def predict(model, bid: Bid) -> float:
+        # get_utility is not implemented, combine the issue and value weights it does have
+        return sum(
+            model.get_issue_weight(issue) * model.get_value_weight(issue, bid.getValue(issue))
+            for issue in bid.getIssues()
+        )
+
+    return ModelSpec(create, _update_in_place(Opponent.log_bid), predict)
+
+
+def _procrastin_model() -> ModelSpec:
+    from agents.ANL2022.procrastin_agent.utils.opponent_model import OpponentModel
+
+    return ModelSpec(
+        OpponentModel,
+        lambda model, bid, progress: model.update(bid, progress) or model,
+        # the prediction comes with an uncertainty
+        lambda model, bid: model.get_predicted_utility(bid)[0],
+    )
+
+
+def _agent007_model() -> ModelSpec:
+    from agents.ANL2022.agent007.utils.opponent_model import OpponentModel
+
+    return ModelSpec(
+        OpponentModel, _update_in_place(OpponentModel.update), OpponentModel.get_predicted_utility
+    )
+
+
+def _array_model() -> ModelSpec:
+    from utils.array_opponent_model import ArrayOpponentModel
+
+    return ModelSpec(
+        ArrayOpponentModel,
+        _update_in_place(ArrayOpponentModel.update),
+        ArrayOpponentModel.get_predicted_utility,
+    )
+
+
+def _bayesian_model() -> ModelSpec:
+    from utils.bayesian_opponent_model import BayesianOpponentModel
+
+    return ModelSpec(
+        BayesianOpponentModel,
+        lambda model, bid, progress: model.update(bid, progress) or model,
+        BayesianOpponentModel.get_predicted_utility,
+    )
+
+
+def _value_frequency_model() -> ModelSpec:
+    from utils.value_frequency_map import ValueFrequencyMap
+
+    return ModelSpec(
+        ValueFrequencyMap, _update_in_place(ValueFrequencyMap.update), ValueFrequencyMap.get_value
+    )
+
+
+# models are imported when they are benchmarked, so a model whose agent can not be imported
+# only fails its own benchmark
+OPPONENT_MODELS: Dict[str, Callable[[], ModelSpec]] = {
+    "template": _template_model,
+    "group55": _group55_model,
+    "agent43": _agent43_model,
+    "agent52": _agent52_model,
+    "agent11": _agent11_model,
+    "agent68": _agent68_model,
+    "procrastin": _procrastin_model,
+    "agent007": _agent007_model,
+    "array": _array_model,
+    "bayesian": _bayesian_model,
+    "learning_agent": _value_frequency_model,
+}
+
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob(RESULTS_TRACES))
+    if not paths:
+        print(f"no session traces found, expected {RESULTS_TRACES}")
+        return
+
+    results = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            results.extend(benchmark_trace(json.load(f)))
+    print(summarize(results).to_string())
+    for result in results:
+        if result["failure"] is not None:
+            print(f"{result['model']} failed on {result['opponent']}: {result['failure']}")
+
+
+def benchmark_trace(
+    results_trace: dict,
+    models: Optional[List[str]] = None,
+    num_checkpoints: int = NUM_CHECKPOINTS,
+    max_evaluation_bids: int = MAX_EVALUATION_BIDS,
+    seed: int = 0,
+) -> List[dict]:
+    """Replay the offers of every party of a session through the opponent models, as if the
+    other party modelled it, and measure their prediction error against the true utilities
+    of the party, which process_results added to the trace.
+
+    Progress is measured in offers of the modelled party, as traces have no timestamps.
+
+    Args:
+        results_trace (dict): session results trace as returned by run_session
+        models (list[str], optional): names of OPPONENT_MODELS to benchmark. Defaults to
+            None (all).
+        num_checkpoints (int, optional): number of points in time at which the error is
+            measured. Defaults to NUM_CHECKPOINTS.
+        max_evaluation_bids (int, optional): maximum number of distinct offered bids the
+            error is measured on. Defaults to MAX_EVALUATION_BIDS.
+        seed (int, optional): seed of the subsampling of the evaluation bids. Defaults to 0.
+
+    Returns:
+        list[dict]: one result per modelled party and model
+    """
+    agent_names = {
+        party: profile["party"]["partyref"].split(".")[-1]
+        for party, profile in results_trace["partyprofiles"].items()
+    }
+
+    offers = {party: [] for party in agent_names}
+    # true utility per party of every distinct bid in the session
+    bids = {}
+    for action in results_trace["actions"]:
+        offer = action.get("Offer") or action.get("Accept")
+        if offer is None or "utilities" not in offer:
+            continue
+        issue_values = offer["bid"]["issuevalues"]
+        key = tuple(sorted((issue, str(value)) for issue, value in issue_values.items()))
+        if key not in bids:
+            bids[key] = (_parse_bid(issue_values), offer["utilities"])
+        if "Offer" in action:
+            offers[offer["actor"]].append(bids[key][0])
+
+    evaluation = list(bids.values())
+    if len(evaluation) > max_evaluation_bids:
+        evaluation = random.Random(seed).sample(evaluation, max_evaluation_bids)
+
+    results = []
+    for party, party_offers in offers.items():
+        if not party_offers:
+            continue
+        domain = get_utility_function(results_trace["partyprofiles"][party]["profile"]).getDomain()
+        evaluation_bids = [bid for bid, _ in evaluation]
+        true_utilities = np.array([utilities[party] for _, utilities in evaluation])
+        for name in models if models is not None else OPPONENT_MODELS:
+            result = _benchmark_model(
+                name, domain, party_offers, evaluation_bids, true_utilities, num_checkpoints
+            )
+            result["opponent"] = agent_names[party]
+            results.append(result)
+
+    return results
+
+
+def summarize(results: List[dict]) -> pd.DataFrame:
+    """Average the benchmark results per model, ordered by mean error
+
+    Returns:
+        pd.DataFrame: mean and final error, final rank correlation, microseconds per update
+            and per prediction, and the number of sessions in which the model failed
+    """
+    rows = []
+    for result in results:
+        errors = result["error_by_progress"]
+        rows.append(
+            {
+                "model": result["model"],
+                "mean_error": np.mean(errors) if errors else np.nan,
+                "final_error": errors[-1] if errors else np.nan,
+                "rank_correlation": result["rank_correlation"],
+                "us_per_update": result["us_per_update"],
+                "us_per_prediction": result["us_per_prediction"],
+                "failed": result["failure"] is not None,
+            }
+        )
+    rows = pd.DataFrame(rows)
+    summary = rows.groupby("model").agg(
+        {
+            "mean_error": "mean",
+            "final_error": "mean",
+            "rank_correlation": "mean",
+            "us_per_update": "mean",
+            "us_per_prediction": "mean",
+            "failed": "sum",
+        }
+    )
+    return summary.sort_values("mean_error")
+
+
+def _benchmark_model(
+    name: str,
+    domain: Domain,
+    offers: List[Bid],
+    evaluation_bids: List[Bid],
+    true_utilities: np.ndarray,
+    num_checkpoints: int,
+) -> dict:
+    checkpoints = {
+        max(1, round(i * len(offers) / num_checkpoints)) for i in range(1, num_checkpoints + 1)
+    }
+    result = {
+        "model": name,
+        "error_by_progress": [],
+        "rank_correlation": np.nan,
+        "us_per_update": np.nan,
+        "us_per_prediction": np.nan,
+        "failure": None,
+    }
+
+    update_ns = prediction_ns = 0
+    num_updates = num_predictions = 0
+    try:
+        spec = OPPONENT_MODELS[name]()
+        model = spec.create(domain)
+        for i, bid in enumerate(offers, 1):
+            start = perf_counter_ns()
+            model = spec.update(model, bid, i / len(offers))
+            update_ns += perf_counter_ns() - start
+            num_updates += 1
+
+            if i in checkpoints:
+                start = perf_counter_ns()
+                predictions = np.array([float(spec.predict(model, b)) for b in evaluation_bids])
+                prediction_ns += perf_counter_ns() - start
+                num_predictions += len(evaluation_bids)
+                error = np.abs(predictions - true_utilities).mean()
+                result["error_by_progress"].append(float(error))
+
+        if len(evaluation_bids) > 1 and np.ptp(predictions) > 0:
+            result["rank_correlation"] = float(spearmanr(predictions, true_utilities)[0])
+    except Exception as e:
+        result["failure"] = f"{type(e).__name__} after {num_updates} offers: {e}"
+
+    if num_updates:
+        result["us_per_update"] = update_ns / num_updates / 1000
+    if num_predictions:
+        result["us_per_prediction"] = prediction_ns / num_predictions / 1000
+    return result
+
+
+def _parse_bid(issue_values: dict) -> Bid:
+    values = {}
+    for issue, value in issue_values.items():
+        if isinstance(value, str):
+            values[issue] = DiscreteValue(value)
+        else:
+            values[issue] = NumberValue(Decimal(str(value)))
+    return Bid(values)
+
+
+if __name__ == "__main__":
+    main()
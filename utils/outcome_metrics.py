@@ -0,0 +1,96 @@
+import json
+import math
+import os
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Pareto fronts with more points are searched with a KD-tree instead of brute force
+KDTREE_MIN_POINTS = 256
+
+
+class Frontier:
+    """Pareto front and Nash/Kalai points of a domain, indexed for nearest-point queries.
+    Utilities are ordered by profile file name (profileA, profileB, ...), as in specials.json.
+    """
+
+    def __init__(self, profiles: list, specials: dict):
+        self.profiles = profiles
+        self.pareto_utils = np.array([bid["utility"] for bid in specials["pareto_front"]])
+        self.pareto_tree = None
+        if len(self.pareto_utils) >= KDTREE_MIN_POINTS:
+            self.pareto_tree = cKDTree(self.pareto_utils)
+        self.nash = specials["nash"]["utility"]
+        self.kalai = specials["kalai"]["utility"]
+
+    def get_distances(self, utilities: dict) -> Optional[dict]:
+        """Euclidean distances in utility space from an outcome to the Pareto front, the
+        Nash point and the Kalai-Smorodinsky point.
+
+        Args:
+            utilities (dict): utility of the outcome per profile file name
+
+        Returns:
+            dict: distances, None if the utilities do not cover all profiles of the domain
+        """
+        if sorted(utilities) != self.profiles:
+            return None
+        point = [utilities[profile] for profile in self.profiles]
+
+        if self.pareto_tree is None:
+            squares = np.square(self.pareto_utils - point).sum(axis=1)
+            distance_to_pareto = math.sqrt(squares.min())
+        else:
+            distance_to_pareto, _ = self.pareto_tree.query(point)
+        return {
+            "distance_to_pareto": float(distance_to_pareto),
+            "distance_to_nash": math.dist(point, self.nash),
+            "distance_to_kalai": math.dist(point, self.kalai),
+        }
+
+
+def get_outcome_metrics(profile_utilities: dict) -> Optional[dict]:
+    """Distances of an outcome to the precomputed specials of its domain.
+
+    Args:
+        profile_utilities (dict): utility of the outcome per profile uri or path
+
+    Returns:
+        dict: see Frontier.get_distances, None if the domain has no specials.json
+    """
+    frontier, profiles = _resolve_profiles(tuple(profile_utilities))
+    if frontier is None:
+        return None
+
+    utilities = dict(zip(profiles, profile_utilities.values()))
+    return frontier.get_distances(utilities)
+
+
+@lru_cache(maxsize=None)
+def _resolve_profiles(profile_uris: tuple):
+    paths = [uri.split(":")[-1] for uri in profile_uris]
+    domain_dirs = {os.path.abspath(os.path.dirname(path)) for path in paths}
+    if len(domain_dirs) != 1:
+        return None, None
+
+    return load_frontier(domain_dirs.pop()), [os.path.basename(p) for p in paths]
+
+
+@lru_cache(maxsize=None)
+def load_frontier(domain_dir: str) -> Optional[Frontier]:
+    """Load the specials of a domain once, later calls for the same directory are cached."""
+    specials_path = os.path.join(domain_dir, "specials.json")
+    if not os.path.exists(specials_path):
+        return None
+
+    with open(specials_path, "r") as f:
+        specials = json.load(f)
+    profiles = sorted(
+        f
+        for f in os.listdir(domain_dir)
+        if f.startswith("profile") and f.endswith(".json")
+    )
+
+    return Frontier(profiles, specials)
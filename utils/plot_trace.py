@@ -1,12 +1,37 @@
 import os
 from collections import defaultdict
+from typing import Optional
 
+import numpy as np
 import plotly.graph_objects as go
 
+# traces with more points than this are drawn with WebGL instead of SVG
+WEBGL_POINT_LIMIT = 2000
+# rough size in bytes of the coordinates of a point in the html file, excluding hover text
+POINT_OVERHEAD_BYTES = 40
 
-def plot_trace(results_trace: dict, plot_file: str):
+
+def plot_trace(
+    results_trace: dict,
+    plot_file: str,
+    max_points_per_trace: Optional[int] = None,
+    max_file_size: Optional[int] = None,
+):
+    """Plot the utilities of all offers of a session to an html file.
+
+    Args:
+        results_trace (dict): session results trace as returned by run_session
+        plot_file (str): path of the plot, the extension is replaced by .html
+        max_points_per_trace (int, optional): downsample every trace to at most this many
+            points (LTTB), always keeping the first, last, lowest and highest utility point.
+            Defaults to None (no downsampling).
+        max_file_size (int, optional): approximate budget in bytes for the plotted data
+            (excluding the plotly.js library), translated into a maximum number of points
+            per trace. Defaults to None (no budget).
+    """
     utilities = defaultdict(lambda: defaultdict(lambda: {"x": [], "y": [], "bids": []}))
     accept = {"x": [], "y": [], "bids": []}
+    index = 0
     for index, action in enumerate(results_trace["actions"], 1):
         if "Offer" in action:
             offer = action["Offer"]
@@ -23,6 +48,12 @@ def plot_trace(results_trace: dict, plot_file: str):
                 accept["y"].append(util)
                 accept["bids"].append(offer["bid"]["issuevalues"])
 
+    if max_file_size is not None:
+        num_traces = sum(len(data) for data in utilities.values())
+        budget_points = _points_within_budget(utilities, max_file_size, num_traces)
+        if max_points_per_trace is None or budget_points < max_points_per_trace:
+            max_points_per_trace = budget_points
+
     fig = go.Figure()
     fig.add_trace(
         go.Scatter(
@@ -39,19 +70,27 @@ def plot_trace(results_trace: dict, plot_file: str):
     for i, (agent, data) in enumerate(utilities.items()):
         for actor, utility in data.items():
             name = "_".join(agent.split("_")[-2:])
+            x, y = np.array(utility["x"]), np.array(utility["y"])
+            if max_points_per_trace is not None and len(x) > max_points_per_trace:
+                keep = downsample_indices(x, y, max_points_per_trace)
+            else:
+                keep = np.arange(len(x))
+
+            # hover text is only built for the points that are plotted
             text = []
-            for bid, util in zip(utility["bids"], utility["y"]):
+            for k in keep:
                 text.append(
                     "<br>".join(
-                        [f"<b>utility: {util:.3f}</b><br>"]
-                        + [f"{i}: {v}" for i, v in bid.items()]
+                        [f"<b>utility: {y[k]:.3f}</b><br>"]
+                        + [f"{i}: {v}" for i, v in utility["bids"][k].items()]
                     )
                 )
+            scatter = go.Scattergl if len(keep) > WEBGL_POINT_LIMIT else go.Scatter
             fig.add_trace(
-                go.Scatter(
+                scatter(
                     mode="lines+markers" if agent == actor else "markers",
-                    x=utilities[agent][actor]["x"],
-                    y=utilities[agent][actor]["y"],
+                    x=x[keep],
+                    y=y[keep],
                     name=f"{name} offered" if agent == actor else f"{name} received",
                     legendgroup=agent,
                     marker={"color": color[i]},
@@ -73,3 +112,60 @@ def plot_trace(results_trace: dict, plot_file: str):
     fig.update_xaxes(title_text="round", range=[0, index + 1], ticks="outside")
     fig.update_yaxes(title_text="utility", range=[0, 1], ticks="outside")
     fig.write_html(f"{os.path.splitext(plot_file)[0]}.html")
+
+
+def downsample_indices(x: np.ndarray, y: np.ndarray, num_points: int) -> np.ndarray:
+    """Select indices of points to plot with Largest-Triangle-Three-Buckets, extended to
+    always keep the points with the lowest and highest y-value.
+
+    Args:
+        x (np.ndarray): x coordinates, sorted ascending
+        y (np.ndarray): y coordinates
+        num_points (int): number of points to select (at least 3)
+
+    Returns:
+        np.ndarray: sorted indices of the selected points
+    """
+    num_points = max(num_points, 3)
+    n = len(x)
+    if n <= num_points:
+        return np.arange(n)
+
+    x, y = x.astype(float), y.astype(float)
+    # the first and last point are kept, the rest is divided over equally sized buckets
+    edges = np.linspace(1, n - 1, num_points - 1).astype(int)
+    selected = [0]
+    for b in range(num_points - 2):
+        start, end = edges[b], edges[b + 1]
+        # average of the next bucket (or the last point) is the third triangle vertex
+        if b + 2 < len(edges):
+            next_x = x[end : edges[b + 2]].mean()
+            next_y = y[end : edges[b + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        prev_x, prev_y = x[selected[-1]], y[selected[-1]]
+        areas = np.abs(
+            (prev_x - next_x) * (y[start:end] - prev_y)
+            - (prev_x - x[start:end]) * (next_y - prev_y)
+        )
+        selected.append(start + int(np.argmax(areas)))
+    selected.append(n - 1)
+
+    return np.union1d(selected, [np.argmin(y), np.argmax(y)])
+
+
+def _points_within_budget(utilities: dict, max_file_size: int, num_traces: int) -> int:
+    if num_traces == 0:
+        return max_file_size
+
+    # estimate the size of a point from the hover text of a single bid
+    for data in utilities.values():
+        for utility in data.values():
+            bid = utility["bids"][0]
+            text = "<br>".join(
+                ["<b>utility: 0.000</b><br>"] + [f"{i}: {v}" for i, v in bid.items()]
+            )
+            # "<" and ">" are escaped as unicode sequences (6 characters) in the html
+            escaped_size = len(text) + 5 * (text.count("<") + text.count(">"))
+            point_size = escaped_size + POINT_OVERHEAD_BYTES
+            return max(max_file_size // (num_traces * point_size), 3)
@@ -21,6 +21,9 @@ from pyson.ObjectMapper import ObjectMapper
 from uri.uri import URI
 
 from utils.ask_proceed import ask_proceed
+from utils.outcome_metrics import get_outcome_metrics
+
+OUTCOME_METRICS = ["distance_to_pareto", "distance_to_nash", "distance_to_kalai"]
 
 
 def run_session(settings) -> Tuple[dict, dict]:
@@ -203,6 +206,17 @@ def process_results(results_class: SAOPState, results_dict: dict):
         results_summary[f"utility_{position}"] = utilities_final[i]
     results_summary["nash_product"] = prod(utilities_final)
     results_summary["social_welfare"] = sum(utilities_final)
+
+    # distances of the agreement to the Pareto front, Nash and Kalai points of the domain,
+    # sessions without an agreement have no outcome metrics
+    if result == "agreement":
+        profile_utilities = {
+            v["profile"]: utilities_final[i]
+            for i, v in enumerate(results_dict["partyprofiles"].values())
+        }
+        outcome_metrics = get_outcome_metrics(profile_utilities)
+        if outcome_metrics is not None:
+            results_summary.update(outcome_metrics)
     results_summary["result"] = result
 
     return results_dict, results_summary
@@ -237,12 +251,16 @@ def process_tournament_results(tournament_results):
                 agent_result_raw[agent_class]["num_offers"].append(
                     session_results["num_offers"]
                 )
+            for metric in OUTCOME_METRICS:
+                if metric in session_results:
+                    agent_result_raw[agent_class][metric].append(session_results[metric])
             tournament_results_summary[agent_class][session_results["result"]] += 1
 
     for agent, stats in agent_result_raw.items():
         num_session = len(stats["utility"])
         for desc, stat in stats.items():
-            stat_average = sum(stat) / num_session
+            # metrics that are missing from some sessions are averaged over the others
+            stat_average = sum(stat) / len(stat)
             tournament_results_summary[agent][f"avg_{desc}"] = stat_average
         tournament_results_summary[agent]["count"] = num_session
 
@@ -250,6 +268,7 @@ def process_tournament_results(tournament_results):
         "avg_utility",
         "avg_nash_product",
         "avg_social_welfare",
+        *[f"avg_{metric}" for metric in OUTCOME_METRICS],
         "avg_num_offers",
         "count",
         "agreement",
@@ -266,11 +285,13 @@ def process_tournament_results(tournament_results):
     # results dictionary to dataframe
     tournament_results_summary = pd.DataFrame(tournament_results_summary).T
 
-    # clean data and types
-    tournament_results_summary = tournament_results_summary.fillna(0)
+    # clean data and types, averages of metrics that an agent never got stay NaN
     for column in column_order:
         if column not in tournament_results_summary:
-            tournament_results_summary[column] = 0
+            tournament_results_summary[column] = 0 if column in column_type else float("nan")
+    tournament_results_summary = tournament_results_summary.fillna(
+        {column: 0 for column in column_type}
+    )
     tournament_results_summary = tournament_results_summary.astype(column_type)
 
     # structure dataframe
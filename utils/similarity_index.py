@@ -0,0 +1,87 @@
+from typing import List, Optional
+
+import numpy as np
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+
+from utils.bid_space_index import BidSpaceIndex
+
+
+class SimilarityIndex(BidSpaceIndex):
+    """BidSpaceIndex that also keeps the value indices of all bids (in the smallest integer
+    type that fits, in utility order), for similarity queries within a utility band such as
+    "the k bids closest to bid X in (weighted) Hamming distance".
+    """
+
+    def __init__(self, profile: LinearAdditive):
+        super().__init__(profile)
+        dtype = np.uint8 if max(self.codec.radices, default=1) <= 256 else np.uint16
+        self._value_indices = self.codec.value_indices(self._codes).astype(dtype)
+
+    def closest_bids(
+        self,
+        bid: Bid,
+        k: int = 1,
+        min_utility: Optional[float] = None,
+        max_utility: Optional[float] = None,
+        issue_weights: Optional[List[float]] = None,
+    ) -> List[Bid]:
+        """The k bids with utility in [min_utility, max_utility] that are closest to bid in
+        Hamming distance (number of issues with a different value), closest first. Ties are
+        broken in favour of the higher utility.
+
+        Args:
+            issue_weights (list[float], optional): weight per issue (in the order of the codec)
+                for weighted Hamming distance. Defaults to None (all weights 1).
+        """
+        target = self.codec.value_indices([self.codec.encode(bid)])[0]
+        if issue_weights is None:
+            issue_weights = np.ones(len(target))
+        # distance to a bid is the weight of the issues on which it differs
+        value_scores = []
+        for radix, value, weight in zip(self.codec.radices, target, issue_weights):
+            scores = np.full(radix, float(weight))
+            scores[value] = 0.0
+            value_scores.append(scores)
+        return self._lowest(value_scores, k, min_utility, max_utility)
+
+    def most_similar(
+        self,
+        value_scores: List[np.ndarray],
+        k: int = 1,
+        min_utility: Optional[float] = None,
+        max_utility: Optional[float] = None,
+    ) -> List[Bid]:
+        """The k bids with utility in [min_utility, max_utility] with the highest similarity,
+        most similar first. The similarity of a bid is the sum of the scores of its values,
+        given as one array per issue (in the order of the codec).
+        """
+        negated = [-np.asarray(scores, dtype=float) for scores in value_scores]
+        return self._lowest(negated, k, min_utility, max_utility)
+
+    def similarities(self, codes: np.ndarray, value_scores: List[np.ndarray]) -> np.ndarray:
+        """Similarity (see most_similar) of arbitrary bids, given as codes"""
+        value_indices = self.codec.value_indices(codes)
+        similarities = np.zeros(len(value_indices))
+        for scores, indices in zip(value_scores, value_indices.T):
+            similarities += np.asarray(scores, dtype=float)[indices]
+        return similarities
+
+    def _lowest(self, value_scores, k, min_utility, max_utility) -> List[Bid]:
+        band = self.interval(min_utility, max_utility)
+        value_indices = self._value_indices[band]
+        if len(value_indices) == 0:
+            return []
+
+        costs = np.zeros(len(value_indices))
+        for scores, indices in zip(value_scores, value_indices.T):
+            costs += scores[indices]
+
+        # best bid first, so that the stable order on cost breaks ties on higher utility
+        costs = costs[::-1]
+        k = min(k, len(costs))
+        kth = np.partition(costs, k - 1)[k - 1]
+        candidates = np.flatnonzero(costs <= kth)
+        top = candidates[np.argsort(costs[candidates], kind="stable")][:k]
+        codes = self._codes[band][::-1][top]
+        return [self.codec.decode(code) for code in codes]
@@ -0,0 +1,73 @@
+import numpy as np
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+
+from utils.bid_codec import BidCodec
+
+
+class UtilityEvaluator:
+    """Float version of a linear additive profile, compiled into a lookup table per issue
+    that holds the weighted utility of every value. Drop-in replacement for
+    profile.getUtility(bid) when exact Decimal utilities are not needed.
+
+    Issues are kept in sorted order. Batches of bids are given as a matrix of value indices
+    (one row per bid, one column per issue) or as codes of the BidCodec of the domain. With
+    a restricted codec, only the values of that codec are scored.
+    """
+
+    def __init__(self, profile: LinearAdditive, codec: BidCodec = None):
+        self.codec = codec if codec is not None else BidCodec(profile.getDomain())
+        self.issues = self.codec.issues
+        self.values = self.codec.values
+        self.radices = self.codec.radices
+
+        utilities = profile.getUtilities()
+        self.issue_utilities = [
+            np.array(
+                [
+                    float(profile.getWeight(issue)) * float(utilities[issue].getUtility(v))
+                    for v in values
+                ]
+            )
+            for issue, values in zip(self.issues, self.values)
+        ]
+        # python dicts are the fastest lookup for single bids
+        self._value_utilities = [
+            dict(zip(values, issue_utilities.tolist()))
+            for values, issue_utilities in zip(self.values, self.issue_utilities)
+        ]
+
+    def utility(self, bid: Bid) -> float:
+        """Utility of a single bid, values that are not in the domain count as 0"""
+        utility = 0.0
+        for issue, value_utilities in zip(self.issues, self._value_utilities):
+            utility += value_utilities.get(bid.getValue(issue), 0.0)
+        return utility
+
+    def utilities(self, encoded_bids: np.ndarray) -> np.ndarray:
+        """Utilities of a batch of bids.
+
+        Args:
+            encoded_bids (np.ndarray): value index matrix of shape (number of bids, number of
+                issues), or 1D array of codes
+
+        Returns:
+            np.ndarray: utility per bid
+        """
+        encoded_bids = np.asarray(encoded_bids)
+        if encoded_bids.ndim == 1:
+            value_indices = np.unravel_index(encoded_bids, self.radices)
+        else:
+            value_indices = encoded_bids.T
+
+        utilities = np.zeros(len(encoded_bids))
+        for issue_utilities, indices in zip(self.issue_utilities, value_indices):
+            utilities += issue_utilities[indices]
+        return utilities
+
+    def all_utilities(self) -> np.ndarray:
+        """Utility of every bid of the domain, indexed by code"""
+        utilities = np.zeros(1)
+        for issue_utilities in self.issue_utilities:
+            utilities = np.add.outer(utilities, issue_utilities).ravel()
+        return utilities
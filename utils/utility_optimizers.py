@@ -0,0 +1,50 @@
+"""
+Optimisation over the bids of a linear additive profile without enumerating the bid space.
+The best and worst bids are found in time polynomial in the number of issues and values.
+Counts and closest bids are exact (up to floating point rounding) and meet in the middle
+(see PartitionedBidSpaceIndex): time and memory grow with the square root of the number
+of bids.
+"""
+from itertools import islice
+from typing import List
+
+import numpy as np
+from geniusweb.issuevalue.Bid import Bid
+
+from utils.bid_enumerator import BidEnumerator
+from utils.bid_space_index import PartitionedBidSpaceIndex
+from utils.utility_evaluator import UtilityEvaluator
+
+
+def get_max_bid(evaluator: UtilityEvaluator) -> Bid:
+    """Bid with the highest utility: the best value of every issue"""
+    return _bid_from_indices(evaluator, [int(np.argmax(u)) for u in evaluator.issue_utilities])
+
+
+def get_min_bid(evaluator: UtilityEvaluator) -> Bid:
+    """Bid with the lowest utility: the worst value of every issue"""
+    return _bid_from_indices(evaluator, [int(np.argmin(u)) for u in evaluator.issue_utilities])
+
+
+def get_best_bids(evaluator: UtilityEvaluator, k: int) -> List[Bid]:
+    """The k bids with the highest utility, best bid first (best-first search)"""
+    return list(islice(BidEnumerator(None, evaluator).iter_bids(), k))
+
+
+def count_bids_above(evaluator: UtilityEvaluator, threshold: float) -> int:
+    """Number of bids with a utility of at least threshold"""
+    return PartitionedBidSpaceIndex.from_evaluator(evaluator).count(min_utility=threshold)
+
+
+def get_closest_bid(evaluator: UtilityEvaluator, target: float) -> Bid:
+    """A bid with a utility closest to the target utility"""
+    return PartitionedBidSpaceIndex.from_evaluator(evaluator).nearest(target)
+
+
+def _bid_from_indices(evaluator: UtilityEvaluator, value_indices: List[int]) -> Bid:
+    return Bid(
+        {
+            issue: values[i]
+            for issue, values, i in zip(evaluator.issues, evaluator.values, value_indices)
+        }
+    )
@@ -0,0 +1,66 @@
+from typing import List, Optional
+
+import numpy as np
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.Domain import Domain
+
+from utils.bid_codec import BidCodec
+from utils.frequency_counts import FrequencyCounts
+
+
+class ValueFrequencyMap:
+    """Frequency map of the opponent offers of the learning_agent family (learning_agent,
+    compromising_agent, smart_agent, super_agent), on count arrays indexed by value instead
+    of dictionaries keyed by the string of every value.
+
+    The estimated opponent value of a bid is the weighted mean over the issues of the count
+    of its value relative to the highest count of the issue (at least 1). An issue weighs
+    the inverse standard deviation of its counts (plus 0.1 to the squared deviations), so
+    issues on which the opponent keeps offering the same value count more. The relative
+    counts and weights are tables that are only recomputed after an update, so a bid costs
+    one lookup per issue and a batch of bids one vectorised lookup per issue.
+    """
+
+    def __init__(self, domain: Domain):
+        self.codec = BidCodec(domain)
+        self.counts = FrequencyCounts(self.codec)
+
+        # relative counts per issue and issue weights, None when outdated
+        self._value_utilities: Optional[List[np.ndarray]] = None
+        self._weights: Optional[np.ndarray] = None
+
+    def update(self, bid: Bid):
+        if bid is not None:
+            self.counts.add(bid)
+            self._value_utilities = None
+
+    def get_value(self, bid: Bid) -> float:
+        """Estimated opponent value of a bid"""
+        value_utilities, weights = self._tables()
+        value = 0.0
+        for issue_index, (issue, utilities, weight) in enumerate(
+            zip(self.codec.issues, value_utilities, weights)
+        ):
+            value += weight * utilities[self.codec.value_index(issue_index, bid.getValue(issue))]
+        return float(value / weights.sum())
+
+    def get_values(self, encoded_bids: np.ndarray) -> np.ndarray:
+        """Estimated opponent value of a batch of bids, given as codes of the codec"""
+        value_utilities, weights = self._tables()
+        values = np.zeros(len(encoded_bids))
+        value_indices = np.unravel_index(np.asarray(encoded_bids, dtype=np.int64), self.codec.radices)
+        for utilities, weight, indices in zip(value_utilities, weights, value_indices):
+            values += weight * utilities[indices]
+        return values / weights.sum()
+
+    def _tables(self):
+        if self._value_utilities is None:
+            self._value_utilities = []
+            weights = []
+            for issue_index in range(len(self.codec.issues)):
+                counts = self.counts.counts(issue_index)
+                self._value_utilities.append(counts / max(1.0, counts.max()))
+                deviations = ((counts - counts.mean()) ** 2).sum()
+                weights.append(1.0 / np.sqrt((deviations + 0.1) / len(counts)))
+            self._weights = np.array(weights)
+        return self._value_utilities, self._weights
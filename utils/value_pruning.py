@@ -0,0 +1,52 @@
+from typing import List
+
+import numpy as np
+
+from utils.bid_codec import BidCodec
+
+
+def get_undominated_indices(
+    own_utilities: List[np.ndarray], opponent_utilities: List[np.ndarray]
+) -> List[np.ndarray]:
+    """Per issue, the indices of the values that are not dominated by another value of the
+    same issue. A value is dominated if another value is at least as good for us and for the
+    (estimated) opponent, and strictly better for one of us. Of values that are equally
+    good for both, only the first is kept.
+
+    Every bid with a dominated value is Pareto-dominated by the bid with that value
+    replaced, so the Pareto front and the maximum of any positive combination of both
+    utilities (e.g. the joint score of the template agent) lie in the pruned space.
+
+    Args:
+        own_utilities (list[np.ndarray]): weighted utility per value, one array per issue
+        opponent_utilities (list[np.ndarray]): estimated weighted opponent utility per value,
+            in the same order
+
+    Returns:
+        list[np.ndarray]: sorted value indices to keep, one array per issue
+    """
+    undominated = []
+    for own, opponent in zip(own_utilities, opponent_utilities):
+        own, opponent = np.asarray(own, dtype=float), np.asarray(opponent, dtype=float)
+        # [i, j]: value j dominates value i
+        at_least = (own[None, :] >= own[:, None]) & (opponent[None, :] >= opponent[:, None])
+        strictly = (own[None, :] > own[:, None]) | (opponent[None, :] > opponent[:, None])
+        equal = at_least & ~strictly
+        earlier = np.tri(len(own), k=-1, dtype=bool)
+        dominated = (at_least & strictly).any(axis=1) | (equal & earlier).any(axis=1)
+        undominated.append(np.flatnonzero(~dominated))
+    return undominated
+
+
+def prune_codec(
+    codec: BidCodec, own_utilities: List[np.ndarray], opponent_utilities: List[np.ndarray]
+) -> BidCodec:
+    """Codec over the product of the undominated values of every issue (see
+    get_undominated_indices), for the bid index, enumerator or searches to work on.
+    """
+    indices = get_undominated_indices(own_utilities, opponent_utilities)
+    allowed_values = {
+        issue: [values[i] for i in keep]
+        for issue, values, keep in zip(codec.issues, codec.values, indices)
+    }
+    return codec.restrict(allowed_values)